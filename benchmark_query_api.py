@@ -0,0 +1,184 @@
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+# A mix of what group admins poll: upcoming days, a few chapters and the status
+PATHS = [
+    "/plan",
+    *(f"/plan?date={(date.today() + timedelta(days=offset)).isoformat()}" for offset in range(1, 8)),
+    "/chapter/Gn/1",
+    "/chapter/Sl/119",
+    "/chapter/Jo/3",
+    "/chapter/Ap/22",
+    "/status",
+]
+
+
+def free_port() -> int:
+    """
+    Asks the OS for an unused local port.
+
+    Returns:
+        int: The port.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def request(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    path: str,
+    etag: Optional[str] = None
+) -> Dict[str, Optional[str]]:
+    """
+    Sends a GET over a keep-alive connection and reads the response.
+
+    Args:
+        reader (asyncio.StreamReader): Connection input.
+        writer (asyncio.StreamWriter): Connection output.
+        path (str): Request target.
+        etag (Optional[str]): Sent as If-None-Match when given.
+
+    Returns:
+        Dict[str, Optional[str]]: The status code and ETag of the response.
+    """
+    conditional = f"If-None-Match: {etag}\r\n" if etag else ""
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n{conditional}\r\n".encode("latin-1"))
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+    headers = {}
+    for line in head[1:]:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0))
+    if length and head[0].split(" ")[1] != "304":
+        await reader.readexactly(length)
+    return {"status": head[0].split(" ")[1], "etag": headers.get("etag")}
+
+
+async def client(port: int, requests: int, conditional: bool, latencies: List[float], statuses: Dict[str, int]) -> None:
+    """
+    Sends `requests` requests over one connection, cycling through PATHS.
+
+    Args:
+        port (int): Server port.
+        requests (int): Number of requests.
+        conditional (bool): Revalidate with If-None-Match once an ETag is known.
+        latencies (List[float]): Receives the latency of each request.
+        statuses (Dict[str, int]): Counts responses by status code.
+    """
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    etags: Dict[str, str] = {}
+    try:
+        for index in range(requests):
+            path = PATHS[index % len(PATHS)]
+            start = time.perf_counter()
+            result = await request(reader, writer, path, etags.get(path) if conditional else None)
+            latencies.append(time.perf_counter() - start)
+            statuses[result["status"]] = statuses.get(result["status"], 0) + 1
+            if result["etag"]:
+                etags[path] = result["etag"]
+    finally:
+        writer.close()
+
+
+async def run_load(port: int, connections: int, requests: int, conditional: bool) -> Dict[str, float]:
+    """
+    Runs concurrent keep-alive clients against the API.
+
+    Args:
+        port (int): Server port.
+        connections (int): Concurrent connections.
+        requests (int): Requests per connection.
+        conditional (bool): See `client`.
+
+    Returns:
+        Dict[str, float]: Requests per second, latency percentiles and status counts.
+    """
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client(port, requests, conditional, latencies, statuses) for _ in range(connections)
+    ))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": len(latencies),
+        "requests_per_s": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": statistics.quantiles(latencies, n=100)[98] * 1000,
+        "statuses": statuses,
+    }
+
+
+def start_server(port: int, timeout: float = 60.0) -> subprocess.Popen:
+    """
+    Starts the API in its own interpreter, so it gets a core of its own, and
+    waits until it accepts connections.
+
+    Args:
+        port (int): Port to listen on.
+        timeout (float): Seconds to wait for the corpus to load.
+
+    Returns:
+        subprocess.Popen: The server process.
+    """
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    process = subprocess.Popen(
+        [sys.executable, "query_api.py", "--port", str(port)],
+        cwd=cwd,
+        stdout=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"query_api.py exited with {process.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return process
+        except OSError:
+            time.sleep(0.05)
+    process.terminate()
+    raise RuntimeError("query_api.py did not start in time")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the local query API.")
+    parser.add_argument("--connections", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=500, help="Requests per connection")
+    parser.add_argument("--min-rps", type=float, default=500.0, help="Fail below this many requests per second")
+    args = parser.parse_args()
+
+    port = free_port()
+    startup = time.perf_counter()
+    server = start_server(port)
+    print(f"Server startup: {time.perf_counter() - startup:.2f}s")
+    failures = []
+    try:
+        for conditional in (False, True):
+            result = asyncio.run(run_load(port, args.connections, args.requests, conditional))
+            name = "If-None-Match" if conditional else "full responses"
+            statuses = ", ".join(f"{status}: {count}" for status, count in sorted(result["statuses"].items()))
+            print(
+                f"[{name}] {result['requests']} requests, {result['requests_per_s']:.0f} req/s, "
+                f"p50 {result['p50_ms']:.2f}ms, p99 {result['p99_ms']:.2f}ms ({statuses})"
+            )
+            if set(result["statuses"]) - {"200", "304"}:
+                failures.append(f"{name}: unexpected statuses ({statuses})")
+            if result["requests_per_s"] < args.min_rps:
+                failures.append(f"{name}: {result['requests_per_s']:.0f} req/s (minimum {args.min_rps:.0f})")
+    finally:
+        server.terminate()
+        server.wait()
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,65 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+# Runs a CLI command in a fresh interpreter and fails if it loaded the browser stack
+PROBE = (
+    "import sys, cli\n"
+    "cli.main(sys.argv[1:])\n"
+    "heavy = [name for name in ('selenium', 'whatsapp_manager') if name in sys.modules]\n"
+    "sys.exit(3 if heavy else 0)\n"
+)
+
+
+def measure(command: List[str], runs: int) -> Dict[str, float]:
+    """
+    Times a CLI command from interpreter start to exit.
+
+    Args:
+        command (List[str]): CLI arguments, e.g. ["plan", "--days", "7"].
+        runs (int): Number of cold runs.
+
+    Returns:
+        Dict[str, float]: Median and maximum seconds, and runs that imported Selenium.
+    """
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    durations = []
+    heavy = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE, *command],
+            cwd=cwd,
+            stdout=subprocess.DEVNULL
+        )
+        durations.append(time.perf_counter() - start)
+        if result.returncode == 3:
+            heavy += 1
+        elif result.returncode != 0:
+            raise RuntimeError(f"'{' '.join(command)}' exited with {result.returncode}")
+    return {"median_s": statistics.median(durations), "max_s": max(durations), "heavy": heavy}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that read-only CLI commands start fast.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=1.0, help="Maximum median seconds per command")
+    args = parser.parse_args()
+
+    failures = []
+    for command in (["plan", "--days", "7"], ["preview"]):
+        result = measure(command, args.runs)
+        name = " ".join(command)
+        print(f"{name}: median {result['median_s'] * 1000:.0f}ms, max {result['max_s'] * 1000:.0f}ms")
+        if result["heavy"]:
+            failures.append(f"{name} imported the browser stack")
+        if result["median_s"] > args.budget:
+            failures.append(f"{name} took {result['median_s']:.2f}s (budget {args.budget:.2f}s)")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
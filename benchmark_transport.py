@@ -0,0 +1,140 @@
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+
+from fake_whatsapp import FakeWhatsAppServer
+from whatsapp_manager import CHROME_DRIVER, INSERT_PASTE, INSERT_SEND_KEYS, WhatsAppManager
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Returns the `pct` percentile of `values` (nearest rank).
+
+    Args:
+        values (List[float]): The samples.
+        pct (float): Percentile between 0 and 100.
+
+    Returns:
+        float: The percentile value.
+    """
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def sample_message(size: int) -> str:
+    """
+    Builds a chapter-like message: a bold header and verses separated by blank lines.
+
+    Args:
+        size (int): Approximate number of characters.
+
+    Returns:
+        str: The message.
+    """
+    lines = ["*Leitura do dia 01/01/2025*", "Salmos 119"]
+    verse = 1
+    while sum(len(line) + 2 for line in lines) < size:
+        lines.append(f"{verse} Lorem ipsum dolor sit amet, consectetur adipiscing elit.")
+        verse += 1
+    return "\n\n".join(lines)
+
+
+def run_benchmark(
+    chrome_driver_path: str,
+    contacts: int,
+    messages: int,
+    latency_ms: int,
+    message_size: int,
+    insert_strategy: str = INSERT_PASTE
+) -> Dict[str, float]:
+    """
+    Sends messages through WhatsAppManager against the local stand-in server.
+
+    Args:
+        chrome_driver_path (str): Path to the ChromeDriver executable.
+        contacts (int): Number of chats the messages are spread over.
+        messages (int): Messages sent per chat.
+        latency_ms (int): Simulated delay before the sent tick appears.
+        message_size (int): Characters per message.
+        insert_strategy (str): INSERT_PASTE or INSERT_SEND_KEYS.
+
+    Returns:
+        Dict[str, float]: Startup time, throughput, latency percentiles, text
+        insertion time and messages that reached the server altered.
+    """
+    names = [f"Grupo {i:03d}" for i in range(contacts)]
+    server = FakeWhatsAppServer(names, latency_ms=latency_ms)
+    server.start()
+    profile = tempfile.mkdtemp(prefix="brn-bench-")
+    # Keeps the benchmark session away from the real cookies and health record
+    saved_paths = WhatsAppManager.cookies_path, WhatsAppManager.session_health_path
+    WhatsAppManager.cookies_path = os.path.join(profile, "session_cookies.json")
+    WhatsAppManager.session_health_path = os.path.join(profile, "session_health.json")
+    os.makedirs(WhatsAppManager.debug_folder, exist_ok=True)
+
+    try:
+        start = time.perf_counter()
+        manager = WhatsAppManager(
+            profile, chrome_driver_path, base_url=server.url, insert_strategy=insert_strategy
+        )
+        startup = time.perf_counter() - start
+
+        text = sample_message(message_size)
+        latencies = []
+        start = time.perf_counter()
+        for name in names:
+            for _ in range(messages):
+                sent = time.perf_counter()
+                manager.send_message(name, text)
+                latencies.append(time.perf_counter() - sent)
+        elapsed = time.perf_counter() - start
+        insert_stats = manager.timing_report().get("insert_message", {"mean": 0.0})
+        manager.close()
+    finally:
+        server.close()
+        WhatsAppManager.cookies_path, WhatsAppManager.session_health_path = saved_paths
+
+    expected = WhatsAppManager.normalize_text(text)
+    altered = sum(
+        1 for message in server.messages
+        if WhatsAppManager.normalize_text(message["text"]) != expected
+    )
+
+    return {
+        "driver_startup_s": startup,
+        "messages": len(latencies),
+        "messages_per_s": len(latencies) / elapsed,
+        "p50_s": statistics.median(latencies),
+        "p95_s": percentile(latencies, 95),
+        "insert_mean_s": insert_stats["mean"],
+        "altered": altered,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark WhatsAppManager against a local fake WhatsApp Web.")
+    parser.add_argument("--driver", default=CHROME_DRIVER, help="Path to chromedriver")
+    parser.add_argument("--contacts", type=int, default=3)
+    parser.add_argument("--messages", type=int, default=10, help="Messages per contact")
+    parser.add_argument("--latency", type=int, default=200, help="Sent-tick delay in ms")
+    parser.add_argument("--size", type=int, default=1000, help="Characters per message")
+    parser.add_argument(
+        "--insert",
+        choices=[INSERT_PASTE, INSERT_SEND_KEYS, "both"],
+        default=INSERT_PASTE,
+        help="Text insertion strategy; 'both' compares paste with the send_keys baseline"
+    )
+    args = parser.parse_args()
+
+    strategies = [INSERT_PASTE, INSERT_SEND_KEYS] if args.insert == "both" else [args.insert]
+    for strategy in strategies:
+        result = run_benchmark(args.driver, args.contacts, args.messages, args.latency, args.size, strategy)
+        print(f"[{strategy}]")
+        print(f"Driver startup: {result['driver_startup_s']:.2f}s")
+        print(f"Messages: {result['messages']} ({result['messages_per_s']:.2f} msg/s), altered: {result['altered']}")
+        print(f"Send latency p50: {result['p50_s'] * 1000:.0f}ms, p95: {result['p95_s'] * 1000:.0f}ms")
+        print(f"Text insertion mean: {result['insert_mean_s'] * 1000:.0f}ms")
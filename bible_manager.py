@@ -1,7 +1,19 @@
 import os
-import re
-import json
-from typing import Dict, List, Union
+import sys
+import hashlib
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from chapter_cache import ChapterCache, decode_chapter
+from metrics import metrics
+from state_store import DEFAULT_RECIPIENT, StateStore
+from bible_pack import BiblePack, PACK_FILE_NAME, write_pack
+from corpus_manifest import MANIFEST_FILE_NAME, CorpusManifest, ManifestReport, fold_name
+from translation_store import (
+    DEFAULT_TRANSLATION, STORE_FILE_NAME, TESTAMENT_DIR_NAMES, TRANSLATIONS_DIR_NAME, TranslationStore, write_store
+)
 
 # Bible Dir
 BOOK_ABBREVIATIONS = {
@@ -73,9 +85,70 @@ BOOK_ABBREVIATIONS = {
     "Apocalipse": "Ap"
 }
 
+# Número de capítulos de cada livro, para detectar capítulos faltando
+BOOK_CHAPTERS = {
+    "Gn": 50, "Ex": 40, "Lv": 27, "Nm": 36, "Dt": 34, "Js": 24, "Jz": 21, "Rt": 4,
+    "1Sm": 31, "2Sm": 24, "1Rs": 22, "2Rs": 25, "1Cr": 29, "2Cr": 36, "Ed": 10,
+    "Ne": 13, "Et": 10, "Jó": 42, "Sl": 150, "Pv": 31, "Ec": 12, "Ct": 8, "Is": 66,
+    "Jr": 52, "Lm": 5, "Ez": 48, "Dn": 12, "Os": 14, "Jl": 3, "Am": 9, "Ob": 1,
+    "Jn": 4, "Mq": 7, "Na": 3, "Hc": 3, "Sf": 3, "Ag": 2, "Zc": 14, "Ml": 4,
+    "Mt": 28, "Mc": 16, "Lc": 24, "Jo": 21, "At": 28, "Rm": 16, "1Co": 16, "2Co": 13,
+    "Gl": 6, "Ef": 6, "Fp": 4, "Cl": 4, "1Ts": 5, "2Ts": 3, "1Tm": 6, "2Tm": 4,
+    "Tt": 3, "Fm": 1, "Hb": 13, "Tg": 5, "1Pe": 5, "2Pe": 3, "1Jo": 5, "2Jo": 1,
+    "3Jo": 1, "Jd": 1, "Ap": 22
+}
+
+# Pesos possíveis de um capítulo nos planos balanceados e o campo do manifesto de cada um
+WEIGHT_METRICS = {
+    "chapters": None,
+    "verses": "verses",
+    "words": "words",
+    "bytes": "text_bytes",
+}
+
+# Ordem canônica dos livros (a mesma de BOOK_ABBREVIATIONS)
+CANONICAL_ORDER: List[str] = list(BOOK_ABBREVIATIONS.values())
+
+# Nomes de pasta que não correspondem a BOOK_ABBREVIATIONS nem sem acentos
+BOOK_ALIASES = {
+    "Cântico dos Cânticos": "Cantares",
+    "Filemon": "Filemom",
+}
+
+
+_FOLDED_BOOK_NAMES = {fold_name(name): name for name in BOOK_ABBREVIATIONS}
+
+
+def canonical_book_name(name: str) -> str:
+    """
+    Obtém o nome canônico de um livro a partir do nome da pasta.
+    
+    :param name: Nome do livro como aparece na pasta.
+    :return: Nome presente em BOOK_ABBREVIATIONS ou o próprio nome se não mapeado.
+    """
+    name = BOOK_ALIASES.get(name, name)
+    return _FOLDED_BOOK_NAMES.get(fold_name(name), name)
+
+
+def resolve_book(name: str) -> Tuple[Optional[str], str]:
+    """
+    Obtém a abreviação e o nome canônico de um livro a partir do nome da pasta.
+    
+    :param name: Nome do livro como aparece na pasta, sem o número de ordem.
+    :return: Tupla (abreviação ou None se não mapeado, nome do livro).
+    """
+    book = canonical_book_name(name)
+    return BOOK_ABBREVIATIONS.get(book), book
+
 
 class BibleManager:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        use_pack: bool = True,
+        source_encoding: Optional[str] = None,
+        cache_size: int = 2 * 1024 * 1024,
+        state_store: Optional[StateStore] = None
+    ) -> None:
         self.bible_dir: str = os.path.abspath(
             os.path.join(os.path.dirname(__file__), "bible")
         )
@@ -88,61 +161,507 @@ class BibleManager:
         self.last_chapter: str = os.path.abspath(
             os.path.join(os.path.dirname(__file__), "config", "last_chapter.json")
         )
+        if state_store is None:
+            state_store = StateStore()
+            state_store.import_legacy_json(last_chapter_path=self.last_chapter)
+        self.state_store: StateStore = state_store
         
-        self.bible_books: Dict[str, Dict[str, Union[str, int, Dict[str, str]]]] = {
-            **self.load_books(self.old_testament),
-            **self.load_books(self.new_testament)
-        }
+        self.pack_path: str = os.path.join(self.bible_dir, PACK_FILE_NAME)
+        self.manifest_path: str = os.path.join(self.bible_dir, MANIFEST_FILE_NAME)
+        self.store_path: str = os.path.join(self.bible_dir, STORE_FILE_NAME)
+        self.translations_dir: str = os.path.join(self.bible_dir, TRANSLATIONS_DIR_NAME)
+        self.source_encoding: Optional[str] = source_encoding
+        self.chapter_cache = ChapterCache(self.load_chapter_text, cache_size)
         
-    def chapters_list_filter(self, list_chapters: List[str], dir_path: str) -> Dict[str, str]:
+        self.use_pack: bool = use_pack
+        self.corpus_lock = threading.Lock()
+    
+    # Atributos do corpus, carregados no primeiro acesso por `load_corpus`
+    LAZY_ATTRIBUTES = frozenset({
+        "manifest", "pack", "bible_books", "book_order", "book_position", "chapter_prefix", "total_chapters",
+        "weight_prefixes"
+    })
+    
+    def __getattr__(self, name: str):
+        # Chamado apenas quando o atributo ainda não existe
+        if name in BibleManager.LAZY_ATTRIBUTES:
+            self.load_corpus()
+            return self.__dict__[name]
+        if name == "translation_store":
+            return self.open_translation_store()
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+    
+    def load_corpus(self) -> None:
         """
-        Filtra e retorna os capítulos de um livro.
+        Carrega o manifesto, abre o pacote e monta o índice de leitura.
         
-        :param list_chapters: Lista de Capítulos.
-        :param dir_path: Caminho do diretório dos capítulos.
-        :return: Dicionário com capítulos e seus caminhos
+        É chamado automaticamente no primeiro acesso a `bible_books` ou ao índice,
+        para que comandos que não leem a Bíblia não paguem esse custo. Se nenhum
+        arquivo mudou de data ou tamanho, o manifesto salvo é usado sem reler os
+        arquivos; senão, `scan` relê apenas os alterados.
         """
-        chapter_pattern = re.compile(r"^(\S+)\s(\d+).txt$")
-        chapters = {}
+        with self.corpus_lock:
+            if "bible_books" in self.__dict__:
+                return
+            manifest = CorpusManifest(
+                self.bible_dir,
+                [self.old_testament, self.new_testament],
+                self.manifest_path,
+                resolve_book,
+                BOOK_CHAPTERS
+            )
+            if not manifest.load_unchanged():
+                report = manifest.scan(self.source_encoding)
+                if report.rehashed and report.has_problems:
+                    print(report.summary(unmapped=False), file=sys.stderr)
+            
+            self.manifest: CorpusManifest = manifest
+            self.pack: Optional[BiblePack] = None
+            if self.use_pack:
+                self.pack = BiblePack.open_if_fresh(self.pack_path, manifest.digest)
+            bible_books = self.canonical_sort(manifest.books())
+            self.build_reading_index(bible_books)
+            self.bible_books: Dict[str, Dict[str, Union[str, int, Dict[str, str]]]] = bible_books
+    
+    def refresh_corpus(self) -> ManifestReport:
+        """
+        Revalida os arquivos e atualiza apenas o que mudou: remove do cache os
+        capítulos alterados, descarta o pacote desatualizado e remonta o índice
+        de leitura só se a lista de capítulos mudou.
         
-        for chapter in list_chapters:
-            match = chapter_pattern.match(chapter)
+        :return: Relatório da validação.
+        """
+        self.load_corpus()
+        with self.corpus_lock:
+            report = self.manifest.scan(self.source_encoding)
+            if not report.changed:
+                return report
             
-            if match:
-                chapter_num = match.group(2)
-                chapter_path = os.path.join(dir_path, chapter)
-                chapters[chapter_num] = chapter_path
-        return chapters
-
-    def load_books(self, testament_book: str) ->  Dict[str, Dict[str, Union[str, int, Dict[str, str]]]]:
+            for book, chapter in report.changed:
+                self.chapter_cache.discard(book, f"{chapter:02d}")
+            self.weight_prefixes = {}
+            if self.pack is not None and self.pack.signature != self.manifest.digest:
+                self.pack.close()
+                self.pack = None
+            
+            bible_books = self.canonical_sort(self.manifest.books())
+            if any(
+                bible_books.get(book, {}).get("chapters") != data["chapters"]
+                for book, data in self.bible_books.items()
+            ) or bible_books.keys() != self.bible_books.keys():
+                self.build_reading_index(bible_books)
+            self.bible_books = bible_books
+            return report
+    
+    @staticmethod
+    def canonical_sort(
+        books: Dict[str, Dict[str, Union[str, int, Dict[str, str]]]]
+    ) -> Dict[str, Dict[str, Union[str, int, Dict[str, str]]]]:
+        """
+        Ordena os livros pela ordem canônica; livros não mapeados ficam no final.
+        
+        :param books: Dicionário de livros.
+        :return: Dicionário de livros na ordem canônica.
+        """
+        ordered = {abbrev: books[abbrev] for abbrev in CANONICAL_ORDER if abbrev in books}
+        ordered.update({abbrev: data for abbrev, data in books.items() if abbrev not in ordered})
+        return ordered
+    
+    def build_reading_index(self, bible_books: Dict[str, Dict[str, Union[str, int, Dict[str, str]]]]) -> None:
+        """
+        Pré-calcula a soma acumulada de capítulos na ordem canônica.
+        
+        `chapter_prefix[i]` é o total de capítulos antes do livro `book_order[i]`,
+        e o último elemento é o total de capítulos da Bíblia.
+        
+        :param bible_books: Livros na ordem canônica.
+        """
+        book_order: List[str] = list(bible_books.keys())
+        chapter_prefix: List[int] = [0]
+        for book in book_order:
+            chapter_prefix.append(chapter_prefix[-1] + bible_books[book]["num_chapters"])
+        
+        self.book_order: List[str] = book_order
+        self.book_position: Dict[str, int] = {
+            book: pos for pos, book in enumerate(book_order)
+        }
+        self.chapter_prefix: List[int] = chapter_prefix
+        self.total_chapters: int = chapter_prefix[-1]
+        self.weight_prefixes: Dict[str, List[int]] = {}
+    
+    def global_position(self, book: str, chapter: int) -> int:
+        """
+        Converte (livro, capítulos lidos no livro) em número de capítulos lidos desde Gênesis.
+        
+        :param book: Livro atual.
+        :param chapter: Capítulos já lidos no livro.
+        :return: Posição global na sequência canônica.
+        """
+        pos = self.book_position[book]
+        num_chapters = self.chapter_prefix[pos + 1] - self.chapter_prefix[pos]
+        return self.chapter_prefix[pos] + min(max(chapter, 0), num_chapters)
+    
+    def locate(self, position: int) -> Tuple[str, int]:
+        """
+        Localiza o capítulo global `position` (a partir de 1) com uma busca binária.
+        
+        :param position: Número global do capítulo.
+        :return: Tupla (livro, capítulo).
+        """
+        if not 1 <= position <= self.total_chapters:
+            raise IndexError("Capítulo fora da Bíblia")
+        pos = bisect_right(self.chapter_prefix, position - 1) - 1
+        return self.book_order[pos], position - self.chapter_prefix[pos]
+    
+    def position_state(self, position: int) -> Tuple[str, int]:
+        """
+        Obtém o estado (livro, capítulo) salvo após ler `position` capítulos.
+        
+        :param position: Número de capítulos lidos desde Gênesis.
+        :return: Tupla (livro, último capítulo lido no livro).
+        """
+        if position <= 0:
+            return self.book_order[0], 0
+        return self.locate(min(position, self.total_chapters))
+    
+    def read_range(self, first: int, last: int) -> List[Dict[str, Union[str, List[int]]]]:
+        """
+        Agrupa por livro os capítulos globais de `first` até `last` (inclusive).
+        
+        :param first: Primeiro capítulo global.
+        :param last: Último capítulo global.
+        :return: Lista de dicionários com os livros e capítulos.
+        """
+        read_chapters = []
+        last = min(last, self.total_chapters)
+        if first > last:
+            return read_chapters
+        
+        pos = bisect_right(self.chapter_prefix, first - 1) - 1
+        while first <= last:
+            book_end = self.chapter_prefix[pos + 1]
+            if book_end >= first:
+                start = first - self.chapter_prefix[pos]
+                end = min(last, book_end) - self.chapter_prefix[pos]
+                read_chapters.append({
+                    "book": self.book_order[pos],
+                    "chapters": list(range(start, end + 1))
+                })
+                first = book_end + 1
+            pos += 1
+        return read_chapters
+    
+    def day_range(self, day: int, start: int = 0, nums_chapter: int = 4) -> Tuple[int, int]:
+        """
+        Calcula os capítulos globais do dia `day` de um plano.
+        
+        :param day: Dia do plano (a partir de 1).
+        :param start: Capítulos já lidos quando o plano começou.
+        :param nums_chapter: Número de capítulos por dia.
+        :return: Tupla (primeiro, último) capítulo global; vazia se first > last.
+        """
+        first = start + (day - 1) * nums_chapter + 1
+        last = min(start + day * nums_chapter, self.total_chapters)
+        return first, last
+    
+    def plan_for_day(self, day: int, start: int = 0, nums_chapter: int = 4) -> List[Dict[str, Union[str, List[int]]]]:
+        """
+        Obtém a leitura do dia `day` de um plano.
+        
+        :param day: Dia do plano (a partir de 1).
+        :param start: Capítulos já lidos quando o plano começou.
+        :param nums_chapter: Número de capítulos por dia.
+        :return: Lista de dicionários com os livros e capítulos a serem lidos.
+        """
+        return self.read_range(*self.day_range(day, start, nums_chapter))
+    
+    def plan_between(
+        self,
+        start_date: date,
+        end_date: date,
+        plan_start: date,
+        start: int = 0,
+        nums_chapter: int = 4
+    ) -> List[Dict[str, Union[str, List[int]]]]:
+        """
+        Obtém todos os capítulos lidos entre duas datas (inclusive).
+        
+        :param start_date: Primeira data.
+        :param end_date: Última data.
+        :param plan_start: Data do primeiro dia do plano.
+        :param start: Capítulos já lidos quando o plano começou.
+        :param nums_chapter: Número de capítulos por dia.
+        :return: Lista de dicionários com os livros e capítulos a serem lidos.
+        """
+        first_day = max((start_date - plan_start).days + 1, 1)
+        last_day = (end_date - plan_start).days + 1
+        if last_day < first_day:
+            return []
+        first, _ = self.day_range(first_day, start, nums_chapter)
+        _, last = self.day_range(last_day, start, nums_chapter)
+        return self.read_range(first, last)
+    
+    def chapter_weights(self, metric: str = "words") -> List[int]:
+        """
+        Obtém o peso de cada capítulo na ordem canônica, a partir do manifesto.
+        
+        :param metric: Uma das chaves de WEIGHT_METRICS.
+        :return: Lista em que o índice i é o peso do capítulo global i + 1.
+        """
+        if metric not in WEIGHT_METRICS:
+            raise ValueError(f"Peso desconhecido: {metric} (use {', '.join(WEIGHT_METRICS)})")
+        field_name = WEIGHT_METRICS[metric]
+        weights = []
+        for book in self.book_order:
+            for chapter in range(1, self.bible_books[book]["num_chapters"] + 1):
+                if field_name is None:
+                    weights.append(1)
+                    continue
+                entry = self.manifest.chapter_entry(book, chapter)
+                weights.append(getattr(entry, field_name) if entry is not None else 0)
+        return weights
+    
+    def weight_prefix(self, metric: str = "words") -> List[int]:
+        """
+        Obtém a soma acumulada dos pesos dos capítulos, calculada uma vez por métrica.
+        
+        :param metric: Uma das chaves de WEIGHT_METRICS.
+        :return: Lista em que o índice i é o peso dos i primeiros capítulos globais.
+        """
+        prefix = self.weight_prefixes.get(metric)
+        if prefix is None:
+            prefix = [0]
+            for weight in self.chapter_weights(metric):
+                prefix.append(prefix[-1] + weight)
+            self.weight_prefixes[metric] = prefix
+        return prefix
+    
+    def balanced_schedule(self, days: int, start: int = 0, metric: str = "words") -> List[int]:
         """
-        Carrega os livros de um testamento.
+        Divide os capítulos após `start` em dias de peso quase igual.
         
-        :param testament_book: Caminho do diretório do testamento.
-        :return: Dicionário de livros com seus capítulos e informações.
+        O fim de cada dia é o capítulo cuja soma acumulada fica mais perto da
+        fração do peso restante correspondente ao dia, encontrado por busca
+        binária na soma acumulada. Cada dia tem ao menos um capítulo.
+        
+        :param days: Número de dias para terminar a leitura.
+        :param start: Capítulos já lidos.
+        :param metric: Uma das chaves de WEIGHT_METRICS.
+        :return: Último capítulo global de cada dia.
+        """
+        prefix = self.weight_prefix(metric)
+        total = self.total_chapters
+        days = min(days, total - start)
+        base = prefix[start]
+        span = prefix[total] - base
+        
+        boundaries = []
+        previous = start
+        for day in range(1, days + 1):
+            target = base + span * day / days
+            end = bisect_left(prefix, target, previous + 1, total)
+            if end - 1 > previous and target - prefix[end - 1] < prefix[end] - target:
+                end -= 1
+            end = min(end, total - (days - day))
+            boundaries.append(end)
+            previous = end
+        return boundaries
+    
+    def plan_schedule(self, plan: str = DEFAULT_RECIPIENT) -> Tuple[int, ...]:
+        """
+        Obtém o cronograma balanceado salvo de um plano.
+        
+        :param plan: Plano de leitura.
+        :return: Último capítulo global de cada dia, ou tupla vazia se o plano lê um número fixo de capítulos.
+        """
+        schedule = self.state_store.get_schedule(plan)
+        return tuple(schedule[2]) if schedule is not None else ()
+    
+    def save_balanced_plan(self, days: int, plan: str = DEFAULT_RECIPIENT, metric: str = "words") -> List[int]:
+        """
+        Calcula e salva o cronograma para terminar a leitura de um plano em `days` dias.
+        
+        O cronograma é resolvido uma vez, a partir da posição atual do plano;
+        as leituras diárias apenas consultam os limites salvos.
+        
+        :param days: Número de dias para terminar a leitura.
+        :param plan: Plano de leitura.
+        :param metric: Uma das chaves de WEIGHT_METRICS.
+        :return: Último capítulo global de cada dia.
+        """
+        book, chapter, _ = self.current_state(plan)
+        start = self.global_position(book, chapter)
+        boundaries = self.balanced_schedule(days, start, metric)
+        self.state_store.save_schedule(metric, start, boundaries, plan)
+        return boundaries
+    
+    def source_signature(self) -> str:
+        """
+        Obtém a assinatura do conteúdo de todos os capítulos.
+        
+        :return: Assinatura usada para detectar pacotes desatualizados.
+        """
+        return self.manifest.digest
+    
+    def reading_signature(
+        self,
+        read_chapters: List[Dict[str, Union[str, List[int]]]],
+        translation: Optional[str] = None
+    ) -> str:
+        """
+        Obtém a assinatura do conteúdo dos capítulos de uma leitura, que muda
+        apenas quando algum desses capítulos muda.
+        
+        :param read_chapters: Lista de dicionários com os livros e capítulos.
+        :param translation: Tradução; nas demais traduções, qualquer mudança nela muda a assinatura.
+        :return: Hash dos hashes dos capítulos.
+        """
+        digest = hashlib.sha256()
+        if translation is not None and translation != DEFAULT_TRANSLATION:
+            store = self.translation_store
+            digest.update(f"{translation}:{store.signature(translation) if store else ''}\n".encode("UTF-8"))
+        for reading in read_chapters:
+            for chapter in reading["chapters"]:
+                chapter_hash = self.manifest.chapter_hash(reading["book"], chapter) or ""
+                digest.update(f"{reading['book']}:{chapter}:{chapter_hash}\n".encode("UTF-8"))
+        return digest.hexdigest()
+    
+    def build_pack(self) -> None:
+        """
+        Compila os capítulos carregados dos diretórios em um único arquivo empacotado.
+        """
+        write_pack(
+            self.pack_path,
+            self.bible_dir,
+            self.bible_books,
+            self.source_signature(),
+            self.source_encoding
+        )
+    
+    def read_chapter(self, book: str, chapter: str) -> Optional[Union[bytes, memoryview]]:
+        """
+        Lê o conteúdo bruto de um capítulo.
+        
+        Com o pacote carregado, retorna uma fatia do mmap sem cópia; caso contrário,
+        lê o arquivo do capítulo.
+        
+        :param book: Abreviação do livro.
+        :param chapter: Número do capítulo como aparece em `chapters`.
+        :return: Bytes do capítulo ou None se não existir.
+        """
+        if self.pack is not None:
+            return self.pack.chapter(book, chapter)
+        
+        book_data = self.bible_books.get(book, None)
+        if book_data is None:
+            return None
+        chapter_path = book_data["chapters"].get(chapter, None)
+        if chapter_path is None or not os.path.exists(chapter_path):
+            return None
+        with open(chapter_path, "rb") as file:
+            return file.read()
+    
+    def load_chapter_text(self, book: str, chapter: str) -> Optional[str]:
+        """
+        Lê e decodifica um capítulo sem passar pelo cache.
+        
+        :param book: Abreviação do livro.
+        :param chapter: Número do capítulo como aparece em `chapters`.
+        :return: Texto do capítulo normalizado em NFC ou None se não existir.
+        """
+        with metrics.span("chapter_load"):
+            raw = self.read_chapter(book, chapter)
+            if raw is None:
+                return None
+            encoding = self.pack.encoding if self.pack is not None else self.source_encoding
+            return decode_chapter(raw, encoding)
+    
+    def get_chapter_text(self, book: str, chapter: str, translation: Optional[str] = None) -> Optional[str]:
+        """
+        Obtém o texto de um capítulo pelo cache LRU.
+        
+        :param book: Abreviação do livro.
+        :param chapter: Número do capítulo como aparece em `chapters`.
+        :param translation: Tradução; por padrão, a dos arquivos em `bible/`.
+        :return: Texto do capítulo ou None se não existir.
+        """
+        if translation is None or translation == DEFAULT_TRANSLATION:
+            return self.chapter_cache.get(book, chapter)
+        store = self.translation_store
+        if store is None:
+            raise ValueError(f"Tradução não encontrada: {translation}")
+        return store.chapter_text(translation, book, int(chapter))
+    
+    def open_translation_store(self) -> Optional[TranslationStore]:
+        """
+        Abre o arquivo de traduções no primeiro acesso a `translation_store`.
+        
+        :return: Arquivo de traduções ou None se ainda não foi gerado.
         """
-        books = {}
+        with self.corpus_lock:
+            if "translation_store" not in self.__dict__:
+                self.translation_store: Optional[TranslationStore] = TranslationStore.open_if_valid(self.store_path)
+            return self.translation_store
+    
+    def translations(self) -> List[str]:
+        """
+        Obtém as traduções disponíveis.
+        
+        :return: A tradução padrão seguida das traduções do arquivo de traduções.
+        """
+        store = self.translation_store
+        extra = store.translations if store is not None else []
+        return [DEFAULT_TRANSLATION] + [name for name in extra if name != DEFAULT_TRANSLATION]
+    
+    def translation_manifests(self) -> Dict[str, CorpusManifest]:
+        """
+        Valida os arquivos da tradução padrão e das pastas em `bible/translations/`.
         
-        for book in os.listdir(testament_book):
-            book_path = os.path.join(testament_book, book)
-            if os.path.isdir(book_path):
-                chapters = self.chapters_list_filter(
-                    sorted(os.listdir(book_path)),
-                    book_path
+        :return: Manifesto de cada tradução.
+        """
+        manifests = {DEFAULT_TRANSLATION: self.manifest}
+        if os.path.isdir(self.translations_dir):
+            for name in sorted(os.listdir(self.translations_dir)):
+                translation_dir = os.path.join(self.translations_dir, name)
+                if not os.path.isdir(translation_dir) or name == DEFAULT_TRANSLATION:
+                    continue
+                manifest = CorpusManifest(
+                    translation_dir,
+                    [os.path.join(translation_dir, testament) for testament in TESTAMENT_DIR_NAMES],
+                    os.path.join(translation_dir, MANIFEST_FILE_NAME),
+                    resolve_book,
+                    BOOK_CHAPTERS
                 )
-                book_pattern = re.compile(r"^\d+\s(.+)$")
-                match = book_pattern.match(book)
-                if match:
-                    book = match.group(1)
-                
-                book_abbrev = BOOK_ABBREVIATIONS.get(book, book)
-                books[book_abbrev] = {
-                    "chapters": chapters,
-                    "book": book,
-                    "num_chapters": len(chapters)
-                }
-        return books
+                report = manifest.scan(self.source_encoding)
+                if report.rehashed and report.has_problems:
+                    print(f"[{name}] {report.summary(unmapped=False)}", file=sys.stderr)
+                manifests[name] = manifest
+        return manifests
     
+    def build_translation_store(self) -> Dict[str, int]:
+        """
+        Compila todas as traduções em `bible/translations.store`, com cada capítulo
+        em um bloco comprimido e um índice de capítulos compartilhado.
+        
+        :return: Tamanho comprimido de cada tradução, em bytes.
+        """
+        chapters = [
+            (book, chapter)
+            for book in CANONICAL_ORDER
+            for chapter in range(1, BOOK_CHAPTERS[book] + 1)
+        ]
+        previous = TranslationStore.open_if_valid(self.store_path)
+        try:
+            sizes = write_store(self.store_path, chapters, self.translation_manifests(), self.source_encoding, previous)
+        finally:
+            if previous is not None:
+                previous.close()
+        with self.corpus_lock:
+            store = self.__dict__.pop("translation_store", None)
+            if store is not None:
+                store.close()
+        return sizes
+        
     def get_next_book(self, current_book: str) -> Union[str, None]:
         """
         Obtém o próximo livro na sequência da Bíblia.
@@ -150,84 +669,136 @@ class BibleManager:
         :param current_book: Livro atual.
         :return: Próximo livro ou None se não houver mais livros.
         """
-        books = list(self.bible_books.keys())
-        current_index = books.index(current_book)
-        if current_index + 1 < len(books):
-            return books[current_index + 1]
+        current_index = self.book_position[current_book]
+        if current_index + 1 < len(self.book_order):
+            return self.book_order[current_index + 1]
         return None
     
-    def save_current_state(self, book: str, chapter: int, finished: bool) -> None:
+    def save_current_state(
+        self,
+        book: str,
+        chapter: int,
+        finished: bool,
+        recipient: str = DEFAULT_RECIPIENT
+    ) -> None:
         """
         Salva o estado atual da leitura.
         
         :param book: Livro atual.
         :param chapter: Capítulo atual.
         :pram finished: Indica se a leitura foi concluída.
+        :param recipient: Destinatário da leitura.
         """
-        with open(self.last_chapter, "w", encoding="UTF-8") as file:
-            json.dump(
-                {"last_book": book, "last_chapter": chapter, "finished": finished},
-                file,
-                ensure_ascii=False
-            )
+        self.state_store.save_position(book, chapter, finished, recipient)
         
-    def daily_read_chapter(self, was_sent: bool = False) -> List[Dict[str, Union[str, List[int]]]]:
+    def current_state(self, recipient: str = DEFAULT_RECIPIENT) -> Tuple[str, int, bool]:
         """
-        Obtém a leitura diária dos capítulos da Bíblia.
+        Obtém o estado salvo da leitura de um destinatário.
         
-        :param was_sent: Indica se a mensagem foi enviada.
-        :return: Lista de dicionários com os livros e capítulos a serem lidos.
+        :param recipient: Destinatário da leitura.
+        :return: Tupla (livro, capítulo, concluído); início de Gênesis se não houver estado.
         """
+        position = self.state_store.get_position(recipient)
+        if position is not None:
+            return position
+        return "Gn", 0, False
+    
+    def reading_after(
+        self,
+        book: str,
+        chapter: int,
+        finished: bool,
+        nums_chapter: int = 4,
+        schedule: Sequence[int] = ()
+    ) -> Tuple[List[Dict[str, Union[str, List[int]]]], Tuple[str, int, bool]]:
+        """
+        Calcula a leitura que segue um estado e o estado após lê-la.
         
+        :param book: Livro atual.
+        :param chapter: Capítulos já lidos no livro.
+        :param finished: Indica se a leitura foi concluída.
+        :param nums_chapter: Número de capítulos por dia.
+        :param schedule: Cronograma balanceado (último capítulo global de cada dia);
+            a leitura vai até o primeiro limite após a posição atual. Vazio para
+            ler `nums_chapter` capítulos.
+        :return: Tupla (lista de livros e capítulos, (livro, capítulo, concluído)).
+        """
         read_chapters = []
         
-        if os.path.exists(self.last_chapter):
-            with open(self.last_chapter, 'r', encoding="UTF-8") as file:
-                last_data = json.load(file)
+        with metrics.span("plan_compute"):
+            if book and chapter is not None:
+                if book not in self.book_position:
+                    raise ValueError("Livro não encontrado na Bíblia")
                 
-                book: str = last_data.get("last_book", None)
-                chapter: int = last_data.get("last_chapter", None)
-                finished: bool = last_data.get("finished", False)
-        else:
-            book = "Gn"
-            chapter = 0
-            finished = False
-            
-        if book and chapter is not None:
-            bible_book = self.bible_books.get(book, None)
-            
-            if bible_book is None:
-                raise ValueError("Livro não encontrado na Bíblia")
-            
-            nums_chapter = 4 # Numero de capítulos por dia
-            daily_range = []
-            
-            while nums_chapter > 0:
-                remaining_chapters = bible_book["num_chapters"] - chapter
-                if remaining_chapters >= nums_chapter:
-                    daily_range = list(range(chapter + 1, chapter + nums_chapter + 1))
-                    if daily_range:
-                        read_chapters.append({"book": book, "chapters": daily_range})
-                        
-                    chapter += nums_chapter
-                    nums_chapter = 0
-                else:
-                    daily_range = list(range(chapter + 1, bible_book["num_chapters"] + 1))
-                    if daily_range:
-                        read_chapters.append({"book": book, "chapters": daily_range})
-                    
-                    nums_chapter -= remaining_chapters
-                    chapter = 0
-                    book = self.get_next_book(book)
-                    if book is None:
-                        finished = True
-                        break
-                    bible_book = self.bible_books[book]
-                    
-            if was_sent:
-                self.save_current_state(book, chapter, finished)
+                position = self.global_position(book, chapter)
+                index = bisect_right(schedule, position)
+                last = schedule[index] if index < len(schedule) else position + nums_chapter
+                last = min(last, self.total_chapters)
+                read_chapters = self.read_range(position + 1, last)
+                
+                if last >= self.total_chapters:
+                    finished = True
+                book, chapter = self.position_state(last)
             
-            return read_chapters
+        return read_chapters, (book, chapter, finished)
+    
+    def next_reading(
+        self,
+        recipient: str = DEFAULT_RECIPIENT
+    ) -> Tuple[List[Dict[str, Union[str, List[int]]]], Tuple[str, int, bool]]:
+        """
+        Calcula a próxima leitura diária e o estado após lê-la, sem salvar.
+        
+        :param recipient: Destinatário da leitura.
+        :return: Tupla (lista de livros e capítulos, (livro, capítulo, concluído)).
+        """
+        return self.reading_after(*self.current_state(recipient), schedule=self.plan_schedule(recipient))
+    
+    def upcoming_readings(
+        self,
+        days: int,
+        recipient: str = DEFAULT_RECIPIENT,
+        state: Optional[Tuple[str, int, bool]] = None,
+        nums_chapter: int = 4,
+        schedule: Optional[Sequence[int]] = None
+    ) -> List[Tuple[List[Dict[str, Union[str, List[int]]]], Tuple[str, int, bool]]]:
+        """
+        Calcula as leituras dos próximos dias, supondo que cada dia seja enviado.
+        
+        :param days: Número de dias.
+        :param recipient: Destinatário da leitura.
+        :param state: Estado inicial; por padrão, o estado salvo do destinatário.
+        :param nums_chapter: Número de capítulos por dia.
+        :param schedule: Cronograma balanceado; por padrão, o salvo para o destinatário.
+        :return: Lista de tuplas como as de `next_reading`, uma por dia, até o fim da Bíblia.
+        """
+        readings = []
+        if state is None:
+            state = self.current_state(recipient)
+        if schedule is None:
+            schedule = self.plan_schedule(recipient)
+        for _ in range(days):
+            read_chapters, state = self.reading_after(*state, nums_chapter, schedule)
+            if not read_chapters:
+                break
+            readings.append((read_chapters, state))
+        return readings
+    
+    def daily_read_chapter(
+        self,
+        was_sent: bool = False,
+        recipient: str = DEFAULT_RECIPIENT
+    ) -> List[Dict[str, Union[str, List[int]]]]:
+        """
+        Obtém a leitura diária dos capítulos da Bíblia.
+        
+        :param was_sent: Indica se a mensagem foi enviada.
+        :param recipient: Destinatário da leitura.
+        :return: Lista de dicionários com os livros e capítulos a serem lidos.
+        """
+        read_chapters, (book, chapter, finished) = self.next_reading(recipient)
+        if was_sent and book:
+            self.save_current_state(book, chapter, finished, recipient)
         return read_chapters
 
 
@@ -0,0 +1,175 @@
+import os
+import json
+import mmap
+import struct
+from typing import Dict, List, Optional, Tuple, Union
+
+from chapter_cache import decode_chapter
+
+# Formato do arquivo empacotado:
+#   MAGIC | tamanho do cabeçalho (u32) | cabeçalho JSON | tabela de offsets | textos
+# A tabela de offsets tem uma entrada (offset, tamanho) por capítulo, na mesma
+# ordem em que os capítulos aparecem no cabeçalho. Os textos são gravados já
+# transcodificados para UTF-8 (NFC), independentemente da codificação de origem.
+PACK_MAGIC = b"BRNPACK\x01"
+PACK_VERSION = 4
+PACK_ENCODING = "UTF-8"
+PACK_FILE_NAME = "bible.pack"
+
+_HEADER_LEN = struct.Struct("<I")
+_OFFSET_ENTRY = struct.Struct("<II")
+
+
+def write_pack(
+    pack_path: str,
+    bible_dir: str,
+    books: Dict[str, Dict[str, Union[str, int, Dict[str, str]]]],
+    signature: str,
+    source_encoding: Optional[str] = None
+) -> None:
+    """
+    Compila os capítulos dos livros em um único arquivo empacotado.
+
+    :param pack_path: Caminho do arquivo de saída.
+    :param bible_dir: Diretório base da Bíblia (caminhos são salvos relativos a ele).
+    :param books: Livros no formato de `BibleManager.bible_books`.
+    :param signature: Assinatura do conteúdo (`CorpusManifest.digest`).
+    :param source_encoding: Codificação dos arquivos; se None, é detectada por arquivo.
+    """
+    header_books = []
+    bodies: List[bytes] = []
+
+    for abbrev, book_data in books.items():
+        chapters = []
+        for chapter_num, chapter_path in book_data["chapters"].items():
+            with open(chapter_path, "rb") as file:
+                text = decode_chapter(file.read(), source_encoding)
+            bodies.append(text.encode(PACK_ENCODING))
+            chapters.append([chapter_num, os.path.relpath(chapter_path, bible_dir)])
+        header_books.append({
+            "abbrev": abbrev,
+            "book": book_data["book"],
+            "chapters": chapters
+        })
+
+    header = json.dumps(
+        {
+            "version": PACK_VERSION,
+            "signature": signature,
+            "encoding": PACK_ENCODING,
+            "books": header_books
+        },
+        ensure_ascii=False
+    ).encode("UTF-8")
+
+    offset = len(PACK_MAGIC) + _HEADER_LEN.size + len(header) + _OFFSET_ENTRY.size * len(bodies)
+    table = bytearray()
+    for body in bodies:
+        table += _OFFSET_ENTRY.pack(offset, len(body))
+        offset += len(body)
+
+    tmp_path = pack_path + ".tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(PACK_MAGIC)
+        file.write(_HEADER_LEN.pack(len(header)))
+        file.write(header)
+        file.write(table)
+        for body in bodies:
+            file.write(body)
+    os.replace(tmp_path, pack_path)
+
+
+class BiblePack:
+    """
+    Leitor do arquivo empacotado, mapeado em memória.
+
+    Os capítulos são retornados como `memoryview` sobre o mmap, sem cópia.
+    """
+
+    def __init__(self, pack_path: str) -> None:
+        self.pack_path = pack_path
+        self._file = open(pack_path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise
+        self._view = memoryview(self._mmap)
+
+        if bytes(self._view[:len(PACK_MAGIC)]) != PACK_MAGIC:
+            self.close()
+            raise ValueError(f"Arquivo de pacote inválido: {pack_path}")
+
+        pos = len(PACK_MAGIC)
+        (header_len,) = _HEADER_LEN.unpack_from(self._mmap, pos)
+        pos += _HEADER_LEN.size
+        self.header = json.loads(bytes(self._view[pos:pos + header_len]).decode("UTF-8"))
+        pos += header_len
+
+        self.signature: str = self.header.get("signature", "")
+        self.encoding: str = self.header.get("encoding", PACK_ENCODING)
+        self._index: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        for book in self.header["books"]:
+            for chapter_num, _ in book["chapters"]:
+                self._index[(book["abbrev"], chapter_num)] = _OFFSET_ENTRY.unpack_from(self._mmap, pos)
+                pos += _OFFSET_ENTRY.size
+
+    @classmethod
+    def open_if_fresh(cls, pack_path: str, signature: str) -> Optional["BiblePack"]:
+        """
+        Abre o pacote somente se ele existir e corresponder à assinatura atual.
+
+        :param pack_path: Caminho do arquivo empacotado.
+        :param signature: Assinatura atual do conteúdo (`CorpusManifest.digest`).
+        :return: Instância de `BiblePack` ou None se ausente, inválido ou desatualizado.
+        """
+        if not os.path.exists(pack_path):
+            return None
+        try:
+            pack = cls(pack_path)
+        except (OSError, ValueError, KeyError, struct.error):
+            return None
+        if pack.header.get("version") != PACK_VERSION or pack.signature != signature:
+            pack.close()
+            return None
+        return pack
+
+    def chapter(self, book: str, chapter: str) -> Optional[memoryview]:
+        """
+        Retorna o conteúdo bruto de um capítulo sem copiar os bytes.
+
+        :param book: Abreviação do livro.
+        :param chapter: Número do capítulo como aparece em `chapters`.
+        :return: `memoryview` do capítulo ou None se não existir.
+        """
+        entry = self._index.get((book, chapter))
+        if entry is None:
+            return None
+        offset, length = entry
+        return self._view[offset:offset + length]
+
+    def close(self) -> None:
+        """
+        Libera o mmap e fecha o arquivo.
+        """
+        self._view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Ainda existem capítulos referenciados; o mmap é liberado com eles.
+            pass
+        self._file.close()
+
+
+if __name__ == "__main__":
+    from bible_manager import BibleManager
+
+    from search_index import update_index
+
+    bible_manager = BibleManager(use_pack=False)
+    bible_manager.build_pack()
+    print(f"Pacote gerado em: {bible_manager.pack_path}")
+    search_index = update_index(bible_manager)
+    print(f"Índice de busca gerado em: {search_index.index_path}")
+    for name, size in bible_manager.build_translation_store().items():
+        print(f"Tradução {name}: {size / 1024 / 1024:.1f} MB em {bible_manager.store_path}")
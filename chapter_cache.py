@@ -0,0 +1,218 @@
+import re
+import unicodedata
+from array import array
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Dict, Optional, Tuple, Union
+
+from metrics import metrics
+
+# Os arquivos de capítulo são majoritariamente Windows-1252; alguns estão em UTF-8.
+FALLBACK_ENCODING = "cp1252"
+
+# Linha de versículo: número, espaço e texto ("16 Porque Deus tanto amou...")
+VERSE_NUMBER_PATTERN = re.compile(r"^(\d+)\s")
+# Títulos e subtítulos em negrito/itálico do WhatsApp ("*João 3*", "*_O Encontro..._*")
+HEADING_PATTERN = re.compile(r"^\*.*\*$")
+
+
+def decode_chapter(raw: Union[bytes, memoryview], encoding: Optional[str] = None) -> str:
+    """
+    Decodifica o texto de um capítulo e normaliza para NFC.
+
+    :param raw: Bytes do capítulo.
+    :param encoding: Codificação declarada; se None, tenta UTF-8 e depois Windows-1252.
+    :return: Texto decodificado.
+    """
+    if encoding is not None:
+        text = str(raw, encoding)
+    else:
+        try:
+            text = str(raw, "utf-8-sig")
+        except UnicodeDecodeError:
+            try:
+                text = str(raw, FALLBACK_ENCODING)
+            except UnicodeDecodeError:
+                text = str(raw, "latin-1")
+    return unicodedata.normalize("NFC", text)
+
+
+class ChapterCache:
+    """
+    Cache LRU de capítulos já decodificados, limitado pelo total de caracteres.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str, str], Optional[str]],
+        max_size: int = 2 * 1024 * 1024
+    ) -> None:
+        """
+        Inicializa o cache.
+
+        :param loader: Função que carrega e decodifica um capítulo (livro, capítulo).
+        :param max_size: Número máximo de caracteres mantidos em cache.
+        """
+        self.loader = loader
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, book: str, chapter: str) -> Optional[str]:
+        """
+        Obtém o texto de um capítulo, carregando-o apenas na primeira vez.
+
+        :param book: Abreviação do livro.
+        :param chapter: Número do capítulo como aparece em `chapters`.
+        :return: Texto do capítulo ou None se não existir.
+        """
+        key = (book, chapter)
+        with self._lock:
+            text = self._entries.get(key)
+            if text is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                metrics.incr("chapter_cache_hits")
+                return text
+            self.misses += 1
+        metrics.incr("chapter_cache_misses")
+
+        text = self.loader(book, chapter)
+        if text is None:
+            return None
+
+        with self._lock:
+            if key not in self._entries and len(text) <= self.max_size:
+                self._entries[key] = text
+                self.size += len(text)
+                while self.size > self.max_size:
+                    _, evicted = self._entries.popitem(last=False)
+                    self.size -= len(evicted)
+        return text
+
+    def discard(self, book: str, chapter: str) -> None:
+        """
+        Remove um capítulo do cache, se presente.
+
+        :param book: Abreviação do livro.
+        :param chapter: Número do capítulo como aparece em `chapters`.
+        """
+        with self._lock:
+            text = self._entries.pop((book, chapter), None)
+            if text is not None:
+                self.size -= len(text)
+
+    def clear(self) -> None:
+        """
+        Remove todos os capítulos do cache.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Obtém os contadores do cache.
+
+        :return: Dicionário com acertos, faltas, entradas e tamanho.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "size": self.size,
+            }
+
+
+class ChapterVerses:
+    """
+    Posições dos versículos no texto de um capítulo.
+
+    Guarda apenas dois arrays de offsets indexados pelo número do versículo; o
+    texto continua no cache de capítulos e os versículos são fatias dele. O
+    índice 0 corresponde ao título do capítulo. Versículos ausentes têm início
+    e fim iguais.
+    """
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, starts: array, ends: array) -> None:
+        self.starts = starts
+        self.ends = ends
+
+    @classmethod
+    def parse(cls, text: str) -> "ChapterVerses":
+        """
+        Localiza os versículos do texto de um capítulo.
+
+        Linhas sem número continuam o versículo anterior; títulos entre
+        versículos não pertencem a nenhum deles. Se um número se repetir, vale
+        a última ocorrência.
+
+        :param text: Texto do capítulo.
+        :return: Posições dos versículos.
+        """
+        starts = array("I", [0])
+        ends = array("I", [0])
+        current = 0
+        pos = 0
+        for line in text.split("\n"):
+            content = line.rstrip()
+            end = pos + len(content)
+            match = VERSE_NUMBER_PATTERN.match(content)
+            if match:
+                current = int(match.group(1))
+                if current >= len(starts):
+                    missing = current + 1 - len(starts)
+                    starts.extend([0] * missing)
+                    ends.extend([0] * missing)
+                starts[current] = pos
+                ends[current] = end
+            elif content and (current == 0 or not HEADING_PATTERN.match(content)):
+                ends[current] = end
+            pos += len(line) + 1
+        return cls(starts, ends)
+
+    @property
+    def last_verse(self) -> int:
+        """
+        :return: Número do último versículo.
+        """
+        return len(self.starts) - 1
+
+    def verse(self, text: str, number: int) -> Optional[str]:
+        """
+        :param text: Texto do capítulo usado em `parse`.
+        :param number: Número do versículo.
+        :return: Texto do versículo, com o número, ou None se não existir.
+        """
+        if not 1 <= number < len(self.starts) or self.starts[number] == self.ends[number]:
+            return None
+        return text[self.starts[number]:self.ends[number]]
+
+    def passage(self, text: str, first: int, last: int) -> str:
+        """
+        Obtém um trecho contínuo do capítulo, com os subtítulos entre os versículos.
+
+        :param text: Texto do capítulo usado em `parse`.
+        :param first: Primeiro versículo.
+        :param last: Último versículo (inclusivo).
+        :return: Texto do trecho.
+        """
+        first = max(first, 1)
+        last = min(last, self.last_verse)
+        while first <= last and self.starts[first] == self.ends[first]:
+            first += 1
+        while last >= first and self.starts[last] == self.ends[last]:
+            last -= 1
+        if first > last:
+            return ""
+        if self.starts[first] <= self.starts[last]:
+            return text[self.starts[first]:self.ends[last]]
+        # Versículos fora de ordem no arquivo: junta um a um
+        verses = (self.verse(text, number) for number in range(first, last + 1))
+        return "\n\n".join(verse for verse in verses if verse is not None)
@@ -0,0 +1,301 @@
+import argparse
+import math
+import sys
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from controller import Controller
+from message_composer import format_chapters
+from state_store import DEFAULT_RECIPIENT, StateStore
+from translation_store import DEFAULT_TRANSLATION
+
+# Pace of the fixed plan, used as the default length of a balanced plan
+CHAPTERS_PER_DAY = 4
+
+# The controller imports the browser stack (Selenium) only when it connects to
+# WhatsApp, so every command but `send` and `run` starts without it.
+
+
+def next_send_day(store: StateStore, plan: str, today: Optional[date] = None) -> date:
+    """
+    Returns the day of the plan's next send: today, unless it was already sent.
+
+    Args:
+        store (StateStore): The state store.
+        plan (str): Reading plan.
+        today (Optional[date]): Reference day; the current date by default.
+
+    Returns:
+        date: Day of the next send.
+    """
+    today = today or datetime.today().date()
+    return today + timedelta(days=1) if store.was_completed(today, plan) else today
+
+
+def command_plan(args: argparse.Namespace) -> int:
+    """
+    Prints the readings of the next days.
+
+    Args:
+        args (argparse.Namespace): Parsed arguments (`days`, `plan`).
+
+    Returns:
+        int: Exit status.
+    """
+    controller = Controller()
+    bible_manager = controller.bible_manager
+    first_day = next_send_day(controller.state_store, args.plan)
+    readings = bible_manager.upcoming_readings(args.days, args.plan)
+    if not readings:
+        print("Reading plan finished.")
+    for offset, (books_chapters, _) in enumerate(readings):
+        day = first_day + timedelta(days=offset)
+        books = "; ".join(
+            f"{bible_manager.bible_books[reading['book']]['book']} {format_chapters(reading['chapters'])}"
+            for reading in books_chapters
+        )
+        print(f"{day.strftime('%d/%m/%Y')}: {books}")
+    return 0
+
+
+def command_preview(args: argparse.Namespace) -> int:
+    """
+    Prints the messages of the plan's next send without sending them, in
+    each translation its recipients receive.
+
+    Args:
+        args (argparse.Namespace): Parsed arguments (`plan`).
+
+    Returns:
+        int: Exit status.
+    """
+    controller = Controller()
+    day = next_send_day(controller.state_store, args.plan)
+    books_chapters, _ = controller.bible_manager.next_reading(args.plan)
+    # One preview per translation the plan's recipients receive
+    recipient_translations = controller.recipient_translations()
+    translations = sorted({
+        recipient_translations[recipient]
+        for recipient, plan in controller.recipient_plans().items()
+        if plan == args.plan
+    }) or [DEFAULT_TRANSLATION]
+    for translation in translations:
+        if len(translations) > 1:
+            print(f"=== {translation} ===")
+        messages = controller.compose_daily_messages(books_chapters, day, translation)
+        for index, message in enumerate(messages, start=1):
+            print(f"--- {index}/{len(messages)} ({len(message)} characters) ---")
+            print(message)
+    return 0
+
+
+def command_read(args: argparse.Namespace) -> int:
+    """
+    Prints the verses of a reference, e.g. "Jo 3:16-18; Sl 23".
+
+    Args:
+        args (argparse.Namespace): Parsed arguments (`reference`).
+
+    Returns:
+        int: Exit status; 2 if the reference is invalid.
+    """
+    from verse_index import VerseIndex
+
+    verse_index = VerseIndex(Controller().bible_manager)
+    try:
+        passages = verse_index.passages(args.reference)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    for verse_range, text in passages:
+        print(f"*{verse_index.label(verse_range)}*")
+        print()
+        print(text)
+        print()
+    return 0
+
+
+def command_search(args: argparse.Namespace) -> int:
+    """
+    Prints the verses matching a full-text query, e.g. `amor "filho unigênito" salv*`.
+
+    Args:
+        args (argparse.Namespace): Parsed arguments (`query`, `limit`).
+
+    Returns:
+        int: Exit status.
+    """
+    from search_index import update_index
+    from verse_index import VerseIndex
+
+    bible_manager = Controller().bible_manager
+    search_index = update_index(bible_manager)
+    results = search_index.search(args.query)
+    verse_index = VerseIndex(bible_manager)
+    for book, chapter, verse in results[:args.limit]:
+        text, verses = verse_index.chapter(book, chapter)
+        print(f"{bible_manager.bible_books[book]['book']} {chapter}:{verse}  {verses.verse(text, verse)}")
+    print(f"{len(results)} verses")
+    return 0
+
+
+def command_balance(args: argparse.Namespace) -> int:
+    """
+    Solves and stores a schedule that finishes the plan in N days of near-equal weight.
+
+    Args:
+        args (argparse.Namespace): Parsed arguments (`plan`, `days`, `metric`, `clear`).
+
+    Returns:
+        int: Exit status.
+    """
+    controller = Controller()
+    bible_manager = controller.bible_manager
+    if args.clear:
+        controller.state_store.delete_schedule(args.plan)
+        print(f"[{args.plan}] back to {CHAPTERS_PER_DAY} chapters per day")
+        return 0
+
+    book, chapter, _ = bible_manager.current_state(args.plan)
+    start = bible_manager.global_position(book, chapter)
+    total = bible_manager.total_chapters
+    if start >= total:
+        print("Reading plan finished.")
+        return 0
+    days = args.days or math.ceil((total - start) / CHAPTERS_PER_DAY)
+    boundaries = bible_manager.save_balanced_plan(days, args.plan, args.metric)
+
+    prefix = bible_manager.weight_prefix(args.metric)
+    balanced = [prefix[end] - prefix[begin] for begin, end in zip([start] + boundaries, boundaries)]
+    fixed = [prefix[min(begin + CHAPTERS_PER_DAY, total)] - prefix[begin] for begin in range(start, total, CHAPTERS_PER_DAY)]
+    print(f"[{args.plan}] {len(boundaries)} days from {book} {chapter}, weighted by {args.metric}")
+    for name, loads in (("balanced", balanced), (f"{CHAPTERS_PER_DAY} chapters/day", fixed)):
+        print(f"  {name}: {len(loads)} days, min {min(loads)}, max {max(loads)}, mean {sum(loads) / len(loads):.0f}")
+    return 0
+
+
+def command_status(args: argparse.Namespace) -> int:
+    """
+    Prints the position and last send of each plan in use.
+
+    Args:
+        args (argparse.Namespace): Parsed arguments.
+
+    Returns:
+        int: Exit status.
+    """
+    controller = Controller()
+    store = controller.state_store
+    today = datetime.today().date()
+    plans = {}
+    for recipient, plan in controller.recipient_plans().items():
+        plans.setdefault(plan, []).append(recipient)
+    for plan, recipients in plans.items():
+        book, chapter, finished = controller.bible_manager.current_state(plan)
+        last_sent = store.last_completed_day(plan)
+        print(f"[{plan}] {', '.join(recipients)}")
+        print(f"  position: {book} {chapter}{' (finished)' if finished else ''}")
+        schedule = store.get_schedule(plan)
+        if schedule is not None:
+            metric, _, boundaries = schedule
+            print(f"  schedule: {len(boundaries)} days balanced by {metric}")
+        print(f"  last sent: {last_sent.isoformat() if last_sent else 'never'}")
+        print(f"  sent today: {'yes' if store.was_completed(today, plan) else 'no'}")
+    return 0
+
+
+def command_send(args: argparse.Namespace) -> int:
+    """
+    Sends today's reading, like the scheduled job.
+
+    Args:
+        args (argparse.Namespace): Parsed arguments.
+
+    Returns:
+        int: Exit status.
+    """
+    controller = Controller()
+    controller.send_daily_message()
+    return 0
+
+
+def command_run(args: argparse.Namespace) -> int:
+    """
+    Runs the daily send and pre-render jobs until interrupted.
+
+    Args:
+        args (argparse.Namespace): Parsed arguments.
+
+    Returns:
+        int: Exit status.
+    """
+    controller = Controller()
+    try:
+        controller.schedule_daily_task()
+    except KeyboardInterrupt:
+        controller.scheduler.stop()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Builds the argument parser.
+
+    Returns:
+        argparse.ArgumentParser: Parser with the `plan`, `preview`, `read`, `search`, `balance`, `status`, `send` and `run` subcommands.
+    """
+    parser = argparse.ArgumentParser(description="Bible reading notifier.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    plan = commands.add_parser("plan", help="Show the readings of the next days")
+    plan.add_argument("--days", type=int, default=7)
+    plan.add_argument("--plan", default=DEFAULT_RECIPIENT, help="Reading plan")
+    plan.set_defaults(func=command_plan)
+
+    preview = commands.add_parser("preview", help="Show the next messages without sending them")
+    preview.add_argument("--plan", default=DEFAULT_RECIPIENT, help="Reading plan")
+    preview.set_defaults(func=command_preview)
+
+    read = commands.add_parser("read", help="Show the verses of a reference")
+    read.add_argument("reference", help='e.g. "Jo 3:16-18; Sl 23"')
+    read.set_defaults(func=command_read)
+
+    search = commands.add_parser("search", help="Find the verses that mention words or phrases")
+    search.add_argument("query", help='e.g. amor "filho unigênito" salv*')
+    search.add_argument("--limit", type=int, default=20)
+    search.set_defaults(func=command_search)
+
+    balance = commands.add_parser("balance", help="Store a plan that finishes in N days of equal reading time")
+    balance.add_argument("--plan", default=DEFAULT_RECIPIENT, help="Reading plan")
+    balance.add_argument("--days", type=int, help="Days to finish; by default the pace of the fixed plan")
+    balance.add_argument("--metric", choices=("words", "verses", "bytes", "chapters"), default="words")
+    balance.add_argument("--clear", action="store_true", help="Go back to a fixed number of chapters per day")
+    balance.set_defaults(func=command_balance)
+
+    status = commands.add_parser("status", help="Show the position and last send of each plan")
+    status.set_defaults(func=command_status)
+
+    send = commands.add_parser("send", help="Send today's reading now")
+    send.set_defaults(func=command_send)
+
+    run = commands.add_parser("run", help="Keep running and send each day's reading on schedule")
+    run.set_defaults(func=command_run)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Runs the CLI.
+
+    Args:
+        argv (Optional[List[str]]): Arguments; `sys.argv[1:]` by default.
+
+    Returns:
+        int: Exit status.
+    """
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
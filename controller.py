@@ -1,13 +1,19 @@
 import os
 import json
-import time
-from datetime import datetime, timedelta
-from threading import Timer
-from typing import Dict, Union, List
+from datetime import date, time, timedelta
+from typing import Callable, Dict, Optional, Tuple, Union, List
 
-from whatsapp_manager import WhatsAppManager
-from whatsapp_manager import (CHROME_DRIVER, CHROME_PROFILE)
 from bible_manager import BibleManager
+from message_composer import MessageComposer
+from dispatcher import FanOutDispatcher
+from metrics import metrics
+from outbox import Outbox
+from render_cache import RenderCache
+from reading_planner import DedupStats, group_recipients
+from state_store import DEFAULT_RECIPIENT, StateStore
+from transport import Transport
+from translation_store import DEFAULT_TRANSLATION
+from scheduler import CATCH_UP_ONCE, Clock, DailyTrigger, OnceTrigger, Scheduler
 
 class Controller:
     config_folder = os.path.abspath(
@@ -16,11 +22,42 @@ class Controller:
     contact_path = os.path.join(config_folder, "contact.json")
     last_sent_path = os.path.join(config_folder, "last_sent_date.json")
     
-    def __init__(self) -> None:
-        self.bible_manager = BibleManager()
-        self.contacts = self.load_contacts()
+    max_workers = 1 # Sessões/abas enviando ao mesmo tempo
+    min_send_interval = 1.0 # Segundos entre mensagens para o mesmo destinatário
+    prerender_days = 3 # Dias renderizados com antecedência na janela ociosa
+    refresh_corpus_on_prerender = True # Revalida os arquivos da Bíblia antes de pré-renderizar
     
-    def load_contacts(self) -> Dict[str, Union[str, None]]:
+    def __init__(
+        self,
+        state_store: Optional[StateStore] = None,
+        clock: Optional[Clock] = None,
+        transport_factory: Optional[Callable[[], Transport]] = None,
+        contacts: Optional[Dict[str, Union[str, List[str], None]]] = None,
+        render_cache: Optional[RenderCache] = None,
+        bible_manager: Optional[BibleManager] = None
+    ) -> None:
+        # Sem argumentos usa os arquivos reais; a simulação injeta relógio,
+        # banco em memória e transporte nulo
+        if state_store is None:
+            state_store = StateStore()
+            state_store.import_legacy_json(
+                os.path.join(self.config_folder, "last_chapter.json"),
+                self.last_sent_path
+            )
+        self.state_store = state_store
+        if bible_manager is None:
+            bible_manager = BibleManager(state_store=self.state_store)
+        self.bible_manager = bible_manager
+        self.scheduler = Scheduler(clock)
+        # O backoff das novas tentativas segue o mesmo relógio, que a simulação avança
+        self.outbox = Outbox(self.state_store, now=self.scheduler.clock.now)
+        self.message_composer = MessageComposer()
+        self.render_cache = render_cache or RenderCache()
+        self.contacts = contacts or self.load_contacts()
+        self.transport_factory = transport_factory or self.connect_whatsapp
+        self.dedup_stats = DedupStats()
+    
+    def load_contacts(self) -> Dict[str, Union[str, List[str], None]]:
         if os.path.exists(self.contact_path):
             with open(self.contact_path, "r", encoding="UTF-8") as file:
                 file_contact = json.load(file)
@@ -28,11 +65,17 @@ class Controller:
                 test_user: str = file_contact.get("test_user", "Bloco de Notas")
                 support_user: str = file_contact.get("support_user", "Bloco de Notas")
                 reading_group: Union[str, None] = file_contact.get("reading_group", None)
+                recipients: List[str] = file_contact.get("recipients", [support_user])
+                plans: Dict[str, str] = file_contact.get("plans", {})
+                translations: Dict[str, str] = file_contact.get("translations", {})
                 
                 contacts = {
                 "test_user": test_user,
                 "support_user": support_user,
-                "reading_group": reading_group
+                "reading_group": reading_group,
+                "recipients": recipients,
+                "plans": plans,
+                "translations": translations
                 }
                 
                 return contacts
@@ -40,93 +83,270 @@ class Controller:
             contacts = {
                 "test_user": "Bloco de Notas",
                 "support_user": "Bloco de Notas",
-                "reading_group": None
+                "reading_group": None,
+                "recipients": ["Bloco de Notas"],
+                "plans": {},
+                "translations": {}
             }
             
             return contacts
 
-    def was_sent_today(self) -> bool:
-        if not os.path.exists(self.last_sent_path):
-            return False
-
-        today = datetime.today().date()
-
-        with open(self.last_sent_path, 'r', encoding="UTF-8") as file:
-            last_sent = json.load(file).get("date", None)
-
-            if last_sent is None:
-                return False
-
-            last_sent_date = datetime.strptime(last_sent, "%Y/%m/%d").date()
-            return last_sent_date == today
+    def recipient_plans(self) -> Dict[str, str]:
+        # Destinatários sem plano próprio seguem o plano padrão
+        plans = self.contacts.get("plans") or {}
+        return {
+            recipient: plans.get(recipient, DEFAULT_RECIPIENT)
+            for recipient in self.contacts["recipients"]
+        }
+    
+    def recipient_translations(self) -> Dict[str, str]:
+        # Destinatários sem tradução própria, ou com uma tradução inexistente, recebem a padrão
+        translations = self.contacts.get("translations") or {}
+        available = set(self.bible_manager.translations()) if translations else set()
+        result = {}
+        for recipient in self.contacts["recipients"]:
+            translation = translations.get(recipient, DEFAULT_TRANSLATION)
+            if translation not in available and translation != DEFAULT_TRANSLATION:
+                print(f"Translation '{translation}' not found for {recipient}, using the default.")
+                translation = DEFAULT_TRANSLATION
+            result[recipient] = translation
+        return result
+    
+    def message_format(self) -> Dict[str, int]:
+        return {"max_length": self.message_composer.max_length}
+    
+    def today(self) -> date:
+        # O dia vem do relógio do agendador, que a simulação avança
+        return self.scheduler.clock.now().date()
+    
+    def was_sent_today(self, plan: str = DEFAULT_RECIPIENT) -> bool:
+        today = self.today()
+        return self.state_store.was_completed(today, plan)
+        
+    def mark_as_sent_today(self, plan: str = DEFAULT_RECIPIENT) -> None:
+        today = self.today()
+        self.state_store.mark_completed(today, plan)
+    
+    def compose_daily_messages(
+        self,
+        books_chapters: List[Dict[str, Union[str, List[int]]]],
+        day: Optional[date] = None,
+        translation: str = DEFAULT_TRANSLATION
+    ) -> List[str]:
+        day = day or self.today()
+        readings = []
+        chapter_texts = []
+        for bk_chapters in books_chapters:
+            bk: str = bk_chapters.get("book", None)
+            chapters: List[int] = bk_chapters.get("chapters", [])
+            book_data = self.bible_manager.bible_books.get(bk, None)
+            if book_data is None:
+                continue
+            
+            readings.append({"book": book_data["book"], "chapters": chapters})
+            for ch in chapters:
+                ch_str = f"{ch:02d}"
+                text = self.bible_manager.get_chapter_text(bk, ch_str, translation)
+                if text is not None:
+                    chapter_texts.append(text)
         
-    def mark_as_sent_today(self) -> None:
-        today_str = datetime.today().strftime('%Y/%m/%d')
-        with open(self.last_sent_path, 'w', encoding="UTF-8") as file:
-            json.dump({"date": today_str}, file, ensure_ascii=False)
+        header = self.message_composer.day_header(day, readings)
+        return self.message_composer.compose(header, chapter_texts)
+    
+    def render_daily_messages(
+        self,
+        books_chapters: List[Dict[str, Union[str, List[int]]]],
+        day: date,
+        translation: str = DEFAULT_TRANSLATION
+    ) -> Tuple[str, List[str]]:
+        # Só os capítulos da leitura entram na chave: editar um capítulo invalida
+        # apenas os dias que o leem
+        key = self.render_cache.key(
+            self.bible_manager.reading_signature(books_chapters, translation),
+            day,
+            books_chapters,
+            {**self.message_format(), "translation": translation}
+        )
+        messages = self.render_cache.get(key)
+        if messages is None:
+            metrics.incr("render_cache_misses")
+            with metrics.span("render"):
+                messages = self.compose_daily_messages(books_chapters, day, translation)
+            self.render_cache.put(key, messages)
+        else:
+            metrics.incr("render_cache_hits")
+        return key, messages
+    
+    def prerender_upcoming(self) -> int:
+        # O próximo envio de cada plano é hoje se ainda não foi feito, senão amanhã
+        today = self.today()
+        recipient_plans = self.recipient_plans()
+        if self.refresh_corpus_on_prerender:
+            self.bible_manager.refresh_corpus()
+        
+        sent = {plan: self.state_store.was_completed(today, plan) for plan in set(recipient_plans.values())}
+        
+        keys = []
+        for first_day in (today, today + timedelta(days=1)):
+            plans = {
+                recipient: plan for recipient, plan in recipient_plans.items()
+                if sent[plan] == (first_day != today)
+            }
+            if not plans:
+                continue
+            groups, _ = group_recipients(
+                self.bible_manager, plans, self.message_format(),
+                recipient_translations=self.recipient_translations()
+            )
+            for group in groups:
+                readings = self.bible_manager.upcoming_readings(
+                    self.prerender_days,
+                    state=group.state,
+                    nums_chapter=group.nums_chapter,
+                    schedule=group.schedule
+                )
+                for offset, (books_chapters, _) in enumerate(readings):
+                    key, _ = self.render_daily_messages(
+                        books_chapters, first_day + timedelta(days=offset), group.translation
+                    )
+                    keys.append(key)
+        self.render_cache.prune(keys)
+        return len(keys)
+    
+    def connect_whatsapp(self) -> Transport:
+        # Importados só aqui para que planejar e pré-visualizar não carreguem o Selenium
+        from whatsapp_session import WhatsAppSessionClient
+        from whatsapp_manager import CHROME_DRIVER, CHROME_PROFILE, WhatsAppManager
+        
+        session = WhatsAppSessionClient.connect()
+        if session is not None and session.ping():
+            return session
+        return WhatsAppManager(CHROME_PROFILE, CHROME_DRIVER)
     
     def send_daily_message(self) -> None:
-        self.whatsapp_manager = WhatsAppManager(CHROME_PROFILE, CHROME_DRIVER)
-        if not self.was_sent_today():
+        today = self.today()
+        recipient_plans = self.recipient_plans()
+        # Consulta cada plano uma vez, não cada destinatário
+        sent = {plan: self.state_store.was_completed(today, plan) for plan in set(recipient_plans.values())}
+        pending = {
+            recipient: plan for recipient, plan in recipient_plans.items()
+            if not sent[plan]
+        }
+        if pending:
+            self.dispatcher = FanOutDispatcher(
+                self.transport_factory,
+                max_workers=self.max_workers,
+                min_interval=self.min_send_interval
+            )
             try:
-                self.whatsapp_manager.send_message(
-                    self.contacts["support_user"], 
-                    "Daily Bible reading message"
-                )
+                # Planos ainda não enfileirados e destinatários incluídos depois do enfileiramento
+                new_plans = self.outbox.missing(today, pending)
+                if new_plans:
+                    # Cada leitura distinta é renderizada uma vez e compartilhada pelo grupo
+                    groups, self.dedup_stats = group_recipients(
+                        self.bible_manager, new_plans, self.message_format(),
+                        recipient_translations=self.recipient_translations()
+                    )
+                    for group in groups:
+                        if not group.readings:
+                            # Plano concluído (após Apocalipse 22): o dia é concluído sem enviar nada
+                            for plan in group.plans:
+                                self.state_store.mark_completed(today, plan)
+                            continue
+                        _, messages = self.render_daily_messages(group.readings, today, group.translation)
+                        for plan, recipients in group.plans.items():
+                            self.outbox.enqueue(
+                                today,
+                                {recipient: messages for recipient in recipients},
+                                group.next_state,
+                                plan
+                            )
+                    metrics.incr("dedup_recipients", self.dedup_stats.recipients)
+                    metrics.incr("dedup_groups", self.dedup_stats.groups)
+                    print(
+                        f"Rendered {self.dedup_stats.groups} readings for "
+                        f"{self.dedup_stats.recipients} recipients "
+                        f"(dedup ratio {self.dedup_stats.ratio:.1f})."
+                    )
+                
+                finished = {plan for plan in set(pending.values()) if self.state_store.was_completed(today, plan)}
+                pending = {recipient: plan for recipient, plan in pending.items() if plan not in finished}
                 
-                books_chapters = self.bible_manager.daily_read_chapter(was_sent=False)
+                # Envia a partir da primeira mensagem não entregue; ao concluir o
+                # dia, o progresso de leitura e o envio são salvos juntos.
+                with metrics.span("deliver"):
+                    results = self.outbox.deliver(self.dispatcher, today, pending)
+                failed = [result for result in results.values() if result.error is not None]
+                # Falhas são tentadas de novo no prazo do backoff por uma tarefa
+                # agendada, sem bloquear as demais tarefas do agendador
+                retry_at = self.outbox.next_retry(today, pending)
+                if retry_at is not None:
+                    self.scheduler.add_job("daily_retry", self.run_daily_task, OnceTrigger(retry_at))
+                elif failed:
+                    raise RuntimeError("; ".join(
+                        f"{result.recipient} ({result.sent} sent): {result.error}"
+                        for result in failed
+                    ))
                 
-                for pos, bk_chapters in enumerate(books_chapters):
-                    if pos > 1:
-                        print("Test - Most one book")
-                    
-                    bk: str = bk_chapters.get("book", None)
-                    chapters: List[int] = bk_chapters.get("chapters", [])
-                    if bk is not None:
-                        book_data = self.bible_manager.bible_books.get(bk, None)
-                        if book_data is not None:
-                            for ch in chapters:
-                                ch_str = f"{ch:02d}"
-                                ch_path = book_data["chapters"][ch_str]
-                                if os.path.exists(ch_path):
-                                    with open(ch_path, "r", encoding="UTF-8") as file:
-                                        text = file.read()
-                                        self.whatsapp_manager.send_message(
-                                            self.contacts["support_user"],
-                                            text
-                                        )
-                                        
-                # self.mark_as_sent_today() # Marca como enviado
+                if not all(self.state_store.was_completed(today, plan) for plan in set(pending.values())):
+                    if retry_at is not None:
+                        print(f"Daily message pending, retrying at {retry_at:%H:%M:%S}.")
+                    else:
+                        print("Daily message pending, waiting for the next retry.")
+                    return
                 
                 print("Daily message sent successfully.")
+                for step, stats in self.dispatcher.timing_report().items():
+                    print(
+                        f"{step}: {stats['count']}x, total {stats['total']:.2f}s, "
+                        f"mean {stats['mean']:.2f}s, max {stats['max']:.2f}s"
+                    )
             except Exception as e:
                 error_message = f"Error sending daily message: {str(e)}"
                 print(error_message)
-                self.whatsapp_manager.send_message(
-                    self.contacts["support_user"],
-                    error_message
-                )
+                self.dispatcher.send(self.contacts["support_user"], [error_message])
             finally:
-                self.whatsapp_manager.close()
+                self.dispatcher.close()
+                metrics.flush()
 
-    def schedule_daily_task(self) -> None:
-        now = datetime.now()
-        if now.hour < 5:
-            next_run_time = now.replace(hour=5, minute=0, second=0, microsecond=0)
-        elif now.hour > 20:
-            next_run_time = (now + timedelta(days=1)).replace(hour=5, minute=0, second=0, microsecond=0)
+    def schedule_daily_task(self, block: bool = True) -> None:
+        self.add_daily_jobs()
+        # Bloqueia até o agendador parar; a thread em segundo plano não mantém o processo vivo
+        if block:
+            self.scheduler.run()
         else:
-            next_run_time = (now + timedelta(hours=1)).replace(minute=0, second=0, microsecond=0)
-        
-        delay = (next_run_time - now).total_seconds() 
-        
-        Timer(delay, self.run_daily_task).start()
+            self.scheduler.start()
+    
+    def add_daily_jobs(self, prerender: bool = True) -> None:
+        # Tenta enviar de hora em hora entre 5:00 e 20:00 até conseguir
+        self.scheduler.add_job(
+            "daily_message",
+            self.run_daily_task,
+            DailyTrigger([time(hour) for hour in range(5, 21)]),
+            catch_up=CATCH_UP_ONCE
+        )
+        if not prerender:
+            return
+        # Pré-renderiza os próximos dias fora do horário de envio
+        self.scheduler.add_job(
+            "prerender",
+            self.run_prerender_task,
+            DailyTrigger([time(hour) for hour in (*range(21, 24), *range(0, 5))]),
+            catch_up=CATCH_UP_ONCE
+        )
         
     def run_daily_task(self) -> None:
-        now = datetime.now()
+        now = self.scheduler.clock.now()
         if 5 <= now.hour <= 20:
             self.send_daily_message()
-        self.schedule_daily_task()
+        
+    def run_prerender_task(self) -> None:
+        now = self.scheduler.clock.now()
+        if not 5 <= now.hour <= 20:
+            with metrics.span("prerender"):
+                rendered = self.prerender_upcoming()
+            metrics.flush()
+            print(f"Pre-rendered {rendered} upcoming days.")
         
     def start_on_boot(self) -> None:
         startup_folder = os.path.join(
@@ -0,0 +1,460 @@
+import os
+import re
+import json
+import hashlib
+import unicodedata
+from collections import Counter
+from dataclasses import asdict, dataclass, field, replace
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from chapter_cache import decode_chapter
+
+MANIFEST_VERSION = 2
+MANIFEST_FILE_NAME = "manifest.json"
+
+# "Gênesis 01.txt", "1 Samuel 01.txt", "Salmos 001.txt", "Esdras 00 Convite.txt"
+CHAPTER_FILE_PATTERN = re.compile(r"^(?P<name>.+?)\s+(?P<number>\d+)(?P<suffix>.*)\.txt$")
+# Versículos começam na linha com o número seguido de espaço
+VERSE_LINE_PATTERN = re.compile(r"^\d+\s", re.MULTILINE)
+# Palavras do texto, sem os números dos versículos
+WORD_PATTERN = re.compile(r"[^\W\d_]+")
+# Prefixo numérico das pastas ("01 Gênesis")
+BOOK_FOLDER_PATTERN = re.compile(r"^\d+\s(.+)$")
+
+
+@dataclass
+class ManifestEntry:
+    """
+    Um arquivo de texto da Bíblia.
+
+    :param path: Caminho relativo ao diretório da Bíblia.
+    :param size: Tamanho em bytes.
+    :param mtime_ns: Data de modificação em nanossegundos.
+    :param sha256: Hash do conteúdo.
+    :param verses: Número de versículos.
+    :param words: Número de palavras.
+    :param text_bytes: Tamanho do texto em UTF-8 (como é enviado, independente da codificação do arquivo).
+    :param book: Abreviação do livro, ou None se a pasta não for mapeada.
+    :param chapter: Número do capítulo, ou None se o arquivo não for um capítulo.
+    :param issue: Motivo de o arquivo não ser usado como capítulo, se houver.
+    """
+    path: str
+    size: int
+    mtime_ns: int
+    sha256: str
+    verses: int
+    words: int
+    text_bytes: int
+    book: Optional[str] = None
+    chapter: Optional[int] = None
+    issue: Optional[str] = None
+
+
+@dataclass
+class ManifestReport:
+    """
+    Resultado de uma validação do corpus.
+
+    :param rehashed: Arquivos lidos novamente por terem mudado de tamanho ou data.
+    :param reused: Arquivos aproveitados do manifesto anterior.
+    :param changed: Capítulos (livro, capítulo) novos, alterados ou removidos.
+    :param missing: Capítulos esperados sem arquivo.
+    :param duplicates: Capítulos com mais de um arquivo e os caminhos de cada um.
+    :param unmapped: Arquivos ignorados e o motivo.
+    """
+    rehashed: int = 0
+    reused: int = 0
+    changed: List[Tuple[str, int]] = field(default_factory=list)
+    missing: List[Tuple[str, int]] = field(default_factory=list)
+    duplicates: List[Tuple[str, int, List[str]]] = field(default_factory=list)
+    unmapped: List[Tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def has_problems(self) -> bool:
+        """
+        :return: True se há capítulos faltando ou duplicados.
+        """
+        return bool(self.missing or self.duplicates)
+
+    def summary(self, unmapped: bool = True) -> str:
+        """
+        Descreve os problemas encontrados.
+
+        :param unmapped: Inclui os arquivos ignorados de propósito (esboços, comentários).
+        :return: Texto com uma linha por problema.
+        """
+        lines = [f"{self.rehashed} arquivos lidos, {self.reused} reaproveitados, {len(self.changed)} capítulos alterados"]
+        lines += [f"Capítulo faltando: {book} {chapter}" for book, chapter in self.missing]
+        lines += [
+            f"Capítulo duplicado: {book} {chapter} ({', '.join(paths)}); usando {paths[0]}"
+            for book, chapter, paths in self.duplicates
+        ]
+        if unmapped:
+            lines += [f"Arquivo ignorado: {path} ({reason})" for path, reason in self.unmapped]
+        return "\n".join(lines)
+
+
+class CorpusManifest:
+    """
+    Manifesto dos arquivos da Bíblia: caminho, tamanho, data, hash, número de
+    versículos e de palavras e livro/capítulo canônicos de cada arquivo.
+
+    Na validação, apenas os arquivos cujo tamanho ou data mudaram são lidos e
+    hasheados novamente; os demais vêm do manifesto salvo. Ao abrir, se nenhuma
+    pasta e nenhum arquivo mudou de data ou tamanho, o manifesto salvo é usado
+    sem listar os arquivos das pastas nem relê-los.
+    """
+
+    def __init__(
+        self,
+        bible_dir: str,
+        testament_dirs: List[str],
+        manifest_path: str,
+        resolve_book: Callable[[str], Tuple[Optional[str], str]],
+        expected_chapters: Optional[Dict[str, int]] = None
+    ) -> None:
+        """
+        :param bible_dir: Diretório base da Bíblia (caminhos são salvos relativos a ele).
+        :param testament_dirs: Diretórios dos testamentos.
+        :param manifest_path: Caminho do arquivo do manifesto.
+        :param resolve_book: Converte o nome da pasta em (abreviação ou None, nome do livro).
+        :param expected_chapters: Número de capítulos de cada livro, para detectar faltas.
+        """
+        self.bible_dir = bible_dir
+        self.testament_dirs = testament_dirs
+        self.manifest_path = manifest_path
+        self.resolve_book = resolve_book
+        self.expected_chapters = expected_chapters or {}
+        self.entries: Dict[str, ManifestEntry] = {}
+        self.book_names: Dict[str, str] = {}
+        self.chapter_paths: Dict[Tuple[str, int], str] = {}
+        self.directories: Dict[str, int] = {}
+
+    def load(self) -> Tuple[Dict[str, ManifestEntry], Dict[str, int]]:
+        """
+        Lê o manifesto salvo.
+
+        :return: Entradas por caminho relativo e data de modificação das pastas na
+            última validação; vazios se ausente, inválido ou de outra versão.
+        """
+        try:
+            with open(self.manifest_path, "r", encoding="UTF-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return {}, {}
+        if data.get("version") != MANIFEST_VERSION:
+            return {}, {}
+        entries = {entry["path"]: ManifestEntry(**entry) for entry in data.get("entries", [])}
+        return entries, data.get("directories", {})
+
+    def save(self) -> None:
+        """
+        Grava o manifesto de forma atômica.
+        """
+        data = {
+            "version": MANIFEST_VERSION,
+            "directories": self.directories,
+            "entries": [asdict(entry) for entry in self.entries.values()]
+        }
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="UTF-8") as file:
+            json.dump(data, file, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+
+    def list_book_folders(self) -> Tuple[List[os.DirEntry], Dict[str, int]]:
+        """
+        Lista as pastas de livros dos testamentos, sem abrir as pastas.
+
+        :return: Pastas em ordem de nome e data de modificação (ns) de cada
+            testamento e de cada pasta, por caminho relativo.
+        """
+        folders: List[os.DirEntry] = []
+        directories: Dict[str, int] = {}
+        for testament_dir in self.testament_dirs:
+            directories[os.path.relpath(testament_dir, self.bible_dir)] = os.stat(testament_dir).st_mtime_ns
+            with os.scandir(testament_dir) as entries:
+                book_folders = sorted((f for f in entries if f.is_dir()), key=lambda f: f.name)
+            for folder in book_folders:
+                directories[os.path.relpath(folder.path, self.bible_dir)] = folder.stat().st_mtime_ns
+            folders += book_folders
+        return folders, directories
+
+    def resolve_folder(self, folder_name: str) -> Tuple[Optional[str], str]:
+        """
+        :param folder_name: Nome da pasta do livro ("01 Gênesis").
+        :return: Abreviação (ou None se não mapeado) e nome do livro.
+        """
+        match = BOOK_FOLDER_PATTERN.match(folder_name)
+        return self.resolve_book(match.group(1) if match else folder_name)
+
+    def load_unchanged(self) -> bool:
+        """
+        Usa o manifesto salvo sem listar os arquivos das pastas nem relê-los,
+        se nada mudou desde a última validação.
+
+        Arquivos criados, removidos ou renomeados mudam a data da pasta; um
+        arquivo editado no lugar muda de data ou tamanho. Cada arquivo do
+        manifesto é consultado uma vez (`os.stat`), sem ser lido.
+
+        :return: True se o manifesto salvo foi carregado; False se é preciso chamar `scan`.
+        """
+        entries, directories = self.load()
+        if not entries or not directories:
+            return False
+        folders, current = self.list_book_folders()
+        if current != directories:
+            return False
+        for path, entry in entries.items():
+            try:
+                stat = os.stat(os.path.join(self.bible_dir, path))
+            except OSError:
+                return False
+            if entry.size != stat.st_size or entry.mtime_ns != stat.st_mtime_ns:
+                return False
+
+        self.entries = entries
+        self.directories = directories
+        self.book_names = {}
+        for folder in folders:
+            abbrev, book_name = self.resolve_folder(folder.name)
+            if abbrev is not None:
+                self.book_names[abbrev] = book_name
+        self.chapter_paths = {
+            (entry.book, entry.chapter): path
+            for path, entry in entries.items()
+            if entry.book is not None and entry.chapter is not None and entry.issue is None
+        }
+        return True
+
+    def hash_file(self, path: str, size: int, mtime_ns: int, source_encoding: Optional[str]) -> ManifestEntry:
+        """
+        Lê um arquivo e calcula o hash e o número de versículos e de palavras.
+
+        :param path: Caminho absoluto do arquivo.
+        :param size: Tamanho do arquivo.
+        :param mtime_ns: Data de modificação.
+        :param source_encoding: Codificação dos arquivos; se None, é detectada.
+        :return: Entrada do manifesto, ainda sem livro e capítulo.
+        """
+        with open(path, "rb") as file:
+            raw = file.read()
+        text = decode_chapter(raw, source_encoding)
+        return ManifestEntry(
+            os.path.relpath(path, self.bible_dir),
+            size,
+            mtime_ns,
+            hashlib.sha256(raw).hexdigest(),
+            len(VERSE_LINE_PATTERN.findall(text)),
+            len(WORD_PATTERN.findall(text)),
+            len(text.encode("UTF-8"))
+        )
+
+    def scan(self, source_encoding: Optional[str] = None) -> ManifestReport:
+        """
+        Valida os arquivos contra o manifesto salvo, relendo apenas os alterados,
+        e regrava o manifesto se algo mudou.
+
+        :param source_encoding: Codificação dos arquivos; se None, é detectada.
+        :return: Relatório com as alterações e os problemas encontrados.
+        """
+        previous, previous_directories = self.load()
+        old_chapters = mapped_chapters(previous)
+        report = ManifestReport()
+        entries: Dict[str, ManifestEntry] = {}
+        self.book_names = {}
+        self.chapter_paths = {}
+
+        # As datas são lidas antes dos arquivos, para que uma alteração durante a
+        # validação apareça na próxima abertura
+        book_folders, directories = self.list_book_folders()
+        for folder in book_folders:
+            abbrev, book_name = self.resolve_folder(folder.name)
+            if abbrev is not None:
+                self.book_names[abbrev] = book_name
+
+            folder_entries = []
+            with os.scandir(folder.path) as files:
+                for file in sorted(files, key=lambda f: f.name):
+                    if not file.is_file() or not file.name.endswith(".txt"):
+                        continue
+                    stat = file.stat()
+                    rel_path = os.path.relpath(file.path, self.bible_dir)
+                    entry = previous.get(rel_path)
+                    if entry is not None and entry.size == stat.st_size and entry.mtime_ns == stat.st_mtime_ns:
+                        entry = replace(entry)
+                        report.reused += 1
+                    else:
+                        entry = self.hash_file(file.path, stat.st_size, stat.st_mtime_ns, source_encoding)
+                        report.rehashed += 1
+                    entries[rel_path] = entry
+                    folder_entries.append(entry)
+
+            self.map_chapters(abbrev, folder_entries, report)
+
+        for abbrev, expected in self.expected_chapters.items():
+            for chapter in range(1, expected + 1):
+                if (abbrev, chapter) not in self.chapter_paths:
+                    report.missing.append((abbrev, chapter))
+
+        new_chapters = mapped_chapters(entries)
+        report.changed = sorted(
+            key for key in old_chapters.keys() | new_chapters.keys()
+            if old_chapters.get(key) != new_chapters.get(key)
+        )
+
+        self.entries = entries
+        self.directories = directories
+        if entries != previous or directories != previous_directories:
+            self.save()
+        return report
+
+    def map_chapters(
+        self,
+        abbrev: Optional[str],
+        folder_entries: List[ManifestEntry],
+        report: ManifestReport
+    ) -> None:
+        """
+        Associa os arquivos de uma pasta aos capítulos do livro.
+
+        O nome predominante na pasta identifica os capítulos ("1 Samuel 01.txt");
+        arquivos com outro nome (comentários, arquivos de outro livro), com
+        número 00 (convites e esboços) ou com texto após o número são ignorados.
+        Entre arquivos do mesmo capítulo, prefere-se um não vazio com a mesma
+        quantidade de dígitos dos demais.
+
+        :param abbrev: Abreviação do livro, ou None se a pasta não for mapeada.
+        :param folder_entries: Entradas dos arquivos da pasta.
+        :param report: Relatório onde os problemas são registrados.
+        """
+        parsed = []
+        for entry in folder_entries:
+            entry.book, entry.chapter, entry.issue = abbrev, None, None
+            match = CHAPTER_FILE_PATTERN.match(os.path.basename(entry.path))
+            if abbrev is None:
+                entry.issue = "pasta de livro não mapeada"
+            elif match is None:
+                entry.issue = "nome sem número de capítulo"
+            else:
+                parsed.append((entry, match))
+
+        names = Counter(file_book_name(match.group("name")) for _, match in parsed)
+        widths = Counter(len(match.group("number")) for _, match in parsed)
+        main_name = names.most_common(1)[0][0] if names else None
+        main_width = widths.most_common(1)[0][0] if widths else None
+
+        candidates: Dict[int, List[Tuple[ManifestEntry, str]]] = {}
+        for entry, match in parsed:
+            number = int(match.group("number"))
+            if match.group("suffix").strip() or number == 0:
+                entry.issue = "não é um capítulo"
+            elif file_book_name(match.group("name")) != main_name:
+                entry.issue = f"nome diferente dos demais arquivos da pasta ({match.group('name')})"
+            else:
+                candidates.setdefault(number, []).append((entry, match.group("number")))
+
+        for number, files in sorted(candidates.items()):
+            files.sort(key=lambda item: (item[0].size == 0, len(item[1]) != main_width, item[0].path))
+            chosen = files[0][0]
+            chosen.chapter = number
+            self.chapter_paths[(abbrev, number)] = chosen.path
+            if len(files) > 1:
+                report.duplicates.append((abbrev, number, [entry.path for entry, _ in files]))
+                for entry, _ in files[1:]:
+                    entry.issue = f"duplicado de {chosen.path}"
+
+        for entry in folder_entries:
+            if entry.issue is not None:
+                report.unmapped.append((entry.path, entry.issue))
+
+    def books(self) -> Dict[str, Dict[str, Union[str, int, Dict[str, str]]]]:
+        """
+        Monta os livros no formato de `BibleManager.bible_books`, com os
+        capítulos numerados com dois dígitos ("01", ..., "150").
+
+        :return: Dicionário de livros com seus capítulos e informações.
+        """
+        books = {}
+        for abbrev, book_name in self.book_names.items():
+            chapters = {
+                f"{chapter:02d}": os.path.join(self.bible_dir, path)
+                for (book, chapter), path in sorted(self.chapter_paths.items())
+                if book == abbrev
+            }
+            books[abbrev] = {
+                "chapters": chapters,
+                "book": book_name,
+                "num_chapters": len(chapters)
+            }
+        return books
+
+    def chapter_hash(self, book: str, chapter: int) -> Optional[str]:
+        """
+        :param book: Abreviação do livro.
+        :param chapter: Número do capítulo.
+        :return: Hash do arquivo do capítulo ou None se não existir.
+        """
+        path = self.chapter_paths.get((book, chapter))
+        return self.entries[path].sha256 if path is not None else None
+
+    def chapter_entry(self, book: str, chapter: int) -> Optional[ManifestEntry]:
+        """
+        :param book: Abreviação do livro.
+        :param chapter: Número do capítulo.
+        :return: Entrada do arquivo do capítulo ou None se não existir.
+        """
+        path = self.chapter_paths.get((book, chapter))
+        return self.entries[path] if path is not None else None
+
+    @property
+    def digest(self) -> str:
+        """
+        :return: Hash do conteúdo e da posição de todos os capítulos.
+        """
+        digest = hashlib.sha256()
+        for (book, chapter), path in sorted(self.chapter_paths.items()):
+            digest.update(f"{book}:{chapter}:{self.entries[path].sha256}\n".encode("UTF-8"))
+        return digest.hexdigest()
+
+
+def mapped_chapters(entries: Dict[str, ManifestEntry]) -> Dict[Tuple[str, int], str]:
+    """
+    Obtém o hash de cada capítulo usado.
+
+    :param entries: Entradas do manifesto.
+    :return: Hash por (livro, capítulo).
+    """
+    return {
+        (entry.book, entry.chapter): entry.sha256
+        for entry in entries.values()
+        if entry.book is not None and entry.chapter is not None and entry.issue is None
+    }
+
+
+def fold_name(name: str) -> str:
+    """
+    Remove acentos e converte para minúsculas.
+    
+    :param name: Nome original.
+    :return: Nome normalizado para comparação.
+    """
+    decomposed = unicodedata.normalize("NFD", name)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def file_book_name(name: str) -> str:
+    """
+    Normaliza o nome do livro em um nome de arquivo para comparação (sem acentos,
+    minúsculas, sem zeros à esquerda).
+
+    :param name: Nome do livro no arquivo.
+    :return: Nome normalizado.
+    """
+    return re.sub(r"^0+(?=\d)", "", fold_name(name))
+
+
+if __name__ == "__main__":
+    from bible_manager import BibleManager
+
+    bible_manager = BibleManager(use_pack=False)
+    print(bible_manager.refresh_corpus().summary())
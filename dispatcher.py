@@ -0,0 +1,251 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from queue import Empty, Queue
+from typing import Any, Callable, Dict, List, Optional
+
+from metrics import metrics
+
+
+@dataclass
+class DispatchResult:
+    """
+    Outcome of sending one recipient's messages.
+
+    Attributes:
+        recipient (str): The contact or group name.
+        sent (int): Number of messages delivered, in order.
+        error (Optional[str]): The error that stopped the batch, if any.
+    """
+    recipient: str
+    sent: int = 0
+    error: Optional[str] = None
+
+
+class TransportPool:
+    """
+    A bounded pool of transports (WhatsApp sessions, tabs or driver instances).
+
+    Transports are created lazily by `factory`, up to `size`, and reused.
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: int) -> None:
+        """
+        Initializes an empty pool.
+
+        Args:
+            factory (Callable[[], Any]): Creates a transport with `send_message` and `close`.
+            size (int): Maximum number of transports alive at the same time.
+        """
+        self.factory = factory
+        self.size = size
+        self.idle: "Queue[Any]" = Queue()
+        self.transports: List[Any] = []
+        self.created = 0
+        self.lock = threading.Lock()
+
+    def acquire(self) -> Any:
+        """
+        Takes an idle transport, creating one if the pool is not full yet.
+
+        Returns:
+            Any: A transport reserved for the caller.
+        """
+        try:
+            return self.idle.get_nowait()
+        except Empty:
+            pass
+        with self.lock:
+            create = self.created < self.size
+            if create:
+                self.created += 1
+        if not create:
+            return self.idle.get()
+        try:
+            transport = self.factory()
+        except Exception:
+            with self.lock:
+                self.created -= 1
+            raise
+        with self.lock:
+            self.transports.append(transport)
+        return transport
+
+    def release(self, transport: Any) -> None:
+        """
+        Returns a transport to the pool.
+
+        Args:
+            transport (Any): The transport taken with `acquire`.
+        """
+        self.idle.put(transport)
+
+    def close(self) -> None:
+        """
+        Closes every transport created by the pool.
+        """
+        with self.lock:
+            transports = self.transports
+            self.transports = []
+            self.created = 0
+        for transport in transports:
+            transport.close()
+        self.idle = Queue()
+
+
+class FanOutDispatcher:
+    """
+    Sends message batches to many recipients over a bounded transport pool.
+
+    Each recipient's messages are sent in order by a single worker at a time,
+    at most `max_workers` recipients are served concurrently and consecutive
+    sends to the same recipient are spaced by at least `min_interval` seconds.
+
+    Note that WhatsApp Web keeps a single active web session per account, so
+    more than one worker only helps when the factory hands out transports
+    logged into different accounts.
+    """
+
+    def __init__(
+        self,
+        transport_factory: Callable[[], Any],
+        max_workers: int = 1,
+        min_interval: float = 0.0
+    ) -> None:
+        """
+        Initializes the dispatcher.
+
+        Args:
+            transport_factory (Callable[[], Any]): Creates a new transport.
+            max_workers (int): Global concurrency limit.
+            min_interval (float): Minimum seconds between sends to the same recipient.
+        """
+        self.pool = TransportPool(transport_factory, max_workers)
+        self.max_workers = max_workers
+        self.min_interval = min_interval
+        self.recipient_locks: Dict[str, threading.Lock] = {}
+        self.last_sent: Dict[str, float] = {}
+        self.lock = threading.Lock()
+
+    def recipient_lock(self, recipient: str) -> threading.Lock:
+        """
+        Returns the lock that serializes sends to a recipient.
+
+        Args:
+            recipient (str): The contact or group name.
+
+        Returns:
+            threading.Lock: The recipient's lock.
+        """
+        with self.lock:
+            return self.recipient_locks.setdefault(recipient, threading.Lock())
+
+    def wait_rate_limit(self, recipient: str) -> None:
+        """
+        Sleeps until `min_interval` has passed since the last send to the recipient.
+        Must be called with the recipient's lock held.
+
+        Args:
+            recipient (str): The contact or group name.
+        """
+        last = self.last_sent.get(recipient)
+        if last is not None:
+            delay = self.min_interval - (time.monotonic() - last)
+            if delay > 0:
+                time.sleep(delay)
+
+    def send(
+        self,
+        recipient: str,
+        messages: List[str],
+        on_sent: Optional[Callable[[str, int], None]] = None
+    ) -> DispatchResult:
+        """
+        Sends a recipient's messages in order, stopping at the first failure.
+
+        Args:
+            recipient (str): The contact or group name.
+            messages (List[str]): The messages to send.
+            on_sent (Optional[Callable[[str, int], None]]): Called with the
+                recipient and the message index after each delivered message.
+
+        Returns:
+            DispatchResult: How many messages went out and the error, if any.
+        """
+        result = DispatchResult(recipient)
+        with self.recipient_lock(recipient):
+            try:
+                transport = self.pool.acquire()
+            except Exception as e:
+                result.error = str(e)
+                return result
+            try:
+                for message in messages:
+                    self.wait_rate_limit(recipient)
+                    transport.send_message(recipient, message)
+                    self.last_sent[recipient] = time.monotonic()
+                    if on_sent is not None:
+                        on_sent(recipient, result.sent)
+                    result.sent += 1
+            except Exception as e:
+                result.error = str(e)
+                metrics.incr("dispatch_failures")
+            finally:
+                self.pool.release(transport)
+        return result
+
+    def dispatch(
+        self,
+        batches: Dict[str, List[str]],
+        on_sent: Optional[Callable[[str, int], None]] = None
+    ) -> Dict[str, DispatchResult]:
+        """
+        Sends every recipient's batch concurrently.
+
+        Args:
+            batches (Dict[str, List[str]]): Messages to send, by recipient.
+            on_sent (Optional[Callable[[str, int], None]]): See `send`.
+
+        Returns:
+            Dict[str, DispatchResult]: The outcome for each recipient.
+        """
+        if len(batches) <= 1 or self.max_workers <= 1:
+            return {
+                recipient: self.send(recipient, messages, on_sent)
+                for recipient, messages in batches.items()
+            }
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                recipient: executor.submit(self.send, recipient, messages, on_sent)
+                for recipient, messages in batches.items()
+            }
+            return {recipient: future.result() for recipient, future in futures.items()}
+
+    def timing_report(self) -> Dict[str, Dict[str, float]]:
+        """
+        Merges the step timings of every transport that records them.
+
+        Returns:
+            Dict[str, Dict[str, float]]: Count, total, mean and max seconds per step.
+        """
+        report: Dict[str, Dict[str, float]] = {}
+        with self.pool.lock:
+            transports = list(self.pool.transports)
+        for transport in transports:
+            if not hasattr(transport, "timing_report"):
+                continue
+            for step, stats in transport.timing_report().items():
+                merged = report.setdefault(step, {"count": 0, "total": 0.0, "mean": 0.0, "max": 0.0})
+                merged["count"] += stats["count"]
+                merged["total"] += stats["total"]
+                merged["max"] = max(merged["max"], stats["max"])
+                merged["mean"] = merged["total"] / merged["count"]
+        return report
+
+    def close(self) -> None:
+        """
+        Closes all transports.
+        """
+        self.pool.close()
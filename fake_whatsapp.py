@@ -0,0 +1,195 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# A minimal stand-in for WhatsApp Web exposing the elements that
+# WhatsAppManager targets: the search box (data-tab=3), the chat list
+# (span[title]), the conversation header, the message box (data-tab=10), the
+# send button (aria-label=Enviar) and outgoing bubbles that get a sent tick
+# after `latency` milliseconds.
+PAGE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>WhatsApp</title></head>
+<body>
+<div id="side">
+  <div contenteditable="true" role="textbox" data-tab="3" id="search"></div>
+  <div id="chats"></div>
+</div>
+<div id="main" style="display:none">
+  <header><span id="chat-title"></span></header>
+  <div id="messages"></div>
+  <footer>
+    <div contenteditable="true" role="textbox" data-tab="10" id="compose"></div>
+    <button aria-label="Enviar" id="send">Enviar</button>
+  </footer>
+</div>
+<script>
+const CONTACTS = __CONTACTS__;
+const LATENCY = __LATENCY__;
+const search = document.getElementById("search");
+const chats = document.getElementById("chats");
+const main = document.getElementById("main");
+const title = document.getElementById("chat-title");
+const messages = document.getElementById("messages");
+const compose = document.getElementById("compose");
+let current = null;
+
+function renderChats() {
+  const query = search.innerText.trim().toLowerCase();
+  chats.innerHTML = "";
+  for (const name of CONTACTS) {
+    if (query && !name.toLowerCase().includes(query)) continue;
+    const row = document.createElement("div");
+    const span = document.createElement("span");
+    span.title = name;
+    span.innerText = name;
+    row.appendChild(span);
+    row.onclick = () => openChat(name);
+    chats.appendChild(row);
+  }
+}
+
+function openChat(name) {
+  current = name;
+  main.style.display = "block";
+  title.title = name;
+  title.innerText = name;
+  messages.innerHTML = "";
+}
+
+document.getElementById("send").onclick = () => {
+  const text = compose.innerText;
+  const bubble = document.createElement("div");
+  bubble.className = "message-out";
+  bubble.innerText = text;
+  messages.appendChild(bubble);
+  compose.innerHTML = "";
+  fetch("/api/messages", {
+    method: "POST",
+    headers: {"Content-Type": "application/json"},
+    body: JSON.stringify({chat: current, text: text})
+  }).then(() => setTimeout(() => {
+    const tick = document.createElement("span");
+    tick.setAttribute("data-icon", "msg-check");
+    bubble.appendChild(tick);
+  }, LATENCY));
+};
+
+search.addEventListener("input", renderChats);
+renderChats();
+</script>
+</body>
+</html>
+"""
+
+
+class FakeWhatsAppServer:
+    """
+    A local HTTP app mimicking the parts of WhatsApp Web used by WhatsAppManager,
+    for offline load benchmarks.
+
+    Attributes:
+        messages (List[Dict[str, str]]): Messages received, with `chat` and `text`.
+    """
+
+    def __init__(
+        self,
+        contacts: List[str],
+        address: Tuple[str, int] = ("127.0.0.1", 0),
+        latency_ms: int = 0
+    ) -> None:
+        """
+        Initializes the server without starting it.
+
+        Args:
+            contacts (List[str]): Names listed in the chat list.
+            address (Tuple[str, int]): Host and port; port 0 picks a free one.
+            latency_ms (int): Delay before an outgoing message gets its sent tick.
+        """
+        self.contacts = contacts
+        self.latency_ms = latency_ms
+        self.messages: List[Dict[str, str]] = []
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(address, self.make_handler())
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        """
+        Base URL of the server.
+
+        Returns:
+            str: Base URL of the running server.
+        """
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def make_handler(self) -> type:
+        """
+        Builds the request handler bound to this server.
+
+        Returns:
+            type: A `BaseHTTPRequestHandler` subclass.
+        """
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+            def reply(self, status: int, content_type: str, body: bytes) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self) -> None:
+                path = urlparse(self.path)
+                if path.path == "/api/messages":
+                    with server.lock:
+                        body = json.dumps(server.messages, ensure_ascii=False)
+                    self.reply(200, "application/json; charset=utf-8", body.encode("UTF-8"))
+                    return
+                latency = parse_qs(path.query).get("latency", [server.latency_ms])[0]
+                page = PAGE.replace(
+                    "__CONTACTS__", json.dumps(server.contacts, ensure_ascii=False)
+                ).replace("__LATENCY__", str(int(latency)))
+                self.reply(200, "text/html; charset=utf-8", page.encode("UTF-8"))
+
+            def do_POST(self) -> None:
+                if urlparse(self.path).path != "/api/messages":
+                    self.reply(404, "text/plain", b"not found")
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                message = json.loads(self.rfile.read(length).decode("UTF-8"))
+                with server.lock:
+                    server.messages.append(message)
+                self.reply(204, "text/plain", b"")
+
+        return Handler
+
+    def start(self) -> None:
+        """
+        Serves requests in a background thread.
+        """
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self) -> None:
+        """
+        Stops the server.
+        """
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+if __name__ == "__main__":
+    server = FakeWhatsAppServer(["Bloco de Notas", "Support User"], ("127.0.0.1", 8765))
+    print(f"Fake WhatsApp Web running at {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.close()
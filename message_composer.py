@@ -0,0 +1,158 @@
+import re
+from datetime import date
+from typing import Dict, List, Union
+
+# Limite de caracteres por mensagem enviada
+MAX_MESSAGE_LENGTH = 4096
+# Separador entre versículos, capítulos e o cabeçalho do dia
+UNIT_SEPARATOR = "\n\n"
+
+VERSE_PATTERN = re.compile(r"^\d+\s")
+
+
+def format_chapters(chapters: List[int]) -> str:
+    """
+    Formata uma lista de capítulos em intervalos ("1-3, 5").
+
+    :param chapters: Lista de capítulos em ordem crescente.
+    :return: Texto com os intervalos.
+    """
+    ranges = []
+    start = prev = None
+    for chapter in chapters:
+        if prev is not None and chapter == prev + 1:
+            prev = chapter
+            continue
+        if start is not None:
+            ranges.append(f"{start}-{prev}" if start != prev else f"{start}")
+        start = prev = chapter
+    if start is not None:
+        ranges.append(f"{start}-{prev}" if start != prev else f"{start}")
+    return ", ".join(ranges)
+
+
+class MessageComposer:
+    """
+    Agrupa os capítulos do dia no menor número de mensagens possível.
+
+    Os capítulos são concatenados e divididos apenas entre versículos, de forma
+    que cada mensagem fique abaixo de `max_length`. Como a ordem é fixa, o
+    preenchimento guloso produz o número mínimo de mensagens e o resultado é
+    sempre o mesmo para a mesma leitura.
+    """
+
+    def __init__(self, max_length: int = MAX_MESSAGE_LENGTH) -> None:
+        """
+        Inicializa o compositor.
+
+        :param max_length: Número máximo de caracteres por mensagem.
+        """
+        if max_length <= len(UNIT_SEPARATOR):
+            raise ValueError("Tamanho máximo de mensagem inválido")
+        self.max_length = max_length
+
+    def day_header(self, day: date, readings: List[Dict[str, Union[str, List[int]]]]) -> str:
+        """
+        Monta o cabeçalho da leitura do dia.
+
+        :param day: Data da leitura.
+        :param readings: Lista de dicionários com o nome do livro e os capítulos.
+        :return: Cabeçalho formatado.
+        """
+        books = "; ".join(
+            f"{reading['book']} {format_chapters(reading['chapters'])}"
+            for reading in readings
+        )
+        return f"*Leitura do dia {day.strftime('%d/%m/%Y')}*\n{books}"
+
+    def split_units(self, text: str) -> List[str]:
+        """
+        Divide um capítulo em unidades que não podem ser separadas.
+
+        Cada unidade é um versículo; títulos e cabeçalhos (entre `*`) ficam junto
+        do versículo seguinte e parágrafos sem número continuam o anterior.
+
+        :param text: Texto do capítulo.
+        :return: Lista de unidades.
+        """
+        paragraphs = [p.strip() for p in text.replace("\r\n", "\n").split(UNIT_SEPARATOR)]
+        units: List[str] = []
+        pending: List[str] = []
+        for paragraph in paragraphs:
+            if not paragraph:
+                continue
+            if VERSE_PATTERN.match(paragraph):
+                pending.append(paragraph)
+                units.append(UNIT_SEPARATOR.join(pending))
+                pending = []
+            elif paragraph.startswith("*") or not units:
+                pending.append(paragraph)
+            else:
+                units[-1] += UNIT_SEPARATOR + paragraph
+        if pending:
+            units.append(UNIT_SEPARATOR.join(pending))
+
+        return [piece for unit in units for piece in self.split_oversized(unit)]
+
+    def split_oversized(self, unit: str) -> List[str]:
+        """
+        Divide uma unidade maior que `max_length` entre palavras.
+
+        :param unit: Texto da unidade.
+        :return: Lista de partes que cabem em uma mensagem.
+        """
+        if len(unit) <= self.max_length:
+            return [unit]
+
+        pieces: List[str] = []
+        current = ""
+        for token in re.split(r"(\s+)", unit):
+            while len(token) > self.max_length:
+                if current:
+                    pieces.append(current)
+                    current = ""
+                pieces.append(token[:self.max_length])
+                token = token[self.max_length:]
+            if len(current) + len(token) > self.max_length:
+                pieces.append(current)
+                current = token.lstrip()
+            else:
+                current += token
+        if current.strip():
+            pieces.append(current)
+        return [piece.strip() for piece in pieces if piece.strip()]
+
+    def pack(self, units: List[str]) -> List[str]:
+        """
+        Preenche as mensagens em ordem, iniciando uma nova apenas quando a
+        próxima unidade não cabe.
+
+        :param units: Unidades já menores que `max_length`.
+        :return: Lista de mensagens.
+        """
+        messages: List[str] = []
+        current = ""
+        for unit in units:
+            if not current:
+                current = unit
+            elif len(current) + len(UNIT_SEPARATOR) + len(unit) <= self.max_length:
+                current += UNIT_SEPARATOR + unit
+            else:
+                messages.append(current)
+                current = unit
+        if current:
+            messages.append(current)
+        return messages
+
+    def compose(self, header: str, chapter_texts: List[str]) -> List[str]:
+        """
+        Monta as mensagens do dia a partir do cabeçalho e dos capítulos.
+
+        :param header: Cabeçalho do dia.
+        :param chapter_texts: Textos dos capítulos, na ordem de leitura.
+        :return: Lista de mensagens a serem enviadas.
+        """
+        units = self.split_oversized(header.strip()) if header.strip() else []
+        for text in chapter_texts:
+            units.extend(self.split_units(text))
+        return self.pack(units)
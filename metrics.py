@@ -0,0 +1,260 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, TextIO, Tuple
+
+METRICS_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "metrics")
+)
+EVENTS_FILE_NAME = "events.jsonl"
+PROMETHEUS_FILE_NAME = "bible_notifier.prom"
+METRIC_PREFIX = "bible_notifier_"
+
+# Set to 1 (or to a directory) to record metrics without changing the code
+METRICS_ENV = "BIBLE_NOTIFIER_METRICS"
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class NullSpan:
+    """
+    Span used while metrics are disabled; entering and leaving it does nothing.
+    """
+
+    def __enter__(self) -> "NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+
+class Span:
+    """
+    Times a block and reports it to its `Metrics` on exit.
+    """
+
+    __slots__ = ("metrics", "name", "labels", "start")
+
+    def __init__(self, metrics: "Metrics", name: str, labels: Dict[str, str]) -> None:
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+        self.start = 0.0
+
+    def __enter__(self) -> "Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.metrics.observe(self.name, time.perf_counter() - self.start, exc_type is None, **self.labels)
+        return False
+
+
+class Metrics:
+    """
+    Timing spans and counters exported as JSONL events and as a Prometheus
+    text-format file (e.g. for the node_exporter textfile collector).
+
+    While disabled, `span` returns a shared no-op context manager and
+    `incr`/`observe` return immediately, so instrumented hot paths pay only a
+    method call and an attribute check.
+    """
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        """
+        Initializes the registry, enabled only when `directory` is given.
+
+        Args:
+            directory (Optional[str]): Where the JSONL and Prometheus files are written.
+        """
+        self.lock = threading.Lock()
+        self.counters: Dict[Tuple[str, LabelKey], float] = {}
+        self.spans: Dict[Tuple[str, LabelKey], list] = {}
+        self.events: Optional[TextIO] = None
+        self.directory: Optional[str] = None
+        self.prometheus_file_name = PROMETHEUS_FILE_NAME
+        self.enabled = False
+        if directory is not None:
+            self.enable(directory)
+
+    @classmethod
+    def from_env(cls) -> "Metrics":
+        """
+        Builds the registry from the METRICS_ENV environment variable.
+
+        Returns:
+            Metrics: Enabled in METRICS_DIR when the variable is "1", in the
+            given directory for any other non-empty value, disabled otherwise.
+        """
+        value = os.environ.get(METRICS_ENV, "")
+        if value in ("", "0"):
+            return cls()
+        return cls(METRICS_DIR if value == "1" else value)
+
+    def enable(self, directory: str = METRICS_DIR) -> None:
+        """
+        Starts recording into `directory`.
+
+        Args:
+            directory (str): Where the JSONL and Prometheus files are written.
+        """
+        os.makedirs(directory, exist_ok=True)
+        with self.lock:
+            if self.events is not None:
+                self.events.close()
+            self.directory = directory
+            self.events = open(os.path.join(directory, EVENTS_FILE_NAME), "a", encoding="UTF-8")
+            self.enabled = True
+
+    def disable(self) -> None:
+        """
+        Flushes and stops recording.
+        """
+        if not self.enabled:
+            return
+        self.flush()
+        with self.lock:
+            self.enabled = False
+            if self.events is not None:
+                self.events.close()
+                self.events = None
+
+    def span(self, name: str, **labels: str):
+        """
+        Times a block: `with metrics.span("find_chat"): ...`.
+
+        Args:
+            name (str): Step name.
+            **labels (str): Extra Prometheus labels.
+
+        Returns:
+            A context manager recording the duration and whether it raised.
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, labels)
+
+    def observe(self, name: str, seconds: float, ok: bool = True, **labels: str) -> None:
+        """
+        Records a finished step.
+
+        Args:
+            name (str): Step name.
+            seconds (float): Duration.
+            ok (bool): False if the step raised.
+            **labels (str): Extra Prometheus labels.
+        """
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        event = {"ts": datetime.now().isoformat(), "span": name, "seconds": round(seconds, 6), "ok": ok, **labels}
+        with self.lock:
+            stats = self.spans.get(key)
+            if stats is None:
+                stats = self.spans[key] = [0, 0.0, 0.0, 0]
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+            if not ok:
+                stats[3] += 1
+            if self.events is not None:
+                self.events.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+    def incr(self, name: str, value: float = 1, **labels: str) -> None:
+        """
+        Increments a counter.
+
+        Args:
+            name (str): Counter name.
+            value (float): Amount to add.
+            **labels (str): Extra Prometheus labels.
+        """
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    @staticmethod
+    def format_labels(labels: LabelKey) -> str:
+        """
+        Formats labels for the Prometheus text format.
+
+        Args:
+            labels (LabelKey): Sorted (name, value) pairs.
+
+        Returns:
+            str: `{a="1",b="2"}`, or an empty string without labels.
+        """
+        if not labels:
+            return ""
+        pairs = []
+        for name, value in labels:
+            value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            pairs.append(f'{name}="{value}"')
+        return "{" + ",".join(pairs) + "}"
+
+    def prometheus_text(self) -> str:
+        """
+        Renders every span and counter in the Prometheus text format.
+
+        Returns:
+            str: The exposition text.
+        """
+        with self.lock:
+            spans = sorted(self.spans.items())
+            counters = sorted(self.counters.items())
+
+        # Samples grouped by metric family, as the text format expects
+        families: Dict[str, Tuple[str, list]] = {}
+
+        def add(family: str, kind: str, suffix: str, labels: LabelKey, value: str) -> None:
+            samples = families.setdefault(family, (kind, []))[1]
+            samples.append(f"{family}{suffix}{self.format_labels(labels)} {value}")
+
+        for (name, labels), (count, total, maximum, errors) in spans:
+            add(f"{METRIC_PREFIX}{name}_seconds", "summary", "_count", labels, str(count))
+            add(f"{METRIC_PREFIX}{name}_seconds", "summary", "_sum", labels, f"{total:.6f}")
+            add(f"{METRIC_PREFIX}{name}_seconds_max", "gauge", "", labels, f"{maximum:.6f}")
+            add(f"{METRIC_PREFIX}{name}_errors_total", "counter", "", labels, str(errors))
+        for (name, labels), value in counters:
+            add(f"{METRIC_PREFIX}{name}_total", "counter", "", labels, f"{value:g}")
+
+        lines = []
+        for family, (kind, samples) in families.items():
+            lines.append(f"# TYPE {family} {kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+    def flush(self) -> None:
+        """
+        Flushes the JSONL events and rewrites the Prometheus file atomically.
+        """
+        if not self.enabled or self.directory is None:
+            return
+        with self.lock:
+            if self.events is not None:
+                self.events.flush()
+        path = os.path.join(self.directory, self.prometheus_file_name)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="UTF-8") as file:
+            file.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+
+# Process-wide registry used by the instrumented modules
+metrics = Metrics.from_env()
+
+
+if __name__ == "__main__":
+    demo = Metrics(METRICS_DIR)
+    with demo.span("demo"):
+        time.sleep(0.01)
+    demo.incr("demo_events")
+    demo.flush()
+    print(demo.prometheus_text())
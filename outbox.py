@@ -0,0 +1,267 @@
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from dispatcher import DispatchResult, FanOutDispatcher
+from state_store import DEFAULT_RECIPIENT, StateStore
+
+
+def aware(moment: datetime) -> datetime:
+    """
+    Makes a datetime timezone-aware, so deadlines stored by older versions
+    (naive local time) compare with the scheduler's clock.
+
+    Args:
+        moment (datetime): A naive (local) or aware datetime.
+
+    Returns:
+        datetime: The same moment, timezone-aware.
+    """
+    return moment if moment.tzinfo is not None else moment.astimezone()
+
+
+class Outbox:
+    """
+    Durable, resumable delivery of a day's messages.
+
+    Messages are stored with stable idempotency keys before anything is sent
+    and each one is marked delivered on its own, so after a crash or browser
+    failure delivery resumes from the first undelivered message. Failures are
+    retried with bounded exponential backoff: `deliver` never waits, and
+    `next_retry` tells the caller when to call it again.
+    """
+
+    def __init__(
+        self,
+        store: StateStore,
+        base_delay: float = 30.0,
+        max_delay: float = 1800.0,
+        retries: int = 3,
+        now: Callable[[], datetime] = datetime.now
+    ) -> None:
+        """
+        Initializes the outbox.
+
+        Args:
+            store (StateStore): Where messages and delivery state are persisted.
+            base_delay (float): Backoff after the first failure, in seconds.
+            max_delay (float): Upper bound for the backoff, in seconds.
+            retries (int): Failed attempts of a message after which `next_retry`
+                stops offering an early retry and the failure is left for the
+                next scheduled run.
+            now (Callable[[], datetime]): Clock used for backoff deadlines.
+        """
+        self.store = store
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retries = retries
+        self.now = now
+
+    def backoff(self, attempts: int) -> float:
+        """
+        Computes the delay before the next attempt.
+
+        Args:
+            attempts (int): Failed attempts so far (at least 1).
+
+        Returns:
+            float: Seconds to wait.
+        """
+        return min(self.base_delay * 2 ** max(attempts - 1, 0), self.max_delay)
+
+    def has_day(self, day: date, plan: str = DEFAULT_RECIPIENT) -> bool:
+        """
+        Checks whether the day's messages were already enqueued.
+
+        Args:
+            day (date): Reading day.
+            plan (str): Reading plan.
+
+        Returns:
+            bool: True if the day is in the outbox.
+        """
+        return self.store.has_batch(day, plan)
+
+    def missing(
+        self,
+        day: date,
+        recipients: Union[List[str], Dict[str, str]],
+        plan: str = DEFAULT_RECIPIENT
+    ) -> Dict[str, str]:
+        """
+        Finds recipients with nothing enqueued for the day: plans not enqueued
+        yet and recipients added to a plan after its day was enqueued.
+
+        Args:
+            day (date): Reading day.
+            recipients (Union[List[str], Dict[str, str]]): Recipients to
+                consider, or a mapping of each recipient to its plan.
+            plan (str): Reading plan of recipients given as a list.
+
+        Returns:
+            Dict[str, str]: The plan of each recipient without messages.
+        """
+        plans = self.plans_of(recipients, plan)
+        enqueued = {
+            recipient_plan: self.store.enqueued_recipients(day, recipient_plan)
+            for recipient_plan in dict.fromkeys(plans.values())
+        }
+        return {
+            recipient: recipient_plan for recipient, recipient_plan in plans.items()
+            if recipient not in enqueued[recipient_plan]
+        }
+
+    def enqueue(
+        self,
+        day: date,
+        batches: Dict[str, List[str]],
+        state: Tuple[Optional[str], int, bool],
+        plan: str = DEFAULT_RECIPIENT
+    ) -> None:
+        """
+        Persists the day's messages and the reading state to save once delivered.
+
+        Args:
+            day (date): Reading day.
+            batches (Dict[str, List[str]]): Messages by recipient, in order.
+            state (Tuple[Optional[str], int, bool]): (book, chapter, finished) after the reading.
+            plan (str): Reading plan.
+        """
+        self.store.enqueue_batch(day, list(batches.items()), state, plan)
+
+    def due(
+        self,
+        day: date,
+        recipients: Union[List[str], Dict[str, str]],
+        plan: str = DEFAULT_RECIPIENT
+    ) -> Dict[str, List[Tuple[str, str, int]]]:
+        """
+        Collects undelivered messages whose backoff has expired.
+
+        Args:
+            day (date): Reading day.
+            recipients (Union[List[str], Dict[str, str]]): Recipients to
+                consider, or a mapping of each recipient to its plan.
+            plan (str): Reading plan of recipients given as a list.
+
+        Returns:
+            Dict[str, List[Tuple[str, str, int]]]: (key, payload, attempts) by recipient, in order.
+        """
+        now = aware(self.now())
+        due = {}
+        for recipient, recipient_plan in self.plans_of(recipients, plan).items():
+            pending = self.store.pending_messages(day, recipient, recipient_plan)
+            if not pending:
+                continue
+            next_attempt_at = pending[0][3]
+            if next_attempt_at is not None and aware(datetime.fromisoformat(next_attempt_at)) > now:
+                continue
+            due[recipient] = [(key, payload, attempts) for key, payload, attempts, _ in pending]
+        return due
+
+    def next_retry(
+        self,
+        day: date,
+        recipients: Union[List[str], Dict[str, str]],
+        plan: str = DEFAULT_RECIPIENT
+    ) -> Optional[datetime]:
+        """
+        Finds when undelivered messages should be retried within the run.
+
+        Args:
+            day (date): Reading day.
+            recipients (Union[List[str], Dict[str, str]]): Recipients to
+                consider, or a mapping of each recipient to its plan.
+            plan (str): Reading plan of recipients given as a list.
+
+        Returns:
+            Optional[datetime]: The earliest backoff deadline among messages
+            that failed fewer than `retries` times, or None if there is none.
+        """
+        retry = None
+        for recipient, recipient_plan in self.plans_of(recipients, plan).items():
+            pending = self.store.pending_messages(day, recipient, recipient_plan)
+            if not pending:
+                continue
+            _, _, attempts, next_attempt_at = pending[0]
+            if next_attempt_at is None or attempts >= self.retries:
+                continue
+            when = aware(datetime.fromisoformat(next_attempt_at))
+            retry = when if retry is None else min(retry, when)
+        return retry
+
+    @staticmethod
+    def plans_of(recipients: Union[List[str], Dict[str, str]], plan: str) -> Dict[str, str]:
+        """
+        Normalizes recipients to a mapping of recipient to plan.
+
+        Args:
+            recipients (Union[List[str], Dict[str, str]]): Recipients or recipient-to-plan mapping.
+            plan (str): Plan of recipients given as a list.
+
+        Returns:
+            Dict[str, str]: The plan of each recipient.
+        """
+        if isinstance(recipients, dict):
+            return recipients
+        return {recipient: plan for recipient in recipients}
+
+    def deliver(
+        self,
+        dispatcher: FanOutDispatcher,
+        day: date,
+        recipients: Union[List[str], Dict[str, str]],
+        plan: str = DEFAULT_RECIPIENT
+    ) -> Dict[str, DispatchResult]:
+        """
+        Sends the pending messages that are due, in a single round, and sets
+        the backoff deadline of the failed ones.
+
+        Recipients of several plans are delivered in the same round, so they
+        share the dispatcher's concurrency.
+
+        Args:
+            dispatcher (FanOutDispatcher): Delivers the messages.
+            day (date): Reading day.
+            recipients (Union[List[str], Dict[str, str]]): Recipients of the
+                day, or a mapping of each recipient to its plan.
+            plan (str): Reading plan of recipients given as a list.
+
+        Returns:
+            Dict[str, DispatchResult]: Last outcome by recipient; recipients
+            with nothing due are omitted.
+        """
+        plans = self.plans_of(recipients, plan)
+        results: Dict[str, DispatchResult] = {}
+        due = self.due(day, plans)
+        if due:
+            def on_sent(recipient: str, index: int) -> None:
+                self.store.mark_delivered(due[recipient][index][0])
+
+            results = dispatcher.dispatch(
+                {recipient: [payload for _, payload, _ in messages] for recipient, messages in due.items()},
+                on_sent
+            )
+            for recipient, result in results.items():
+                self.store.record_attempt(day, result.error is None, result.error, recipient)
+                if result.error is None:
+                    continue
+                key, _, attempts = due[recipient][result.sent]
+                wait = self.backoff(attempts + 1)
+                self.store.mark_failed(key, result.error, self.now() + timedelta(seconds=wait))
+
+        # Only recipients whose messages were all delivered count as sent; a
+        # plan with a recipient that has nothing enqueued is not complete
+        enqueued = {
+            recipient_plan: self.store.enqueued_recipients(day, recipient_plan)
+            for recipient_plan in dict.fromkeys(plans.values())
+        }
+        incomplete = set()
+        for recipient, recipient_plan in plans.items():
+            if recipient not in enqueued[recipient_plan]:
+                incomplete.add(recipient_plan)
+            elif not self.store.pending_messages(day, recipient, recipient_plan):
+                self.store.mark_sent(day, recipient)
+        for recipient_plan in enqueued:
+            if recipient_plan not in incomplete:
+                self.store.complete_batch(day, recipient_plan)
+        return results
@@ -0,0 +1,484 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from http import HTTPStatus
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from controller import Controller
+from message_composer import format_chapters
+from state_store import DEFAULT_RECIPIENT
+from translation_store import DEFAULT_TRANSLATION
+from verse_index import ReferenceResolver
+
+API_HOST = "127.0.0.1"
+API_PORT = 8765
+
+# How long a plan's saved position is trusted before the state store is read again
+STATE_TTL = 1.0
+RESPONSE_CACHE_ENTRIES = 4096
+MAX_REQUEST_BYTES = 8192
+IDLE_TIMEOUT = 30.0
+
+# Plans and status change when a day is sent; chapters only when the service restarts
+DYNAMIC_CACHE_CONTROL = "no-cache"
+STATIC_CACHE_CONTROL = "public, max-age=3600"
+
+
+class Response:
+    """
+    A fully encoded HTTP response, built once and replayed from the cache.
+
+    The status line and headers are encoded together with the body, so a
+    cached hit or a 304 costs one `write` without any formatting.
+    """
+
+    def __init__(self, status: int, payload: Any, cache_control: str = DYNAMIC_CACHE_CONTROL) -> None:
+        """
+        Encodes the response.
+
+        Args:
+            status (int): HTTP status code.
+            payload (Any): JSON-serializable body.
+            cache_control (str): Value of the Cache-Control header.
+        """
+        self.status = status
+        self.body = json.dumps(payload, ensure_ascii=False).encode("UTF-8")
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+        headers = [
+            ("Content-Type", "application/json; charset=utf-8"),
+            ("ETag", self.etag),
+            ("Cache-Control", cache_control),
+        ]
+        self.head = self.encode_head(status, headers + [("Content-Length", str(len(self.body)))])
+        self.not_modified = self.encode_head(HTTPStatus.NOT_MODIFIED, headers)
+
+    @staticmethod
+    def encode_head(status: int, headers: List[Tuple[str, str]]) -> bytes:
+        """
+        Encodes a status line and headers, without the blank line that ends them.
+
+        Args:
+            status (int): HTTP status code.
+            headers (List[Tuple[str, str]]): Header names and values.
+
+        Returns:
+            bytes: The encoded lines.
+        """
+        lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+        lines.extend(f"{name}: {value}" for name, value in headers)
+        return ("\r\n".join(lines) + "\r\n").encode("latin-1")
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """
+        Checks whether the client already has this response.
+
+        Args:
+            if_none_match (Optional[str]): Value of the If-None-Match header.
+
+        Returns:
+            bool: True if a 304 should be sent instead of the body.
+        """
+        if not if_none_match or self.status != HTTPStatus.OK:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or self.etag in tags or f"W/{self.etag}" in tags
+
+    def encode(self, if_none_match: Optional[str], head_only: bool, keep_alive: bool) -> bytes:
+        """
+        Returns the bytes to write for a request.
+
+        Args:
+            if_none_match (Optional[str]): Value of the If-None-Match header.
+            head_only (bool): True for HEAD requests.
+            keep_alive (bool): Whether the connection stays open.
+
+        Returns:
+            bytes: The response.
+        """
+        connection = b"Connection: keep-alive\r\n\r\n" if keep_alive else b"Connection: close\r\n\r\n"
+        if self.matches(if_none_match):
+            return self.not_modified + connection
+        if head_only:
+            return self.head + connection
+        return self.head + connection + self.body
+
+
+def error_response(status: int, message: str) -> Response:
+    """
+    Builds a JSON error response.
+
+    Args:
+        status (int): HTTP status code.
+        message (str): Error description.
+
+    Returns:
+        Response: The response.
+    """
+    return Response(status, {"error": message}, "no-store")
+
+
+class ResponseCache:
+    """
+    LRU cache of encoded responses.
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_ENTRIES) -> None:
+        """
+        Initializes the cache.
+
+        Args:
+            max_entries (int): Maximum number of responses kept.
+        """
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Hashable, Response]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Response]:
+        """
+        Looks up a response and marks it as recently used.
+
+        Args:
+            key (Hashable): The response key.
+
+        Returns:
+            Optional[Response]: The response, or None if not cached.
+        """
+        response = self.entries.get(key)
+        if response is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return response
+
+    def put(self, key: Hashable, response: Response) -> None:
+        """
+        Stores a response, evicting the least recently used one if full.
+
+        Args:
+            key (Hashable): The response key.
+            response (Response): The response.
+        """
+        self.entries[key] = response
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+class QueryAPI:
+    """
+    Read-only HTTP API over the reading plans and the corpus.
+
+    Endpoints:
+        GET /plan?date=YYYY-MM-DD[&plan=...|&recipient=...]: readings of a day.
+        GET /chapter/{abbrev}/{n}[?translation=...]: text of a chapter.
+        GET /status: position and last send of each plan in use.
+
+    The corpus is loaded once at startup. Responses are cached by everything
+    they depend on (for plans, the saved position, schedule and today's send,
+    re-read at most every `state_ttl` seconds), and carry an ETag so that
+    polling clients get a 304 without a body.
+    """
+
+    def __init__(self, controller: Controller, state_ttl: float = STATE_TTL) -> None:
+        """
+        Initializes the API and loads the corpus.
+
+        Args:
+            controller (Controller): Gives access to the corpus, state and contacts.
+            state_ttl (float): Seconds a plan's saved state is reused before re-reading it.
+        """
+        self.controller = controller
+        self.bible_manager = controller.bible_manager
+        self.state_store = controller.state_store
+        self.state_ttl = state_ttl
+        self.resolver = ReferenceResolver()
+        self.cache = ResponseCache()
+        self.plan_states: Dict[str, Tuple[float, Hashable]] = {}
+        self.recipient_plans = controller.recipient_plans()
+        self.plans = {DEFAULT_RECIPIENT, *self.recipient_plans.values()}
+        self.bible_manager.load_corpus()
+        self.translations = set(self.bible_manager.translations())
+        self.requests = 0
+
+    def plan_state(self, plan: str, today: date) -> Hashable:
+        """
+        Returns what a plan's readings depend on, re-reading it at most every `state_ttl` seconds.
+
+        Args:
+            plan (str): Reading plan.
+            today (date): The current day.
+
+        Returns:
+            Hashable: (today, position, sent today, schedule) of the plan.
+        """
+        now = time.monotonic()
+        cached = self.plan_states.get(plan)
+        if cached is not None and now - cached[0] < self.state_ttl and cached[1][0] == today:
+            return cached[1]
+        state = (
+            today,
+            tuple(self.bible_manager.current_state(plan)),
+            self.state_store.was_completed(today, plan),
+            self.bible_manager.plan_schedule(plan),
+        )
+        self.plan_states[plan] = (now, state)
+        return state
+
+    def handle(self, path: str) -> Response:
+        """
+        Routes a GET request to a cached or freshly built response.
+
+        Args:
+            path (str): Request target, with the query string.
+
+        Returns:
+            Response: The response.
+        """
+        self.requests += 1
+        url = urlsplit(path)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        parts = [unquote(part) for part in url.path.strip("/").split("/")]
+        try:
+            if parts == ["plan"]:
+                return self.plan(query)
+            if len(parts) == 3 and parts[0] == "chapter":
+                return self.chapter(parts[1], parts[2], query)
+            if parts == ["status"]:
+                return self.status()
+        except ValueError as e:
+            return error_response(HTTPStatus.BAD_REQUEST, str(e))
+        return error_response(HTTPStatus.NOT_FOUND, f"Unknown endpoint: {url.path}")
+
+    def cached(self, key: Hashable, build: Callable[[], Response]) -> Response:
+        """
+        Returns the cached response for `key`, building it on a miss.
+
+        Args:
+            key (Hashable): Everything the response depends on.
+            build (Callable[[], Response]): Builds the response.
+
+        Returns:
+            Response: The response.
+        """
+        response = self.cache.get(key)
+        if response is None:
+            response = build()
+            self.cache.put(key, response)
+        return response
+
+    def readings_payload(self, books_chapters: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Adds the book names to a day's readings.
+
+        Args:
+            books_chapters (List[Dict[str, Any]]): Books and chapters of the day.
+
+        Returns:
+            List[Dict[str, Any]]: Abbreviation, name, chapters and label of each book.
+        """
+        books = self.bible_manager.bible_books
+        return [
+            {
+                "book": reading["book"],
+                "name": books[reading["book"]]["book"],
+                "chapters": reading["chapters"],
+                "label": f"{books[reading['book']]['book']} {format_chapters(reading['chapters'])}",
+            }
+            for reading in books_chapters
+        ]
+
+    def plan(self, query: Dict[str, str]) -> Response:
+        """
+        GET /plan: readings of a day, assuming every day until then is sent.
+
+        Args:
+            query (Dict[str, str]): `date` (default: the next send day) and
+                `plan` or `recipient` (default: the default plan).
+
+        Returns:
+            Response: The day's readings.
+        """
+        if "recipient" in query:
+            plan = self.recipient_plans.get(query["recipient"])
+            if plan is None:
+                return error_response(HTTPStatus.NOT_FOUND, f"Unknown recipient: {query['recipient']}")
+        else:
+            plan = query.get("plan", DEFAULT_RECIPIENT)
+            if plan not in self.plans:
+                return error_response(HTTPStatus.NOT_FOUND, f"Unknown plan: {plan}")
+        today = datetime.today().date()
+        state = self.plan_state(plan, today)
+        first_day = today + timedelta(days=1) if state[2] else today
+        try:
+            day = date.fromisoformat(query["date"]) if "date" in query else first_day
+        except ValueError:
+            raise ValueError(f"Invalid date: {query['date']} (expected YYYY-MM-DD)") from None
+        if day < first_day:
+            raise ValueError(f"{day.isoformat()} is before the next send ({first_day.isoformat()})")
+
+        def build() -> Response:
+            offset = (day - first_day).days
+            readings = self.bible_manager.upcoming_readings(
+                offset + 1, state=state[1], schedule=state[3]
+            )
+            if offset < len(readings):
+                books_chapters, (book, chapter, finished) = readings[offset]
+            else:
+                # Past the end of the plan there is nothing to read; report the final position
+                books_chapters, (book, chapter, finished) = [], readings[-1][1] if readings else state[1]
+            return Response(HTTPStatus.OK, {
+                "plan": plan,
+                "date": day.isoformat(),
+                "readings": self.readings_payload(books_chapters),
+                "position_after": {"book": book, "chapter": chapter},
+                "finished": finished or not books_chapters,
+            })
+
+        return self.cached(("plan", plan, day, state), build)
+
+    def chapter(self, book_name: str, number: str, query: Dict[str, str]) -> Response:
+        """
+        GET /chapter/{abbrev}/{n}: text of a chapter.
+
+        Args:
+            book_name (str): Abbreviation, name or unique prefix of the book.
+            number (str): Chapter number.
+            query (Dict[str, str]): `translation` (default: the default translation).
+
+        Returns:
+            Response: The chapter text and verse count.
+        """
+        book = self.resolver.book(book_name)
+        if not number.isdigit():
+            raise ValueError(f"Invalid chapter: {number}")
+        chapter = int(number)
+        translation = query.get("translation", DEFAULT_TRANSLATION)
+        if translation not in self.translations:
+            return error_response(HTTPStatus.NOT_FOUND, f"Unknown translation: {translation}")
+
+        def build() -> Response:
+            text = self.bible_manager.get_chapter_text(book, f"{chapter:02d}", translation)
+            name = self.bible_manager.bible_books.get(book, {}).get("book", book)
+            if text is None:
+                return error_response(HTTPStatus.NOT_FOUND, f"Chapter not found: {name} {chapter}")
+            return Response(HTTPStatus.OK, {
+                "book": book,
+                "name": name,
+                "chapter": chapter,
+                "translation": translation,
+                "text": text,
+            }, STATIC_CACHE_CONTROL)
+
+        return self.cached(("chapter", book, chapter, translation), build)
+
+    def status(self) -> Response:
+        """
+        GET /status: position, schedule and last send of each plan in use.
+
+        Returns:
+            Response: The status of every plan.
+        """
+        today = datetime.today().date()
+        plans: Dict[str, List[str]] = {}
+        for recipient, plan in self.recipient_plans.items():
+            plans.setdefault(plan, []).append(recipient)
+        states = tuple((plan, self.plan_state(plan, today)) for plan in plans)
+
+        def build() -> Response:
+            payload = {"date": today.isoformat(), "chapters": self.bible_manager.total_chapters, "plans": []}
+            for plan, (_, (book, chapter, finished), sent_today, schedule) in states:
+                last_sent = self.state_store.last_completed_day(plan)
+                payload["plans"].append({
+                    "plan": plan,
+                    "recipients": plans[plan],
+                    "position": {"book": book, "chapter": chapter, "finished": finished},
+                    "schedule_days": len(schedule),
+                    "last_sent": last_sent.isoformat() if last_sent else None,
+                    "sent_today": sent_today,
+                })
+            return Response(HTTPStatus.OK, payload)
+
+        return self.cached(("status", states), build)
+
+    async def serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Serves the requests of one (keep-alive) connection.
+
+        Args:
+            reader (asyncio.StreamReader): Connection input.
+            writer (asyncio.StreamWriter): Connection output.
+        """
+        try:
+            while True:
+                try:
+                    raw = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), IDLE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    response = error_response(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Request too large")
+                    writer.write(response.encode(None, False, False))
+                    break
+
+                lines = raw.decode("latin-1").split("\r\n")
+                request_line = lines[0].split(" ")
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                if len(request_line) != 3:
+                    response = error_response(HTTPStatus.BAD_REQUEST, "Malformed request")
+                    writer.write(response.encode(None, False, False))
+                    break
+
+                method, target, version = request_line
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+                if method not in ("GET", "HEAD"):
+                    response = error_response(HTTPStatus.METHOD_NOT_ALLOWED, f"Method not allowed: {method}")
+                else:
+                    response = self.handle(target)
+                writer.write(response.encode(headers.get("if-none-match"), method == "HEAD", keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = API_HOST, port: int = API_PORT) -> None:
+        """
+        Serves the API until cancelled.
+
+        Args:
+            host (str): Address to listen on; local only by default.
+            port (int): Port to listen on.
+        """
+        server = await asyncio.start_server(self.serve_connection, host, port, limit=MAX_REQUEST_BYTES)
+        address = server.sockets[0].getsockname()
+        print(
+            f"Serving on http://{address[0]}:{address[1]} ({self.bible_manager.total_chapters} chapters loaded)",
+            flush=True
+        )
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the reading plans and chapters over a local HTTP API.")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--state-ttl", type=float, default=STATE_TTL, help="Seconds a plan's saved state is reused")
+    args = parser.parse_args()
+
+    api = QueryAPI(Controller(), args.state_ttl)
+    try:
+        asyncio.run(api.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
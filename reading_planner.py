@@ -0,0 +1,118 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from bible_manager import BibleManager
+from state_store import DEFAULT_RECIPIENT
+from translation_store import DEFAULT_TRANSLATION
+
+
+@dataclass
+class ReadingGroup:
+    """
+    Destinatários que recebem exatamente a mesma leitura no dia.
+
+    :param state: Estado (livro, capítulo, concluído) antes da leitura.
+    :param nums_chapter: Número de capítulos por dia do plano.
+    :param message_format: Configurações que afetam a formatação das mensagens.
+    :param schedule: Cronograma balanceado do plano (vazio para `nums_chapter` capítulos por dia).
+    :param translation: Tradução do texto enviado ao grupo.
+    :param plans: Destinatários de cada plano do grupo.
+    :param readings: Livros e capítulos do dia, calculados uma vez para o grupo.
+    :param next_state: Estado após a leitura.
+    """
+    state: Tuple[str, int, bool]
+    nums_chapter: int
+    message_format: Tuple[Tuple[str, Any], ...]
+    schedule: Tuple[int, ...] = ()
+    translation: str = DEFAULT_TRANSLATION
+    plans: Dict[str, List[str]] = field(default_factory=dict)
+    readings: List[Dict[str, Union[str, List[int]]]] = field(default_factory=list)
+    next_state: Optional[Tuple[str, int, bool]] = None
+
+    @property
+    def recipients(self) -> List[str]:
+        """
+        :return: Todos os destinatários do grupo.
+        """
+        return [recipient for recipients in self.plans.values() for recipient in recipients]
+
+
+@dataclass
+class DedupStats:
+    """
+    Métricas do agrupamento: quantas leituras foram renderizadas para quantos destinatários.
+
+    :param recipients: Número de destinatários.
+    :param plans: Número de planos distintos.
+    :param groups: Número de leituras distintas (renderizações).
+    """
+    recipients: int = 0
+    plans: int = 0
+    groups: int = 0
+
+    @property
+    def ratio(self) -> float:
+        """
+        :return: Destinatários atendidos por renderização (1.0 sem deduplicação).
+        """
+        return self.recipients / self.groups if self.groups else 0.0
+
+    @property
+    def saved(self) -> int:
+        """
+        :return: Renderizações evitadas em relação a uma por destinatário.
+        """
+        return self.recipients - self.groups
+
+
+def group_recipients(
+    bible_manager: BibleManager,
+    recipient_plans: Dict[str, str],
+    message_format: Optional[Dict[str, Any]] = None,
+    nums_chapter: int = 4,
+    recipient_translations: Optional[Dict[str, str]] = None
+) -> Tuple[List[ReadingGroup], DedupStats]:
+    """
+    Agrupa os destinatários por (posição, cronograma, tradução, formato) e
+    calcula a leitura de cada grupo uma única vez.
+
+    :param bible_manager: Gerenciador da Bíblia com os estados de leitura.
+    :param recipient_plans: Plano de leitura de cada destinatário.
+    :param message_format: Configurações que afetam a formatação das mensagens.
+    :param nums_chapter: Número de capítulos por dia.
+    :param recipient_translations: Tradução de cada destinatário; por padrão, a tradução padrão.
+    :return: Tupla (grupos na ordem de aparição, métricas de deduplicação).
+    """
+    fmt = tuple(sorted((message_format or {}).items()))
+    states: Dict[str, Tuple[str, int, bool]] = {}
+    schedules: Dict[str, Tuple[int, ...]] = {}
+    groups: Dict[Tuple[Any, ...], ReadingGroup] = {}
+
+    recipient_translations = recipient_translations or {}
+    for recipient, plan in recipient_plans.items():
+        translation = recipient_translations.get(recipient, DEFAULT_TRANSLATION)
+        if plan not in states:
+            states[plan] = bible_manager.current_state(plan)
+            schedules[plan] = bible_manager.plan_schedule(plan)
+        state = tuple(states[plan])
+        key = (state, nums_chapter, schedules[plan], translation, fmt)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = ReadingGroup(state, nums_chapter, fmt, schedules[plan], translation)
+        group.plans.setdefault(plan, []).append(recipient)
+
+    for group in groups.values():
+        group.readings, group.next_state = bible_manager.reading_after(
+            *group.state, group.nums_chapter, group.schedule
+        )
+
+    stats = DedupStats(len(recipient_plans), len(states), len(groups))
+    return list(groups.values()), stats
+
+
+if __name__ == "__main__":
+    bible_manager = BibleManager()
+    groups, stats = group_recipients(bible_manager, {"Bloco de Notas": DEFAULT_RECIPIENT})
+    for group in groups:
+        print(f"{group.state} -> {group.readings}: {group.recipients}")
+    print(f"{stats.recipients} destinatários, {stats.groups} leituras, razão {stats.ratio:.1f}")
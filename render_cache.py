@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+from datetime import date
+from typing import Any, Iterable, List, Optional
+
+RENDER_CACHE_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "config", "render_cache")
+)
+
+# Bump when the message layout changes so older payloads are not reused
+RENDER_FORMAT_VERSION = 1
+
+
+class RenderCache:
+    """
+    On-disk cache of rendered daily message payloads.
+
+    Entries are addressed by the SHA-256 of everything that determines the
+    rendered text (content hashes of the day's chapters, day, readings and
+    message format), so editing a chapter or changing the plan produces a new
+    key only for the affected days instead of serving a stale payload.
+    `prune` drops the entries that are no longer reachable.
+    """
+
+    def __init__(self, cache_dir: str = RENDER_CACHE_DIR) -> None:
+        """
+        Initializes the cache.
+
+        Args:
+            cache_dir (str): Directory holding the payload files.
+        """
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(corpus: str, day: date, readings: Any, message_format: Any) -> str:
+        """
+        Computes the content address of a payload.
+
+        Args:
+            corpus (str): Signature of the content of the day's chapters.
+            day (date): Day the messages are for (it appears in the header).
+            readings (Any): The day's books and chapters.
+            message_format (Any): Settings that affect rendering, e.g. the message length limit.
+
+        Returns:
+            str: Hex digest identifying the payload.
+        """
+        inputs = {
+            "version": RENDER_FORMAT_VERSION,
+            "corpus": corpus,
+            "day": day.isoformat(),
+            "readings": readings,
+            "format": message_format,
+        }
+        encoded = json.dumps(inputs, sort_keys=True, ensure_ascii=False).encode("UTF-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def path(self, key: str) -> str:
+        """
+        Returns the file of a payload.
+
+        Args:
+            key (str): The payload key.
+
+        Returns:
+            str: Path of the payload file.
+        """
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[List[str]]:
+        """
+        Loads a payload.
+
+        Args:
+            key (str): The payload key.
+
+        Returns:
+            Optional[List[str]]: The rendered messages, or None if not cached.
+        """
+        try:
+            with open(self.path(key), "r", encoding="UTF-8") as file:
+                messages = json.load(file)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return messages
+
+    def put(self, key: str, messages: List[str]) -> None:
+        """
+        Stores a payload atomically.
+
+        Args:
+            key (str): The payload key.
+            messages (List[str]): The rendered messages.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path(key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="UTF-8") as file:
+            json.dump(messages, file, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def prune(self, keep: Iterable[str]) -> int:
+        """
+        Removes every payload not listed in `keep`.
+
+        Args:
+            keep (Iterable[str]): Keys still reachable from the current plan.
+
+        Returns:
+            int: Number of files removed.
+        """
+        keep_files = {f"{key}.json" for key in keep}
+        removed = 0
+        try:
+            entries = list(os.scandir(self.cache_dir))
+        except FileNotFoundError:
+            return 0
+        for entry in entries:
+            if entry.is_file() and entry.name not in keep_files:
+                os.remove(entry.path)
+                removed += 1
+        return removed
+
+
+if __name__ == "__main__":
+    cache = RenderCache()
+    count = len(os.listdir(cache.cache_dir)) if os.path.isdir(cache.cache_dir) else 0
+    print(f"{count} payloads in {cache.cache_dir}")
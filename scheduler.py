@@ -0,0 +1,485 @@
+import heapq
+import itertools
+import random
+import threading
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, tzinfo
+from typing import Callable, List, Optional, Tuple, Union
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+
+# What to do with runs missed while the process was suspended or busy
+CATCH_UP_SKIP = "skip"  # drop missed runs, wait for the next one
+CATCH_UP_ONCE = "once"  # run once now, then resume the normal schedule
+CATCH_UP_ALL = "all"    # run every missed occurrence
+
+# Upper bound for a single wait, so a resume from suspend is noticed quickly
+MAX_WAIT_SECONDS = 60.0
+
+
+def resolve_timezone(tz: Union[str, tzinfo, None]) -> Optional[tzinfo]:
+    """
+    Resolves a timezone name or object.
+
+    Args:
+        tz (Union[str, tzinfo, None]): IANA name (e.g. "America/Sao_Paulo"), tzinfo or None.
+
+    Returns:
+        Optional[tzinfo]: The timezone, or None for the system's local time.
+    """
+    if tz is None:
+        return None
+    if isinstance(tz, str):
+        if ZoneInfo is None:
+            raise ValueError("Named timezones require Python 3.9+ (zoneinfo)")
+        return ZoneInfo(tz)
+    return tz
+
+
+class Clock:
+    """
+    Wall-clock source for the scheduler.
+    """
+
+    def now(self) -> datetime:
+        """
+        Returns the current time.
+
+        Returns:
+            datetime: The current timezone-aware time.
+        """
+        return datetime.now().astimezone()
+
+    def wait(self, condition: threading.Condition, timeout: float) -> None:
+        """
+        Blocks on `condition` (held by the caller) for at most `timeout` seconds.
+
+        Args:
+            condition (threading.Condition): The scheduler's condition.
+            timeout (float): Maximum seconds to wait.
+        """
+        condition.wait(timeout)
+
+
+class FakeClock(Clock):
+    """
+    A manually advanced clock for tests and simulations.
+    """
+
+    def __init__(self, start: datetime) -> None:
+        """
+        Initializes the clock.
+
+        Args:
+            start (datetime): Initial time; naive values are taken as local time.
+        """
+        self.current = start if start.tzinfo is not None else start.astimezone()
+
+    def now(self) -> datetime:
+        """
+        Returns the simulated time.
+
+        Returns:
+            datetime: The current fake time.
+        """
+        return self.current
+
+    def set(self, when: datetime) -> None:
+        """
+        Moves the clock to `when` (never backwards).
+
+        Args:
+            when (datetime): The new time; naive values are taken as local time.
+        """
+        if when.tzinfo is None:
+            when = when.astimezone()
+        if when > self.current:
+            self.current = when
+
+    def advance(self, delta: timedelta) -> None:
+        """
+        Moves the clock forward.
+
+        Args:
+            delta (timedelta): How much to advance.
+        """
+        self.current += delta
+
+    def wait(self, condition: threading.Condition, timeout: float) -> None:
+        # Time only moves when the test advances it; yield briefly to avoid spinning.
+        condition.wait(min(timeout, 0.01))
+
+
+class DailyTrigger:
+    """
+    Fires at fixed wall-clock times every day in a timezone.
+    """
+
+    def __init__(self, times: List[time], tz: Union[str, tzinfo, None] = None) -> None:
+        """
+        Initializes the trigger.
+
+        Args:
+            times (List[time]): Times of day to fire at.
+            tz (Union[str, tzinfo, None]): Timezone of the times; local by default.
+        """
+        if not times:
+            raise ValueError("DailyTrigger needs at least one time")
+        self.times = sorted(times)
+        self.tz = resolve_timezone(tz)
+
+    def next_after(self, after: datetime) -> datetime:
+        """
+        Returns the first firing time strictly after `after`.
+
+        Args:
+            after (datetime): Reference time (timezone-aware).
+
+        Returns:
+            datetime: The next firing time.
+        """
+        local = after.astimezone(self.tz)
+        day: date = local.date()
+        while True:
+            for t in self.times:
+                if self.tz is None:
+                    # The local UTC offset is looked up for each date, so DST changes are followed
+                    candidate = datetime.combine(day, t).astimezone()
+                else:
+                    candidate = datetime.combine(day, t, tzinfo=self.tz)
+                if candidate > after:
+                    return candidate
+            day += timedelta(days=1)
+
+
+class IntervalTrigger:
+    """
+    Fires every `interval`, aligned to `start`.
+    """
+
+    def __init__(self, interval: timedelta, start: Optional[datetime] = None) -> None:
+        """
+        Initializes the trigger.
+
+        Args:
+            interval (timedelta): Time between runs.
+            start (Optional[datetime]): Alignment reference; the epoch by default.
+        """
+        if interval <= timedelta(0):
+            raise ValueError("Interval must be positive")
+        self.interval = interval
+        self.start = start or datetime(1970, 1, 1).astimezone()
+
+    def next_after(self, after: datetime) -> datetime:
+        """
+        Returns the first aligned time strictly after `after`.
+
+        Args:
+            after (datetime): Reference time (timezone-aware).
+
+        Returns:
+            datetime: The next firing time.
+        """
+        periods = (after - self.start) // self.interval + 1
+        return self.start + periods * self.interval
+
+
+class OnceTrigger:
+    """
+    Fires a single time, e.g. for a retry at a backoff deadline.
+    """
+
+    def __init__(self, when: datetime) -> None:
+        """
+        Initializes the trigger.
+
+        Args:
+            when (datetime): When to fire; naive values are taken as local time.
+        """
+        self.when = when if when.tzinfo is not None else when.astimezone()
+
+    def next_after(self, after: datetime) -> Optional[datetime]:
+        """
+        Returns the firing time if it is still ahead.
+
+        Args:
+            after (datetime): Reference time (timezone-aware).
+
+        Returns:
+            Optional[datetime]: `when`, or None once it has passed.
+        """
+        return self.when if self.when > after else None
+
+
+@dataclass
+class Job:
+    """
+    A scheduled job.
+
+    Attributes:
+        name (str): Unique job name.
+        func (Callable[[], None]): What to run.
+        trigger: Object with `next_after(datetime) -> Optional[datetime]`;
+            None ends the job.
+        catch_up (str): One of CATCH_UP_SKIP, CATCH_UP_ONCE, CATCH_UP_ALL.
+        jitter (float): Maximum random delay in seconds added to each run.
+        misfire_grace (float): Lateness in seconds still treated as on time.
+        scheduled (datetime): Nominal time of the next run, without jitter.
+        run_at (datetime): Actual time of the next run, with jitter.
+    """
+    name: str
+    func: Callable[[], None]
+    trigger: object
+    catch_up: str = CATCH_UP_ONCE
+    jitter: float = 0.0
+    misfire_grace: float = 60.0
+    scheduled: Optional[datetime] = None
+    run_at: Optional[datetime] = None
+    runs: int = 0
+    version: int = 0
+    rng: random.Random = field(default_factory=random.Random, repr=False)
+
+
+class Scheduler:
+    """
+    Runs many jobs from a single thread using a priority queue ordered by the
+    next run time.
+
+    The thread sleeps until the earliest job is due (at most MAX_WAIT_SECONDS at
+    a time, so wall-clock jumps after a suspend are noticed), so it keeps one
+    thread and no CPU use while idle. With a `FakeClock`, `run_until` replays
+    the schedule deterministically without the thread.
+    """
+
+    def __init__(self, clock: Optional[Clock] = None) -> None:
+        """
+        Initializes an empty scheduler.
+
+        Args:
+            clock (Optional[Clock]): Time source; the system clock by default.
+        """
+        self.clock = clock or Clock()
+        self.jobs = {}
+        self.heap: List[Tuple[datetime, int, int, Job]] = []
+        self.counter = itertools.count()
+        self.condition = threading.Condition()
+        self.thread: Optional[threading.Thread] = None
+        self.running = False
+
+    def push(self, job: Job) -> None:
+        """
+        Queues the job's next run. Must be called with `self.condition` held.
+
+        Args:
+            job (Job): The job.
+        """
+        job.run_at = job.scheduled + timedelta(seconds=job.rng.uniform(0, job.jitter)) if job.jitter else job.scheduled
+        heapq.heappush(self.heap, (job.run_at, next(self.counter), job.version, job))
+        self.condition.notify()
+
+    def add_job(
+        self,
+        name: str,
+        func: Callable[[], None],
+        trigger: object,
+        catch_up: str = CATCH_UP_ONCE,
+        jitter: float = 0.0,
+        misfire_grace: float = 60.0
+    ) -> Job:
+        """
+        Adds or replaces a job.
+
+        Args:
+            name (str): Unique job name.
+            func (Callable[[], None]): What to run.
+            trigger (object): Object with `next_after(datetime) -> Optional[datetime]`.
+            catch_up (str): Policy for runs missed by more than `misfire_grace`.
+            jitter (float): Maximum random delay in seconds added to each run.
+            misfire_grace (float): Lateness in seconds still treated as on time.
+
+        Returns:
+            Job: The scheduled job.
+        """
+        if catch_up not in (CATCH_UP_SKIP, CATCH_UP_ONCE, CATCH_UP_ALL):
+            raise ValueError(f"Unknown catch-up policy: {catch_up}")
+        with self.condition:
+            old = self.jobs.get(name)
+            job = Job(name, func, trigger, catch_up, jitter, misfire_grace)
+            if old is not None:
+                job.version = old.version + 1
+            job.scheduled = trigger.next_after(self.clock.now())
+            if job.scheduled is None:
+                self.jobs.pop(name, None)
+                return job
+            self.jobs[name] = job
+            self.push(job)
+            return job
+
+    def remove_job(self, name: str) -> None:
+        """
+        Removes a job; its queued entry is discarded lazily.
+
+        Args:
+            name (str): The job name.
+        """
+        with self.condition:
+            job = self.jobs.pop(name, None)
+            if job is not None:
+                job.version += 1
+
+    def next_run_time(self) -> Optional[datetime]:
+        """
+        Returns the time of the earliest queued run.
+
+        Returns:
+            Optional[datetime]: When the earliest job is due, or None if there are no jobs.
+        """
+        with self.condition:
+            self.discard_stale()
+            return self.heap[0][0] if self.heap else None
+
+    def discard_stale(self) -> None:
+        """
+        Drops heap entries of removed or replaced jobs. Must be called with
+        `self.condition` held.
+        """
+        while self.heap:
+            _, _, version, job = self.heap[0]
+            if self.jobs.get(job.name) is job and version == job.version:
+                return
+            heapq.heappop(self.heap)
+
+    def pop_due(self, now: datetime) -> Optional[Tuple[Job, bool]]:
+        """
+        Takes the earliest due job and requeues its next run.
+
+        Args:
+            now (datetime): Current time.
+
+        Returns:
+            Optional[Tuple[Job, bool]]: The job and whether it should run, or None.
+        """
+        with self.condition:
+            self.discard_stale()
+            if not self.heap or self.heap[0][0] > now:
+                return None
+            _, _, _, job = heapq.heappop(self.heap)
+
+            late = (now - job.run_at).total_seconds() > job.misfire_grace
+            should_run = not late or job.catch_up != CATCH_UP_SKIP
+            if late and job.catch_up in (CATCH_UP_SKIP, CATCH_UP_ONCE):
+                job.scheduled = job.trigger.next_after(now)
+            else:
+                job.scheduled = job.trigger.next_after(job.scheduled)
+            if job.scheduled is None:
+                del self.jobs[job.name]
+            else:
+                self.push(job)
+            return job, should_run
+
+    def run_job(self, job: Job) -> None:
+        """
+        Runs a job, keeping the scheduler alive if it raises.
+
+        Args:
+            job (Job): The job.
+        """
+        try:
+            job.func()
+        except Exception as e:
+            print(f"Scheduled job '{job.name}' failed: {e}")
+        job.runs += 1
+
+    def run_pending(self) -> int:
+        """
+        Runs every job that is due now, in order.
+
+        Returns:
+            int: Number of jobs executed.
+        """
+        executed = 0
+        now = self.clock.now()
+        while True:
+            due = self.pop_due(now)
+            if due is None:
+                return executed
+            job, should_run = due
+            if should_run:
+                self.run_job(job)
+                executed += 1
+
+    def run_until(self, end: datetime) -> int:
+        """
+        Replays the schedule up to `end` on a FakeClock, running jobs at their times.
+
+        Args:
+            end (datetime): Time to stop at.
+
+        Returns:
+            int: Number of jobs executed.
+        """
+        if not isinstance(self.clock, FakeClock):
+            raise TypeError("run_until requires a FakeClock")
+        executed = 0
+        while True:
+            next_run = self.next_run_time()
+            if next_run is None or next_run > end:
+                break
+            self.clock.set(next_run)
+            executed += self.run_pending()
+        self.clock.set(end)
+        return executed
+
+    def loop(self) -> None:
+        """
+        Thread body: sleeps until the next job is due and runs it.
+        """
+        while self.running:
+            self.run_pending()
+            with self.condition:
+                if not self.running:
+                    break
+                self.discard_stale()
+                timeout = MAX_WAIT_SECONDS
+                if self.heap:
+                    delay = (self.heap[0][0] - self.clock.now()).total_seconds()
+                    timeout = max(0.0, min(delay, MAX_WAIT_SECONDS))
+                if timeout > 0:
+                    self.clock.wait(self.condition, timeout)
+
+    def run(self) -> None:
+        """
+        Runs the scheduler in the calling thread, blocking until `stop` is called.
+        """
+        if self.running:
+            raise RuntimeError("Scheduler is already running")
+        self.running = True
+        try:
+            self.loop()
+        finally:
+            self.running = False
+
+    def start(self) -> None:
+        """
+        Starts the scheduler in a background thread. The thread does not keep
+        the process alive; use `run` to block on the schedule instead.
+        """
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self.loop, name="scheduler", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops the scheduler thread.
+        """
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+        self.thread = None
@@ -0,0 +1,358 @@
+import os
+import re
+import sys
+import json
+import mmap
+import struct
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Optional, Set, Tuple
+
+from bible_manager import BibleManager, fold_name
+from chapter_cache import ChapterVerses
+from corpus_manifest import WORD_PATTERN
+
+# Formato do índice:
+#   MAGIC | tamanho do cabeçalho (u32) | cabeçalho JSON | tabela de termos | listas de ocorrências
+# O cabeçalho lista os capítulos (livro, capítulo, hash) na ordem canônica e os
+# termos em ordem alfabética; a tabela tem uma entrada (offset, quantidade) por
+# termo. Cada ocorrência é um u32 `(capítulo << 8 | versículo) << 9 | posição`,
+# então as listas ficam ordenadas por versículo e uma frase é a interseção das
+# listas de seus termos deslocadas pela posição de cada um.
+INDEX_MAGIC = b"BRNIDX\x01\x00"
+INDEX_VERSION = 1
+INDEX_FILE_NAME = "search.idx"
+
+VERSE_BITS = 8
+POSITION_BITS = 9
+CHAPTER_SHIFT = VERSE_BITS + POSITION_BITS
+# Palavras além desta posição no versículo não são indexadas; assim uma frase
+# nunca casa atravessando o fim de um versículo
+MAX_POSITION = 255
+
+QUERY_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+
+_HEADER_LEN = struct.Struct("<I")
+_TERM_ENTRY = struct.Struct("<II")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Separa as palavras de um texto, em minúsculas e sem acentos.
+
+    :param text: Texto.
+    :return: Palavras na ordem em que aparecem.
+    """
+    return WORD_PATTERN.findall(fold_name(text))
+
+
+def index_chapter(text: str, chapter_index: int, postings: Dict[str, List[int]]) -> None:
+    """
+    Acrescenta as ocorrências das palavras de um capítulo às listas de ocorrências.
+
+    :param text: Texto do capítulo.
+    :param chapter_index: Posição do capítulo na ordem canônica (a partir de 0).
+    :param postings: Ocorrências por termo, atualizadas no lugar.
+    """
+    verses = ChapterVerses.parse(text)
+    for verse in range(1, verses.last_verse + 1):
+        verse_text = verses.verse(text, verse)
+        if verse_text is None:
+            continue
+        verse_id = chapter_index << VERSE_BITS | verse
+        for position, term in enumerate(tokenize(verse_text)[:MAX_POSITION + 1]):
+            postings.setdefault(term, []).append(verse_id << POSITION_BITS | position)
+
+
+def write_index(
+    index_path: str,
+    signature: str,
+    chapters: List[Tuple[str, int, Optional[str]]],
+    postings: Dict[str, array]
+) -> None:
+    """
+    Grava o índice de forma atômica.
+
+    :param index_path: Caminho do arquivo de saída.
+    :param signature: Assinatura do corpus (`CorpusManifest.digest`).
+    :param chapters: Capítulos (livro, capítulo, hash) na ordem canônica.
+    :param postings: Ocorrências ordenadas de cada termo.
+    """
+    terms = sorted(term for term, codes in postings.items() if len(codes))
+    header = json.dumps(
+        {
+            "version": INDEX_VERSION,
+            "signature": signature,
+            "byteorder": sys.byteorder,
+            "chapters": chapters,
+            "terms": terms
+        },
+        ensure_ascii=False
+    ).encode("UTF-8")
+
+    table = bytearray()
+    offset = 0
+    for term in terms:
+        table += _TERM_ENTRY.pack(offset, len(postings[term]))
+        offset += len(postings[term])
+
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(INDEX_MAGIC)
+        file.write(_HEADER_LEN.pack(len(header)))
+        file.write(header)
+        file.write(table)
+        for term in terms:
+            postings[term].tofile(file)
+    os.replace(tmp_path, index_path)
+
+
+class SearchIndex:
+    """
+    Leitor do índice invertido, mapeado em memória.
+
+    As listas de ocorrências são lidas direto do mmap; nenhuma consulta carrega
+    o texto dos capítulos.
+    """
+
+    def __init__(self, index_path: str) -> None:
+        self.index_path = index_path
+        self._file = open(index_path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise
+        self._view = memoryview(self._mmap)
+
+        if bytes(self._view[:len(INDEX_MAGIC)]) != INDEX_MAGIC:
+            self.close()
+            raise ValueError(f"Arquivo de índice inválido: {index_path}")
+
+        pos = len(INDEX_MAGIC)
+        (header_len,) = _HEADER_LEN.unpack_from(self._mmap, pos)
+        pos += _HEADER_LEN.size
+        self.header = json.loads(bytes(self._view[pos:pos + header_len]).decode("UTF-8"))
+        pos += header_len
+
+        self.signature: str = self.header.get("signature", "")
+        self.chapters: List[Tuple[str, int, Optional[str]]] = [tuple(chapter) for chapter in self.header["chapters"]]
+        self.terms: List[str] = self.header["terms"]
+        table_size = _TERM_ENTRY.size * len(self.terms)
+        self._table = self._view[pos:pos + table_size]
+        self._codes = self._view[pos + table_size:].cast("I")
+
+    @classmethod
+    def open_if_fresh(cls, index_path: str, signature: Optional[str] = None) -> Optional["SearchIndex"]:
+        """
+        Abre o índice se ele existir e for válido.
+
+        :param index_path: Caminho do arquivo do índice.
+        :param signature: Assinatura atual do corpus; se informada, o índice precisa corresponder a ela.
+        :return: Instância de `SearchIndex` ou None se ausente, inválido ou desatualizado.
+        """
+        if not os.path.exists(index_path):
+            return None
+        try:
+            index = cls(index_path)
+        except (OSError, ValueError, KeyError, TypeError, struct.error):
+            return None
+        if (
+            index.header.get("version") != INDEX_VERSION
+            or index.header.get("byteorder") != sys.byteorder
+            or (signature is not None and index.signature != signature)
+        ):
+            index.close()
+            return None
+        return index
+
+    def postings(self, term: str) -> memoryview:
+        """
+        :param term: Termo já normalizado (minúsculas, sem acentos).
+        :return: Ocorrências do termo, sem cópia; vazio se o termo não existir.
+        """
+        index = bisect_left(self.terms, term)
+        if index == len(self.terms) or self.terms[index] != term:
+            return self._codes[0:0]
+        offset, count = _TERM_ENTRY.unpack_from(self._table, index * _TERM_ENTRY.size)
+        return self._codes[offset:offset + count]
+
+    def prefix_terms(self, prefix: str) -> List[str]:
+        """
+        :param prefix: Início do termo, já normalizado.
+        :return: Termos que começam com o prefixo.
+        """
+        first = bisect_left(self.terms, prefix)
+        last = bisect_left(self.terms, prefix + "\uffff", first)
+        return self.terms[first:last]
+
+    def term_verses(self, term: str) -> Set[int]:
+        """
+        :param term: Termo já normalizado.
+        :return: Versículos (ids) em que o termo aparece.
+        """
+        return {code >> POSITION_BITS for code in self.postings(term)}
+
+    def phrase_verses(self, terms: List[str]) -> Set[int]:
+        """
+        :param terms: Termos da frase, em ordem.
+        :return: Versículos (ids) em que os termos aparecem em sequência.
+        """
+        if len(terms) == 1:
+            return self.term_verses(terms[0])
+        starts = set(self.postings(terms[0]))
+        for offset, term in enumerate(terms[1:], start=1):
+            if not starts:
+                break
+            starts &= {code - offset for code in self.postings(term)}
+        return {code >> POSITION_BITS for code in starts}
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[str, int, int]]:
+        """
+        Busca os versículos que contêm todos os termos da consulta.
+
+        Cada termo pode ser uma palavra (`amor`), um prefixo (`salv*`) ou uma
+        frase entre aspas (`"filho unigênito"`); acentos e maiúsculas são ignorados.
+
+        :param query: Consulta.
+        :param limit: Número máximo de resultados.
+        :return: Versículos (livro, capítulo, versículo) na ordem canônica.
+        """
+        verses: Optional[Set[int]] = None
+        for phrase, word in QUERY_PATTERN.findall(query):
+            if phrase:
+                terms = tokenize(phrase)
+                found = self.phrase_verses(terms) if terms else None
+            elif word.endswith("*") and tokenize(word):
+                found = set()
+                for term in self.prefix_terms(tokenize(word)[0]):
+                    found |= self.term_verses(term)
+            else:
+                terms = tokenize(word)
+                found = self.phrase_verses(terms) if terms else None
+            if found is None:
+                continue
+            verses = found if verses is None else verses & found
+            if not verses:
+                break
+
+        results = []
+        for verse_id in sorted(verses or ()):
+            book, chapter, _ = self.chapters[verse_id >> VERSE_BITS]
+            results.append((book, chapter, verse_id & ((1 << VERSE_BITS) - 1)))
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+    def close(self) -> None:
+        """
+        Libera o mmap e fecha o arquivo.
+        """
+        for view in ("_codes", "_table"):
+            if hasattr(self, view):
+                getattr(self, view).release()
+        self._view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Ainda existem listas referenciadas; o mmap é liberado com elas.
+            pass
+        self._file.close()
+
+
+def corpus_chapters(bible_manager: BibleManager) -> List[Tuple[str, int, Optional[str]]]:
+    """
+    :param bible_manager: Gerenciador da Bíblia.
+    :return: Capítulos (livro, capítulo, hash) na ordem canônica.
+    """
+    return [
+        (book, chapter, bible_manager.manifest.chapter_hash(book, chapter))
+        for book in bible_manager.book_order
+        for chapter in range(1, bible_manager.bible_books[book]["num_chapters"] + 1)
+    ]
+
+
+def build_index(
+    bible_manager: BibleManager,
+    index_path: str,
+    previous: Optional[SearchIndex] = None
+) -> Tuple[int, int]:
+    """
+    Gera o índice, reaproveitando do índice anterior os capítulos cujo hash não mudou.
+
+    Se a lista de capítulos mudou (capítulo novo ou removido), os ids dos
+    versículos mudam e todo o corpus é indexado novamente.
+
+    :param bible_manager: Gerenciador da Bíblia.
+    :param index_path: Caminho do arquivo de saída.
+    :param previous: Índice anterior, se houver.
+    :return: Tupla (capítulos indexados, capítulos reaproveitados).
+    """
+    chapters = corpus_chapters(bible_manager)
+    postings: Dict[str, array] = {}
+    changed = list(range(len(chapters)))
+
+    if previous is not None and [c[:2] for c in previous.chapters] == [c[:2] for c in chapters]:
+        changed = [i for i, chapter in enumerate(chapters) if previous.chapters[i][2] != chapter[2]]
+        # Cada capítulo ocupa um intervalo contínuo das listas ordenadas
+        ranges = [(i << CHAPTER_SHIFT, (i + 1) << CHAPTER_SHIFT) for i in changed]
+        for term in previous.terms:
+            codes = previous.postings(term)
+            kept = array("I")
+            pos = 0
+            for low, high in ranges:
+                first = bisect_left(codes, low, pos)
+                kept.frombytes(codes[pos:first].tobytes())
+                pos = bisect_left(codes, high, first)
+            kept.frombytes(codes[pos:].tobytes())
+            postings[term] = kept
+
+    new_postings: Dict[str, List[int]] = {}
+    for chapter_index in changed:
+        book, chapter, _ = chapters[chapter_index]
+        text = bible_manager.get_chapter_text(book, f"{chapter:02d}")
+        if text is not None:
+            index_chapter(text, chapter_index, new_postings)
+    for term, codes in new_postings.items():
+        merged = postings.setdefault(term, array("I"))
+        merged.extend(codes)
+        if len(merged) > len(codes):
+            postings[term] = array("I", sorted(merged))
+
+    write_index(index_path, bible_manager.source_signature(), chapters, postings)
+    return len(changed), len(chapters) - len(changed)
+
+
+def update_index(bible_manager: BibleManager, index_path: Optional[str] = None) -> SearchIndex:
+    """
+    Abre o índice, atualizando-o antes se o corpus mudou desde que foi gerado.
+
+    :param bible_manager: Gerenciador da Bíblia.
+    :param index_path: Caminho do arquivo; por padrão, `bible/search.idx`.
+    :return: Índice atualizado.
+    """
+    index_path = index_path or os.path.join(bible_manager.bible_dir, INDEX_FILE_NAME)
+    index = SearchIndex.open_if_fresh(index_path)
+    if index is not None and index.signature == bible_manager.source_signature():
+        return index
+    try:
+        build_index(bible_manager, index_path, index)
+    finally:
+        if index is not None:
+            index.close()
+    return SearchIndex(index_path)
+
+
+if __name__ == "__main__":
+    import time
+
+    bible_manager = BibleManager()
+    start = time.perf_counter()
+    search_index = update_index(bible_manager)
+    print(f"Índice pronto em {time.perf_counter() - start:.2f}s: {len(search_index.terms)} termos")
+
+    for query in ("amor", '"filho unigênito"', "salv* graça", "jerusalem"):
+        start = time.perf_counter()
+        results = search_index.search(query)
+        elapsed = time.perf_counter() - start
+        print(f"{query}: {len(results)} versículos em {elapsed * 1000:.1f}ms")
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+SESSION_HEALTH_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "config", "data", "session_health.json")
+)
+
+# How long a verified session is trusted without waiting for WhatsApp Web to load
+SESSION_HEALTH_TTL = 12 * 3600
+
+
+def cookie_fingerprint(cookies: List[Dict[str, Any]]) -> str:
+    """
+    Identifies a set of session cookies, regardless of their order.
+
+    Args:
+        cookies (List[Dict[str, Any]]): Cookies as returned by Selenium.
+
+    Returns:
+        str: Hex digest of the cookies' domains, names and values.
+    """
+    identity = sorted(
+        (str(cookie.get("domain", "")), str(cookie.get("name", "")), str(cookie.get("value", "")))
+        for cookie in cookies
+    )
+    return hashlib.sha256(json.dumps(identity).encode("UTF-8")).hexdigest()
+
+
+class SessionHealth:
+    """
+    Record of the last time the saved WhatsApp Web session was verified.
+
+    A session verified less than `ttl` seconds ago, with the same cookies that
+    are saved now, is trusted: the browser starts headless with those cookies
+    and the login is re-checked in the background instead of blocking the send.
+    """
+
+    def __init__(
+        self,
+        path: str = SESSION_HEALTH_PATH,
+        ttl: float = SESSION_HEALTH_TTL,
+        now: Callable[[], float] = time.time
+    ) -> None:
+        """
+        Initializes the record.
+
+        Args:
+            path (str): JSON file holding the record.
+            ttl (float): Seconds a verification is trusted.
+            now (Callable[[], float]): Clock, in seconds since the epoch.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.now = now
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Reads the record.
+
+        Returns:
+            Optional[Dict[str, Any]]: `verified_at` and `fingerprint`, or None
+            if the session was never verified or the record is unreadable.
+        """
+        try:
+            with open(self.path, "r", encoding="UTF-8") as file:
+                record = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(record, dict) or "verified_at" not in record or "fingerprint" not in record:
+            return None
+        return record
+
+    def record(self, fingerprint: str) -> None:
+        """
+        Marks the session with these cookies as verified now.
+
+        Args:
+            fingerprint (str): `cookie_fingerprint` of the saved cookies.
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="UTF-8") as file:
+            json.dump({"verified_at": self.now(), "fingerprint": fingerprint}, file)
+        os.replace(tmp_path, self.path)
+
+    def invalidate(self) -> None:
+        """
+        Forgets the verification, so the next start checks the login in the foreground.
+        """
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def age(self) -> Optional[float]:
+        """
+        Returns:
+            Optional[float]: Seconds since the last verification, or None if never verified.
+        """
+        record = self.load()
+        return self.now() - record["verified_at"] if record is not None else None
+
+    def is_trusted(self, fingerprint: Optional[str]) -> bool:
+        """
+        Checks whether the saved session can be used without the blocking login check.
+
+        Args:
+            fingerprint (Optional[str]): `cookie_fingerprint` of the cookies
+                saved now, or None if there are none.
+
+        Returns:
+            bool: True if these cookies were verified less than `ttl` seconds ago.
+        """
+        record = self.load()
+        if record is None or fingerprint is None or record["fingerprint"] != fingerprint:
+            return False
+        return 0 <= self.now() - record["verified_at"] < self.ttl
+
+
+if __name__ == "__main__":
+    health = SessionHealth()
+    record = health.load()
+    if record is None:
+        print("WhatsApp session never verified.")
+    else:
+        verified_at = datetime.fromtimestamp(record["verified_at"])
+        print(f"WhatsApp session verified at {verified_at:%Y-%m-%d %H:%M:%S} ({health.age() / 60:.0f} min ago).")
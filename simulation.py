@@ -0,0 +1,271 @@
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as day_time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from bible_manager import BibleManager
+from controller import Controller
+from render_cache import RenderCache
+from scheduler import FakeClock
+from state_store import StateStore
+from transport import Transport
+
+SUPPORT_USER = "Suporte"
+
+
+class NullTransport(Transport):
+    """
+    A transport that delivers nothing and only counts what it was given.
+    """
+
+    def __init__(self) -> None:
+        self.messages: Dict[str, int] = {}
+        self.characters = 0
+
+    def find_chat(self, contact_name: str) -> None:
+        pass
+
+    def send_message(self, contact_name: str, message: str) -> None:
+        self.messages[contact_name] = self.messages.get(contact_name, 0) + 1
+        self.characters += len(message)
+
+    def close(self) -> None:
+        pass
+
+
+@dataclass
+class PlanEvent:
+    """
+    Something noteworthy that happened to a plan on a simulated day.
+
+    Attributes:
+        day (date): The simulated day.
+        plan (str): The reading plan.
+        kind (str): "finished", "overran" (messages sent after the plan was
+            already finished), "wrapped" (position moved backwards past
+            Apocalipse) or "missed" (the day was not marked as completed).
+        position (int): Global chapter position at the end of the day.
+    """
+    day: date
+    plan: str
+    kind: str
+    position: int
+
+
+@dataclass
+class SimulationReport:
+    """
+    Outcome of a simulated run.
+
+    Attributes:
+        days (int): Simulated days.
+        recipients (int): Simulated recipients.
+        elapsed_s (float): Wall-clock seconds spent.
+        jobs (int): Scheduler jobs executed.
+        messages (int): Messages handed to the transport.
+        errors (int): Error reports sent to the support user.
+        positions (Dict[str, Tuple[str, int, bool]]): Final (book, chapter, finished) by plan.
+        events (List[PlanEvent]): Finished, overran, wrapped and missed days.
+    """
+    days: int
+    recipients: int
+    elapsed_s: float = 0.0
+    jobs: int = 0
+    messages: int = 0
+    errors: int = 0
+    positions: Dict[str, Tuple[str, int, bool]] = field(default_factory=dict)
+    events: List[PlanEvent] = field(default_factory=list)
+
+    @property
+    def days_per_s(self) -> float:
+        """
+        Returns:
+            float: Simulated days per wall-clock second.
+        """
+        return self.days / self.elapsed_s if self.elapsed_s else 0.0
+
+    def count(self, kind: str) -> int:
+        """
+        Args:
+            kind (str): An event kind.
+
+        Returns:
+            int: Number of (day, plan) events of that kind.
+        """
+        return sum(1 for event in self.events if event.kind == kind)
+
+
+def midnight(day: date) -> datetime:
+    """
+    Args:
+        day (date): A day.
+
+    Returns:
+        datetime: Local midnight at the start of `day`.
+    """
+    return datetime.combine(day, day_time()).astimezone()
+
+
+def build_contacts(recipients: int, plans: int) -> Dict[str, object]:
+    """
+    Spreads synthetic recipients round-robin over synthetic plans.
+
+    Args:
+        recipients (int): Number of recipients.
+        plans (int): Number of reading plans.
+
+    Returns:
+        Dict[str, object]: Contacts in the format of `Controller.load_contacts`.
+    """
+    names = [f"recipient-{index:04d}" for index in range(1, recipients + 1)]
+    return {
+        "test_user": SUPPORT_USER,
+        "support_user": SUPPORT_USER,
+        "reading_group": None,
+        "recipients": names,
+        "plans": {name: f"plan-{index % plans + 1}" for index, name in enumerate(names)},
+        "translations": {}
+    }
+
+
+def run_simulation(
+    days: int = 365,
+    recipients: int = 100,
+    plans: int = 4,
+    start: Optional[date] = None,
+    balanced_days: int = 365,
+    prerender: bool = True,
+    bible_manager: Optional[BibleManager] = None
+) -> SimulationReport:
+    """
+    Replays the controller's scheduled jobs day by day on a virtual clock.
+
+    The controller runs unchanged against an in-memory state store, a
+    throwaway render cache and a null transport, so nothing on disk is
+    touched besides the corpus manifest, which is validated once at start.
+    Even-numbered plans follow a balanced schedule of `balanced_days` days,
+    the others read the default number of chapters per day.
+
+    Args:
+        days (int): Days to simulate.
+        recipients (int): Number of recipients.
+        plans (int): Number of reading plans the recipients are spread over.
+        start (Optional[date]): First simulated day; today by default.
+        balanced_days (int): Length of the balanced schedules; 0 to disable them.
+        prerender (bool): Also run the overnight pre-render job.
+        bible_manager (Optional[BibleManager]): Reuses a loaded corpus across runs.
+
+    Returns:
+        SimulationReport: Throughput, final positions and plan events.
+    """
+    start = start or date.today()
+    transport = NullTransport()
+    state_store = StateStore(":memory:")
+    if bible_manager is None:
+        bible_manager = BibleManager(state_store=state_store)
+    else:
+        bible_manager.state_store = state_store
+    bible_manager.load_corpus()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        clock = FakeClock(midnight(start))
+        controller = Controller(
+            state_store=state_store,
+            clock=clock,
+            transport_factory=lambda: transport,
+            contacts=build_contacts(recipients, plans),
+            render_cache=RenderCache(cache_dir),
+            bible_manager=bible_manager
+        )
+        # Nothing is really sent, so there is no rate limit to respect, and the
+        # corpus loaded above does not change during the run
+        controller.min_send_interval = 0.0
+        controller.refresh_corpus_on_prerender = False
+        recipient_plans = controller.recipient_plans()
+        plan_names = list(dict.fromkeys(recipient_plans.values()))
+        if balanced_days:
+            for plan in plan_names[1::2]:
+                bible_manager.save_balanced_plan(balanced_days, plan)
+
+        # Jobs run only when the simulation advances the clock, not on the scheduler thread
+        controller.add_daily_jobs(prerender)
+
+        report = SimulationReport(days, recipients)
+        positions = {plan: 0 for plan in plan_names}
+        finished = {plan: False for plan in plan_names}
+        begin = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for offset in range(days):
+                day = start + timedelta(days=offset)
+                before = dict(transport.messages)
+                report.jobs += controller.scheduler.run_until(midnight(day + timedelta(days=1)))
+                delivered = dict.fromkeys(plan_names, 0)
+                for recipient, plan in recipient_plans.items():
+                    delivered[plan] += transport.messages.get(recipient, 0) - before.get(recipient, 0)
+                for plan in plan_names:
+                    book, chapter, done = bible_manager.current_state(plan)
+                    position = bible_manager.global_position(book, chapter)
+                    if not state_store.was_completed(day, plan):
+                        report.events.append(PlanEvent(day, plan, "missed", position))
+                    elif finished[plan] and delivered[plan]:
+                        report.events.append(PlanEvent(day, plan, "overran", position))
+                    if position < positions[plan]:
+                        report.events.append(PlanEvent(day, plan, "wrapped", position))
+                    if done and not finished[plan]:
+                        report.events.append(PlanEvent(day, plan, "finished", position))
+                    positions[plan], finished[plan] = position, done
+        report.elapsed_s = time.perf_counter() - begin
+
+    report.messages = sum(transport.messages.values())
+    report.errors = transport.messages.get(SUPPORT_USER, 0)
+    report.positions = {plan: bible_manager.current_state(plan) for plan in plan_names}
+    state_store.close()
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay the daily reading plan and scheduler on a virtual clock.")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--recipients", type=int, default=100)
+    parser.add_argument("--plans", type=int, default=4)
+    parser.add_argument("--start", type=date.fromisoformat, default=None, help="First day (YYYY-MM-DD)")
+    parser.add_argument("--balanced-days", type=int, default=365, help="Balanced schedule length; 0 to disable")
+    parser.add_argument("--no-prerender", action="store_true", help="Skip the overnight pre-render job")
+    parser.add_argument("--min-days-per-s", type=float, default=0.0, help="Fail below this throughput")
+    args = parser.parse_args()
+
+    report = run_simulation(
+        args.days, args.recipients, args.plans, args.start, args.balanced_days, not args.no_prerender
+    )
+    print(
+        f"Simulated {report.days} days for {report.recipients} recipients in {report.elapsed_s:.2f}s "
+        f"({report.days_per_s:.0f} days/s, {report.jobs} jobs, {report.messages} messages)"
+    )
+    for plan, (book, chapter, done) in report.positions.items():
+        print(f"{plan}: {book} {chapter}{' (finished)' if done else ''}")
+    for event in report.events:
+        if event.kind != "overran":
+            print(f"{event.day.isoformat()} {event.plan}: {event.kind} at chapter {event.position}")
+    overran: Dict[str, List[date]] = {}
+    for event in report.events:
+        if event.kind == "overran":
+            overran.setdefault(event.plan, []).append(event.day)
+    for plan, overran_days in overran.items():
+        print(f"{plan}: overran {len(overran_days)} days ({overran_days[0].isoformat()} to {overran_days[-1].isoformat()})")
+
+    failures = []
+    if report.errors:
+        failures.append(f"{report.errors} delivery errors")
+    for kind in ("missed", "wrapped", "overran"):
+        if report.count(kind):
+            failures.append(f"{report.count(kind)} {kind} plan days")
+    if report.days_per_s < args.min_days_per_s:
+        failures.append(f"{report.days_per_s:.0f} days/s (minimum {args.min_days_per_s:.0f})")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,587 @@
+import os
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager, nullcontext
+from datetime import date, datetime
+from typing import Iterator, List, Optional, Set, Tuple
+
+# Destinatário usado pelo estado antigo (arquivos JSON de um único grupo)
+DEFAULT_RECIPIENT = "default"
+
+STATE_DB_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "config", "state.db")
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS positions (
+    recipient TEXT PRIMARY KEY,
+    book TEXT NOT NULL,
+    chapter INTEGER NOT NULL,
+    finished INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sends (
+    recipient TEXT NOT NULL,
+    day TEXT NOT NULL,
+    sent_at TEXT NOT NULL,
+    PRIMARY KEY (recipient, day)
+);
+CREATE TABLE IF NOT EXISTS delivery_attempts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recipient TEXT NOT NULL,
+    day TEXT NOT NULL,
+    attempted_at TEXT NOT NULL,
+    success INTEGER NOT NULL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_attempts_recipient_day
+    ON delivery_attempts (recipient, day);
+CREATE TABLE IF NOT EXISTS daily_batches (
+    plan TEXT NOT NULL,
+    day TEXT NOT NULL,
+    book TEXT,
+    chapter INTEGER,
+    finished INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    completed_at TEXT,
+    PRIMARY KEY (plan, day)
+);
+CREATE TABLE IF NOT EXISTS outbox (
+    idempotency_key TEXT PRIMARY KEY,
+    plan TEXT NOT NULL,
+    day TEXT NOT NULL,
+    recipient TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TEXT,
+    last_error TEXT,
+    delivered_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_recipient_day
+    ON outbox (recipient, day, delivered_at, seq);
+CREATE INDEX IF NOT EXISTS idx_outbox_plan_day
+    ON outbox (plan, day, delivered_at);
+CREATE TABLE IF NOT EXISTS reading_schedules (
+    plan TEXT PRIMARY KEY,
+    metric TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    boundaries TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+"""
+
+
+def outbox_key(plan: str, day: date, recipient: str, seq: int) -> str:
+    """
+    Monta a chave de idempotência de uma mensagem do dia.
+
+    :param plan: Plano de leitura (destinatário cujo progresso é usado).
+    :param day: Dia da leitura.
+    :param recipient: Destinatário da mensagem.
+    :param seq: Posição da mensagem no dia.
+    :return: Chave estável da mensagem.
+    """
+    return f"{plan}/{day.isoformat()}/{recipient}/{seq}"
+
+
+class StateStore:
+    """
+    Armazena o progresso de leitura e o histórico de envios em SQLite (modo WAL).
+
+    Cada thread usa sua própria conexão, então leituras continuam rápidas e
+    consistentes enquanto o envio grava.
+    """
+
+    def __init__(self, db_path: str = STATE_DB_PATH) -> None:
+        """
+        Abre (ou cria) o banco de dados.
+
+        :param db_path: Caminho do arquivo SQLite, ou ":memory:" para um banco temporário.
+        """
+        self.db_path = db_path
+        self.local = threading.local()
+        self.memory_conn: Optional[sqlite3.Connection] = None
+        if db_path == ":memory:":
+            # Um banco em memória só existe na conexão que o criou
+            self.memory_conn = sqlite3.connect(db_path, check_same_thread=False)
+            self.lock = threading.RLock()
+        else:
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+            self.lock = None
+
+        conn = self.connection()
+        if self.memory_conn is None:
+            conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        self.migrate(conn)
+        conn.commit()
+
+    @staticmethod
+    def migrate(conn: sqlite3.Connection) -> None:
+        """
+        Atualiza bancos criados antes de a conclusão do dia ficar em `daily_batches`.
+
+        Até então um plano concluído era registrado em `sends` com o nome do
+        plano no lugar do destinatário, o que se confundia com um destinatário
+        de mesmo nome.
+
+        :param conn: Conexão aberta.
+        """
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(daily_batches)")]
+        if "completed_at" in columns:
+            return
+        conn.execute("ALTER TABLE daily_batches ADD COLUMN completed_at TEXT")
+        conn.execute(
+            "UPDATE daily_batches SET completed_at = "
+            "(SELECT sent_at FROM sends WHERE sends.recipient = daily_batches.plan AND sends.day = daily_batches.day)"
+        )
+        # Envios do plano padrão anteriores à caixa de saída não têm lote
+        conn.execute(
+            "INSERT OR IGNORE INTO daily_batches (plan, day, finished, created_at, completed_at) "
+            "SELECT recipient, day, 0, sent_at, sent_at FROM sends WHERE recipient = ?",
+            (DEFAULT_RECIPIENT,)
+        )
+
+    def connection(self) -> sqlite3.Connection:
+        """
+        Obtém a conexão da thread atual.
+
+        :return: Conexão SQLite.
+        """
+        if self.memory_conn is not None:
+            return self.memory_conn
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Abre uma transação na conexão da thread atual (commit ao final, rollback em erro).
+
+        :return: Conexão SQLite.
+        """
+        conn = self.connection()
+        with (self.lock if self.lock is not None else nullcontext()), conn:
+            yield conn
+
+    def execute(self, sql: str, params: tuple = ()) -> list:
+        """
+        Executa um comando em uma transação e retorna as linhas resultantes.
+
+        :param sql: Comando SQL.
+        :param params: Parâmetros do comando.
+        :return: Lista de linhas.
+        """
+        with self.transaction() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def get_position(self, recipient: str = DEFAULT_RECIPIENT) -> Optional[Tuple[str, int, bool]]:
+        """
+        Obtém a posição de leitura de um destinatário.
+
+        :param recipient: Destinatário.
+        :return: Tupla (livro, capítulo, concluído) ou None se não houver registro.
+        """
+        rows = self.execute(
+            "SELECT book, chapter, finished FROM positions WHERE recipient = ?",
+            (recipient,)
+        )
+        if not rows:
+            return None
+        book, chapter, finished = rows[0]
+        return book, chapter, bool(finished)
+
+    def save_position(
+        self,
+        book: str,
+        chapter: int,
+        finished: bool,
+        recipient: str = DEFAULT_RECIPIENT
+    ) -> None:
+        """
+        Salva a posição de leitura de um destinatário.
+
+        :param book: Livro atual.
+        :param chapter: Capítulo atual.
+        :param finished: Indica se a leitura foi concluída.
+        :param recipient: Destinatário.
+        """
+        self.execute(
+            "INSERT INTO positions (recipient, book, chapter, finished, updated_at) "
+            "VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (recipient) DO UPDATE SET book = excluded.book, "
+            "chapter = excluded.chapter, finished = excluded.finished, "
+            "updated_at = excluded.updated_at",
+            (recipient, book, chapter, int(finished), datetime.now().isoformat())
+        )
+
+    def was_sent(self, day: date, recipient: str = DEFAULT_RECIPIENT) -> bool:
+        """
+        Verifica se a leitura de um dia já foi enviada ao destinatário.
+
+        :param day: Dia da leitura.
+        :param recipient: Destinatário.
+        :return: True se já foi enviada.
+        """
+        return bool(self.execute(
+            "SELECT 1 FROM sends WHERE recipient = ? AND day = ?",
+            (recipient, day.isoformat())
+        ))
+
+    def last_sent_day(self, recipient: str = DEFAULT_RECIPIENT) -> Optional[date]:
+        """
+        Obtém o último dia enviado ao destinatário.
+
+        :param recipient: Destinatário.
+        :return: Data do último envio ou None.
+        """
+        rows = self.execute(
+            "SELECT MAX(day) FROM sends WHERE recipient = ?",
+            (recipient,)
+        )
+        return date.fromisoformat(rows[0][0]) if rows and rows[0][0] else None
+
+    def was_completed(self, day: date, plan: str = DEFAULT_RECIPIENT) -> bool:
+        """
+        Verifica se a leitura de um dia já foi entregue a todos os destinatários do plano.
+
+        :param day: Dia da leitura.
+        :param plan: Plano de leitura.
+        :return: True se o dia foi concluído.
+        """
+        return bool(self.execute(
+            "SELECT 1 FROM daily_batches WHERE plan = ? AND day = ? AND completed_at IS NOT NULL",
+            (plan, day.isoformat())
+        ))
+
+    def last_completed_day(self, plan: str = DEFAULT_RECIPIENT) -> Optional[date]:
+        """
+        Obtém o último dia concluído de um plano.
+
+        :param plan: Plano de leitura.
+        :return: Data do último dia concluído ou None.
+        """
+        rows = self.execute(
+            "SELECT MAX(day) FROM daily_batches WHERE plan = ? AND completed_at IS NOT NULL",
+            (plan,)
+        )
+        return date.fromisoformat(rows[0][0]) if rows and rows[0][0] else None
+
+    def mark_completed(self, day: date, plan: str = DEFAULT_RECIPIENT) -> None:
+        """
+        Registra um dia como concluído sem alterar a posição de leitura.
+
+        :param day: Dia da leitura.
+        :param plan: Plano de leitura.
+        """
+        now = datetime.now().isoformat()
+        self.execute(
+            "INSERT INTO daily_batches (plan, day, finished, created_at, completed_at) VALUES (?, ?, 0, ?, ?) "
+            "ON CONFLICT (plan, day) DO UPDATE SET completed_at = COALESCE(completed_at, excluded.completed_at)",
+            (plan, day.isoformat(), now, now)
+        )
+
+    def mark_sent(self, day: date, recipient: str = DEFAULT_RECIPIENT) -> None:
+        """
+        Registra o envio da leitura de um dia.
+
+        :param day: Dia da leitura.
+        :param recipient: Destinatário.
+        """
+        self.execute(
+            "INSERT OR IGNORE INTO sends (recipient, day, sent_at) VALUES (?, ?, ?)",
+            (recipient, day.isoformat(), datetime.now().isoformat())
+        )
+
+    def get_schedule(self, plan: str = DEFAULT_RECIPIENT) -> Optional[Tuple[str, int, List[int]]]:
+        """
+        Obtém o cronograma balanceado salvo de um plano.
+
+        :param plan: Plano de leitura.
+        :return: Tupla (métrica, capítulo global inicial, último capítulo global de cada dia) ou None.
+        """
+        rows = self.execute(
+            "SELECT metric, start, boundaries FROM reading_schedules WHERE plan = ?",
+            (plan,)
+        )
+        if not rows:
+            return None
+        metric, start, boundaries = rows[0]
+        return metric, start, json.loads(boundaries)
+
+    def save_schedule(
+        self,
+        metric: str,
+        start: int,
+        boundaries: List[int],
+        plan: str = DEFAULT_RECIPIENT
+    ) -> None:
+        """
+        Salva o cronograma balanceado de um plano, substituindo o anterior.
+
+        :param metric: Peso usado para dividir os dias ("words", "verses", ...).
+        :param start: Capítulo global a partir do qual o cronograma foi calculado.
+        :param boundaries: Último capítulo global de cada dia.
+        :param plan: Plano de leitura.
+        """
+        self.execute(
+            "INSERT OR REPLACE INTO reading_schedules (plan, metric, start, boundaries, created_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (plan, metric, start, json.dumps(boundaries), datetime.now().isoformat())
+        )
+
+    def delete_schedule(self, plan: str = DEFAULT_RECIPIENT) -> None:
+        """
+        Remove o cronograma balanceado de um plano, que volta a ler um número fixo de capítulos.
+
+        :param plan: Plano de leitura.
+        """
+        self.execute("DELETE FROM reading_schedules WHERE plan = ?", (plan,))
+
+    def record_attempt(
+        self,
+        day: date,
+        success: bool,
+        error: Optional[str] = None,
+        recipient: str = DEFAULT_RECIPIENT
+    ) -> None:
+        """
+        Registra uma tentativa de entrega.
+
+        :param day: Dia da leitura.
+        :param success: Indica se a entrega funcionou.
+        :param error: Mensagem de erro, se houver.
+        :param recipient: Destinatário.
+        """
+        self.execute(
+            "INSERT INTO delivery_attempts (recipient, day, attempted_at, success, error) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (recipient, day.isoformat(), datetime.now().isoformat(), int(success), error)
+        )
+
+    def has_batch(self, day: date, plan: str = DEFAULT_RECIPIENT) -> bool:
+        """
+        Verifica se as mensagens do dia já foram enfileiradas.
+
+        :param day: Dia da leitura.
+        :param plan: Plano de leitura.
+        :return: True se o lote do dia existe.
+        """
+        return bool(self.execute(
+            "SELECT 1 FROM daily_batches WHERE plan = ? AND day = ?",
+            (plan, day.isoformat())
+        ))
+
+    def enqueued_recipients(self, day: date, plan: str = DEFAULT_RECIPIENT) -> Set[str]:
+        """
+        Obtém os destinatários que têm mensagens enfileiradas no dia, entregues ou não.
+
+        :param day: Dia da leitura.
+        :param plan: Plano de leitura.
+        :return: Conjunto de destinatários.
+        """
+        rows = self.execute(
+            "SELECT DISTINCT recipient FROM outbox WHERE plan = ? AND day = ?",
+            (plan, day.isoformat())
+        )
+        return {recipient for (recipient,) in rows}
+
+    def enqueue_batch(
+        self,
+        day: date,
+        batches: List[Tuple[str, List[str]]],
+        state: Tuple[Optional[str], int, bool],
+        plan: str = DEFAULT_RECIPIENT
+    ) -> None:
+        """
+        Enfileira as mensagens do dia e o estado de leitura a salvar após a entrega.
+
+        Tudo é gravado em uma única transação; chamadas repetidas não duplicam mensagens.
+
+        :param day: Dia da leitura.
+        :param batches: Lista de (destinatário, mensagens em ordem).
+        :param state: Estado (livro, capítulo, concluído) após a leitura do dia.
+        :param plan: Plano de leitura.
+        """
+        now = datetime.now().isoformat()
+        rows = [
+            (outbox_key(plan, day, recipient, seq), plan, day.isoformat(), recipient, seq, payload)
+            for recipient, messages in batches
+            for seq, payload in enumerate(messages)
+        ]
+        book, chapter, finished = state
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO outbox "
+                "(idempotency_key, plan, day, recipient, seq, payload) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO daily_batches "
+                "(plan, day, book, chapter, finished, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (plan, day.isoformat(), book, chapter, int(finished), now)
+            )
+
+    def pending_messages(
+        self,
+        day: date,
+        recipient: str,
+        plan: str = DEFAULT_RECIPIENT
+    ) -> List[Tuple[str, str, int, Optional[str]]]:
+        """
+        Obtém as mensagens ainda não entregues de um destinatário, em ordem.
+
+        :param day: Dia da leitura.
+        :param recipient: Destinatário.
+        :param plan: Plano de leitura.
+        :return: Lista de (chave, texto, tentativas, próxima tentativa).
+        """
+        return self.execute(
+            "SELECT idempotency_key, payload, attempts, next_attempt_at FROM outbox "
+            "WHERE recipient = ? AND day = ? AND plan = ? AND delivered_at IS NULL "
+            "ORDER BY seq",
+            (recipient, day.isoformat(), plan)
+        )
+
+    def mark_delivered(self, key: str) -> None:
+        """
+        Marca uma mensagem como entregue.
+
+        :param key: Chave de idempotência.
+        """
+        self.execute(
+            "UPDATE outbox SET delivered_at = ?, attempts = attempts + 1, last_error = NULL "
+            "WHERE idempotency_key = ? AND delivered_at IS NULL",
+            (datetime.now().isoformat(), key)
+        )
+
+    def mark_failed(self, key: str, error: str, next_attempt_at: datetime) -> None:
+        """
+        Registra uma falha de entrega e agenda a próxima tentativa.
+
+        :param key: Chave de idempotência.
+        :param error: Mensagem de erro.
+        :param next_attempt_at: Momento da próxima tentativa.
+        """
+        self.execute(
+            "UPDATE outbox SET attempts = attempts + 1, last_error = ?, next_attempt_at = ? "
+            "WHERE idempotency_key = ?",
+            (error, next_attempt_at.isoformat(), key)
+        )
+
+    def complete_batch(self, day: date, plan: str = DEFAULT_RECIPIENT) -> bool:
+        """
+        Conclui o dia quando todas as mensagens foram entregues: salva o estado
+        de leitura enfileirado e marca o lote como concluído, na mesma transação.
+
+        :param day: Dia da leitura.
+        :param plan: Plano de leitura.
+        :return: True se o dia foi concluído.
+        """
+        with self.transaction() as conn:
+            pending = conn.execute(
+                "SELECT 1 FROM outbox WHERE plan = ? AND day = ? AND delivered_at IS NULL LIMIT 1",
+                (plan, day.isoformat())
+            ).fetchall()
+            if pending:
+                return False
+            batch = conn.execute(
+                "SELECT book, chapter, finished, completed_at FROM daily_batches WHERE plan = ? AND day = ?",
+                (plan, day.isoformat())
+            ).fetchall()
+            if not batch:
+                return False
+            book, chapter, finished, completed_at = batch[0]
+            if completed_at is not None:
+                return True
+            now = datetime.now().isoformat()
+            if book:
+                conn.execute(
+                    "INSERT INTO positions (recipient, book, chapter, finished, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (recipient) DO UPDATE SET book = excluded.book, "
+                    "chapter = excluded.chapter, finished = excluded.finished, "
+                    "updated_at = excluded.updated_at",
+                    (plan, book, chapter, finished, now)
+                )
+            conn.execute(
+                "UPDATE daily_batches SET completed_at = ? WHERE plan = ? AND day = ?",
+                (now, plan, day.isoformat())
+            )
+            return True
+
+    def import_legacy_json(
+        self,
+        last_chapter_path: Optional[str] = None,
+        last_sent_path: Optional[str] = None,
+        recipient: str = DEFAULT_RECIPIENT
+    ) -> bool:
+        """
+        Importa uma única vez os arquivos `last_chapter.json` e `last_sent_date.json`.
+
+        :param last_chapter_path: Caminho do arquivo de progresso.
+        :param last_sent_path: Caminho do arquivo de último envio.
+        :param recipient: Destinatário que recebe o estado importado.
+        :return: True se algum arquivo foi importado agora.
+        """
+        imported = False
+        for key, path in (("last_chapter", last_chapter_path), ("last_sent", last_sent_path)):
+            if path is None or not os.path.exists(path):
+                continue
+            if self.execute("SELECT 1 FROM meta WHERE key = ?", (f"imported:{key}",)):
+                continue
+
+            with open(path, "r", encoding="UTF-8") as file:
+                data = json.load(file)
+
+            if key == "last_chapter":
+                book = data.get("last_book", None)
+                chapter = data.get("last_chapter", None)
+                if book and chapter is not None and self.get_position(recipient) is None:
+                    self.save_position(book, chapter, data.get("finished", False), recipient)
+            else:
+                last_sent = data.get("date", None)
+                if last_sent is not None:
+                    day = datetime.strptime(last_sent, "%Y/%m/%d").date()
+                    self.mark_completed(day, recipient)
+
+            self.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?)",
+                (f"imported:{key}", datetime.now().isoformat())
+            )
+            imported = True
+        return imported
+
+    def close(self) -> None:
+        """
+        Fecha a conexão da thread atual.
+        """
+        if self.memory_conn is not None:
+            self.memory_conn.close()
+            return
+        conn = getattr(self.local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self.local.conn = None
+
+
+if __name__ == "__main__":
+    config_folder = os.path.dirname(STATE_DB_PATH)
+    store = StateStore()
+    imported = store.import_legacy_json(
+        os.path.join(config_folder, "last_chapter.json"),
+        os.path.join(config_folder, "last_sent_date.json")
+    )
+    print(f"Importado: {imported}")
+    print(f"Posição atual: {store.get_position()}")
+    print(f"Último envio: {store.last_completed_day()}")
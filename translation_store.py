@@ -0,0 +1,331 @@
+import os
+import json
+import mmap
+import zlib
+import struct
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from chapter_cache import ChapterCache, ChapterVerses, decode_chapter
+from corpus_manifest import CorpusManifest
+
+# Formato do arquivo:
+#   MAGIC | tamanho do cabeçalho (u32) | cabeçalho JSON | tabelas de blocos | blocos
+# O cabeçalho traz o índice compartilhado de capítulos (livro, capítulo,
+# versículos) na ordem canônica e, para cada tradução, a assinatura e o offset
+# da sua tabela. Cada tabela tem uma entrada (offset, tamanho comprimido,
+# tamanho original) por capítulo do índice, na mesma ordem; tamanho 0 indica
+# capítulo ausente. Cada bloco é um capítulo em UTF-8 (NFC) comprimido com zlib,
+# independente dos demais.
+STORE_MAGIC = b"BRNTRS\x01\x00"
+STORE_VERSION = 1
+STORE_ENCODING = "UTF-8"
+STORE_FILE_NAME = "translations.store"
+
+# Tradução dos arquivos em `bible/`; as demais ficam em `bible/translations/<nome>/`
+DEFAULT_TRANSLATION = "default"
+TRANSLATIONS_DIR_NAME = "translations"
+TESTAMENT_DIR_NAMES = ("Antigo Testamento", "Novo Testamento")
+
+COMPRESSION_LEVEL = 9
+
+_HEADER_LEN = struct.Struct("<I")
+_BLOCK_ENTRY = struct.Struct("<QII")
+
+
+def write_store(
+    store_path: str,
+    chapters: List[Tuple[str, int]],
+    manifests: Dict[str, CorpusManifest],
+    source_encoding: Optional[str] = None,
+    previous: Optional["TranslationStore"] = None
+) -> Dict[str, int]:
+    """
+    Compila as traduções em um único arquivo de blocos comprimidos.
+
+    Traduções cuja assinatura não mudou desde o arquivo anterior têm os blocos
+    copiados sem recomprimir.
+
+    :param store_path: Caminho do arquivo de saída.
+    :param chapters: Índice compartilhado de capítulos (livro, capítulo) na ordem canônica.
+    :param manifests: Manifesto já validado de cada tradução.
+    :param source_encoding: Codificação dos arquivos; se None, é detectada por arquivo.
+    :param previous: Arquivo anterior, para reaproveitar traduções inalteradas.
+    :return: Tamanho comprimido de cada tradução, em bytes.
+    """
+    reusable = (
+        previous is not None
+        and [tuple(chapter[:2]) for chapter in previous.chapters] == [tuple(chapter) for chapter in chapters]
+    )
+    blocks: Dict[str, List[bytes]] = {}
+    raw_sizes: Dict[str, List[int]] = {}
+    for name, manifest in manifests.items():
+        if reusable and previous.signature(name) == manifest.digest:
+            blocks[name], raw_sizes[name] = previous.raw_blocks(name)
+            continue
+        blocks[name], raw_sizes[name] = [], []
+        for book, chapter in chapters:
+            entry = manifest.chapter_entry(book, chapter)
+            if entry is None:
+                blocks[name].append(b"")
+                raw_sizes[name].append(0)
+                continue
+            with open(os.path.join(manifest.bible_dir, entry.path), "rb") as file:
+                text = decode_chapter(file.read(), source_encoding).encode(STORE_ENCODING)
+            blocks[name].append(zlib.compress(text, COMPRESSION_LEVEL))
+            raw_sizes[name].append(len(text))
+
+    # Versículos do índice compartilhado: o maior número entre as traduções
+    verses = []
+    for book, chapter in chapters:
+        entries = (manifest.chapter_entry(book, chapter) for manifest in manifests.values())
+        verses.append(max((entry.verses for entry in entries if entry is not None), default=0))
+
+    names = list(manifests)
+    header_translations = {name: {"signature": manifests[name].digest, "table": 0} for name in names}
+
+    def encode_header() -> bytes:
+        return json.dumps(
+            {
+                "version": STORE_VERSION,
+                "encoding": STORE_ENCODING,
+                "chapters": [[book, chapter, count] for (book, chapter), count in zip(chapters, verses)],
+                "translations": header_translations
+            },
+            ensure_ascii=False
+        ).encode("UTF-8")
+
+    # Os offsets das tabelas fazem parte do cabeçalho: com números de largura
+    # fixa, o tamanho do cabeçalho não muda ao preenchê-los
+    for name in names:
+        header_translations[name]["table"] = 10 ** 12
+    header_size = len(encode_header())
+    tables_start = len(STORE_MAGIC) + _HEADER_LEN.size + header_size
+    table_size = _BLOCK_ENTRY.size * len(chapters)
+    offset = tables_start + table_size * len(names)
+
+    tables = bytearray()
+    for index, name in enumerate(names):
+        header_translations[name]["table"] = tables_start + index * table_size
+        for block, raw_size in zip(blocks[name], raw_sizes[name]):
+            tables += _BLOCK_ENTRY.pack(offset, len(block), raw_size)
+            offset += len(block)
+    header = encode_header().ljust(header_size)
+
+    tmp_path = store_path + ".tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(STORE_MAGIC)
+        file.write(_HEADER_LEN.pack(len(header)))
+        file.write(header)
+        file.write(tables)
+        for name in names:
+            for block in blocks[name]:
+                file.write(block)
+    os.replace(tmp_path, store_path)
+    return {name: sum(len(block) for block in blocks[name]) for name in names}
+
+
+class TranslationStore:
+    """
+    Leitor do arquivo de traduções, mapeado em memória.
+
+    Só os blocos dos capítulos pedidos são descomprimidos, e cada tradução em
+    uso tem seu próprio cache LRU de capítulos; as demais traduções não são
+    lidas para a memória.
+    """
+
+    def __init__(self, store_path: str, cache_size: int = 512 * 1024, verse_cache_size: int = 256) -> None:
+        """
+        :param store_path: Caminho do arquivo.
+        :param cache_size: Número máximo de caracteres em cache por tradução.
+        :param verse_cache_size: Número máximo de capítulos com versículos localizados em cache.
+        """
+        self.store_path = store_path
+        self.cache_size = cache_size
+        self.verse_cache_size = verse_cache_size
+        self._file = open(store_path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise
+        self._view = memoryview(self._mmap)
+
+        if bytes(self._view[:len(STORE_MAGIC)]) != STORE_MAGIC:
+            self.close()
+            raise ValueError(f"Arquivo de traduções inválido: {store_path}")
+
+        pos = len(STORE_MAGIC)
+        (header_len,) = _HEADER_LEN.unpack_from(self._mmap, pos)
+        pos += _HEADER_LEN.size
+        self.header = json.loads(bytes(self._view[pos:pos + header_len]).decode("UTF-8"))
+
+        self.chapters: List[Tuple[str, int, int]] = [tuple(chapter) for chapter in self.header["chapters"]]
+        self.chapter_index: Dict[Tuple[str, int], int] = {
+            (book, chapter): index for index, (book, chapter, _) in enumerate(self.chapters)
+        }
+        self.caches: Dict[str, ChapterCache] = {}
+        self.verses: "OrderedDict[Tuple[str, str, int], ChapterVerses]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def open_if_valid(cls, store_path: str, cache_size: int = 512 * 1024) -> Optional["TranslationStore"]:
+        """
+        Abre o arquivo somente se ele existir e for da versão atual.
+
+        :param store_path: Caminho do arquivo.
+        :param cache_size: Número máximo de caracteres em cache por tradução.
+        :return: Instância de `TranslationStore` ou None se ausente ou inválido.
+        """
+        if not os.path.exists(store_path):
+            return None
+        try:
+            store = cls(store_path, cache_size)
+        except (OSError, ValueError, KeyError, TypeError, struct.error):
+            return None
+        if store.header.get("version") != STORE_VERSION:
+            store.close()
+            return None
+        return store
+
+    @property
+    def translations(self) -> List[str]:
+        """
+        :return: Nomes das traduções disponíveis.
+        """
+        return list(self.header["translations"])
+
+    def signature(self, translation: str) -> Optional[str]:
+        """
+        :param translation: Nome da tradução.
+        :return: Assinatura do conteúdo da tradução ou None se ela não existir.
+        """
+        info = self.header["translations"].get(translation)
+        return info["signature"] if info is not None else None
+
+    def block_entry(self, translation: str, index: int) -> Tuple[int, int, int]:
+        """
+        :param translation: Nome da tradução.
+        :param index: Posição do capítulo no índice compartilhado.
+        :return: Tupla (offset, tamanho comprimido, tamanho original) do bloco.
+        """
+        info = self.header["translations"].get(translation)
+        if info is None:
+            raise ValueError(f"Tradução não encontrada: {translation}")
+        return _BLOCK_ENTRY.unpack_from(self._mmap, info["table"] + index * _BLOCK_ENTRY.size)
+
+    def raw_blocks(self, translation: str) -> Tuple[List[bytes], List[int]]:
+        """
+        Copia os blocos comprimidos de uma tradução, para regravá-los sem recomprimir.
+
+        :param translation: Nome da tradução.
+        :return: Tupla (blocos, tamanhos originais) na ordem do índice.
+        """
+        blocks, raw_sizes = [], []
+        for index in range(len(self.chapters)):
+            offset, length, raw_size = self.block_entry(translation, index)
+            blocks.append(bytes(self._view[offset:offset + length]))
+            raw_sizes.append(raw_size)
+        return blocks, raw_sizes
+
+    def load_chapter(self, translation: str, book: str, chapter: int) -> Optional[str]:
+        """
+        Descomprime um capítulo sem passar pelo cache.
+
+        :param translation: Nome da tradução.
+        :param book: Abreviação do livro.
+        :param chapter: Número do capítulo.
+        :return: Texto do capítulo ou None se a tradução não o tiver.
+        """
+        index = self.chapter_index.get((book, chapter))
+        if index is None:
+            return None
+        offset, length, _ = self.block_entry(translation, index)
+        if length == 0:
+            return None
+        return zlib.decompress(self._view[offset:offset + length]).decode(self.header["encoding"])
+
+    def chapter_text(self, translation: str, book: str, chapter: int) -> Optional[str]:
+        """
+        Obtém o texto de um capítulo pelo cache da tradução.
+
+        :param translation: Nome da tradução.
+        :param book: Abreviação do livro.
+        :param chapter: Número do capítulo.
+        :return: Texto do capítulo ou None se a tradução não o tiver.
+        """
+        with self.lock:
+            cache = self.caches.get(translation)
+            if cache is None:
+                if translation not in self.header["translations"]:
+                    raise ValueError(f"Tradução não encontrada: {translation}")
+                cache = self.caches[translation] = ChapterCache(
+                    lambda book, chapter: self.load_chapter(translation, book, int(chapter)),
+                    self.cache_size
+                )
+        return cache.get(book, f"{chapter:02d}")
+
+    def verse(self, translation: str, book: str, chapter: int, verse: int) -> Optional[str]:
+        """
+        Obtém um versículo de uma tradução.
+
+        :param translation: Nome da tradução.
+        :param book: Abreviação do livro.
+        :param chapter: Número do capítulo.
+        :param verse: Número do versículo.
+        :return: Texto do versículo ou None se não existir.
+        """
+        text = self.chapter_text(translation, book, chapter)
+        if text is None:
+            return None
+        key = (translation, book, chapter)
+        with self.lock:
+            verses = self.verses.get(key)
+            if verses is not None:
+                self.verses.move_to_end(key)
+                return verses.verse(text, verse)
+
+        verses = ChapterVerses.parse(text)
+        with self.lock:
+            self.verses[key] = verses
+            while len(self.verses) > self.verse_cache_size:
+                self.verses.popitem(last=False)
+        return verses.verse(text, verse)
+
+    def parallel(self, book: str, chapter: int, verse: int, translations: Optional[List[str]] = None) -> Dict[str, Optional[str]]:
+        """
+        Obtém o mesmo versículo em várias traduções, alinhadas pelo índice compartilhado.
+
+        :param book: Abreviação do livro.
+        :param chapter: Número do capítulo.
+        :param verse: Número do versículo.
+        :param translations: Traduções desejadas; por padrão, todas.
+        :return: Texto do versículo por tradução.
+        """
+        return {
+            translation: self.verse(translation, book, chapter, verse)
+            for translation in (translations or self.translations)
+        }
+
+    def close(self) -> None:
+        """
+        Libera o mmap e fecha o arquivo.
+        """
+        self._view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+        self._file.close()
+
+
+if __name__ == "__main__":
+    from bible_manager import BibleManager
+
+    bible_manager = BibleManager(use_pack=False)
+    sizes = bible_manager.build_translation_store()
+    for name, size in sizes.items():
+        print(f"{name}: {size / 1024 / 1024:.1f} MB comprimidos")
+    store = TranslationStore(bible_manager.store_path)
+    print(store.parallel("Jo", 3, 16))
@@ -0,0 +1,36 @@
+from abc import ABC, abstractmethod
+
+
+class Transport(ABC):
+    """
+    Interface for anything that can deliver messages to a WhatsApp chat.
+
+    `WhatsAppManager` implements it with Selenium; the session client and the
+    benchmark/fake transports implement the same methods so the controller and
+    the dispatcher do not depend on how messages are delivered.
+    """
+
+    @abstractmethod
+    def find_chat(self, contact_name: str) -> None:
+        """
+        Opens the chat with the specified contact.
+
+        Args:
+            contact_name (str): The name of the contact or group.
+        """
+
+    @abstractmethod
+    def send_message(self, contact_name: str, message: str) -> None:
+        """
+        Sends a message to the specified contact.
+
+        Args:
+            contact_name (str): The name of the contact or group.
+            message (str): The message to be sent.
+        """
+
+    @abstractmethod
+    def close(self) -> None:
+        """
+        Releases the resources held by the transport.
+        """
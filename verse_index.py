@@ -0,0 +1,295 @@
+import re
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from bible_manager import BOOK_ABBREVIATIONS, BOOK_ALIASES, BOOK_CHAPTERS, BibleManager, fold_name
+from chapter_cache import ChapterVerses
+
+# "1 Samuel 3:4-6", "Jo 3.16", "Sl 23", "1Co 13"
+REFERENCE_PATTERN = re.compile(r"^\s*(?:(?P<book>\d?\s*[^\W\d_][^\d]*?)\s*)?(?P<numbers>\d.*?)\s*$")
+RANGE_PATTERN = re.compile(
+    r"^(?P<chapter>\d+)(?:[:.](?P<verse>\d+))?"
+    r"(?:\s*[-–]\s*(?P<end>\d+)(?:[:.](?P<end_verse>\d+))?)?$"
+)
+ROMAN_PREFIX_PATTERN = re.compile(r"^(i{1,3})\s+")
+
+
+@dataclass(frozen=True)
+class VerseRange:
+    """
+    Trecho contínuo de um livro.
+
+    :param book: Abreviação do livro.
+    :param chapter: Capítulo inicial.
+    :param first_verse: Versículo inicial, ou None para o início do capítulo.
+    :param last_chapter: Capítulo final.
+    :param last_verse: Versículo final, ou None para o fim do capítulo.
+    """
+    book: str
+    chapter: int
+    first_verse: Optional[int]
+    last_chapter: int
+    last_verse: Optional[int]
+
+    def label(self, book_name: Optional[str] = None) -> str:
+        """
+        :param book_name: Nome do livro; por padrão, a abreviação.
+        :return: Referência formatada ("João 3:16-18", "Salmos 23", "Gn 1:1-2:3").
+        """
+        name = book_name or self.book
+        if self.first_verse is None:
+            end = f"-{self.last_chapter}" if self.last_chapter != self.chapter else ""
+            return f"{name} {self.chapter}{end}"
+        if self.last_chapter != self.chapter:
+            end = f"-{self.last_chapter}:{self.last_verse}"
+        elif self.last_verse != self.first_verse:
+            end = f"-{self.last_verse}"
+        else:
+            end = ""
+        return f"{name} {self.chapter}:{self.first_verse}{end}"
+
+
+def book_key(name: str) -> str:
+    """
+    Normaliza um nome ou abreviação de livro para busca: minúsculas, sem
+    espaços nem pontos, com "I"/"II"/"III" iniciais convertidos em algarismos.
+
+    :param name: Nome do livro.
+    :return: Chave de busca (mantém os acentos).
+    """
+    key = name.strip().lower()
+    roman = ROMAN_PREFIX_PATTERN.match(key)
+    if roman:
+        key = f"{len(roman.group(1))}{key[roman.end():]}"
+    return key.replace(" ", "").replace(".", "")
+
+
+class ReferenceResolver:
+    """
+    Interpreta referências bíblicas como "Jo 3:16-18; Sl 23" ou "1 Coríntios 13:4-7, 13".
+
+    Os nomes e as abreviações ficam em dicionários (exato e sem acentos) e em
+    uma lista ordenada para prefixos únicos ("Apoc", "Gên"), então cada livro é
+    resolvido sem percorrer a lista de livros.
+    """
+
+    def __init__(self) -> None:
+        names: Dict[str, str] = dict(BOOK_ABBREVIATIONS)
+        for alias, name in BOOK_ALIASES.items():
+            names[alias] = BOOK_ABBREVIATIONS[name]
+        for abbrev in BOOK_ABBREVIATIONS.values():
+            names[abbrev] = abbrev
+
+        self.exact: Dict[str, str] = {}
+        self.folded: Dict[str, str] = {}
+        for name, abbrev in names.items():
+            key = book_key(name)
+            self.exact[key] = abbrev
+            folded = fold_name(key)
+            # "Jó" e "Jo" coincidem sem acentos: fica o nome escrito sem acento
+            if folded not in self.folded or key == folded:
+                self.folded[folded] = abbrev
+        self.prefixes: List[str] = sorted(self.folded)
+
+    def book(self, name: str) -> str:
+        """
+        Obtém a abreviação de um livro.
+
+        :param name: Nome, abreviação ou prefixo único do nome, com ou sem acentos.
+        :return: Abreviação do livro.
+        :raises ValueError: Se o livro não for reconhecido ou o prefixo for ambíguo.
+        """
+        key = book_key(name)
+        abbrev = self.exact.get(key)
+        if abbrev is not None:
+            return abbrev
+        folded = fold_name(key)
+        abbrev = self.folded.get(folded)
+        if abbrev is not None:
+            return abbrev
+
+        matches = set()
+        index = bisect_left(self.prefixes, folded)
+        while index < len(self.prefixes) and self.prefixes[index].startswith(folded):
+            matches.add(self.folded[self.prefixes[index]])
+            index += 1
+        if len(matches) == 1:
+            return matches.pop()
+        if matches:
+            raise ValueError(f"Livro ambíguo: {name} ({', '.join(sorted(matches))})")
+        raise ValueError(f"Livro desconhecido: {name}")
+
+    def resolve(self, reference: str) -> List[VerseRange]:
+        """
+        Interpreta uma referência.
+
+        Trechos separados por ";" podem trocar de livro; sem livro, continuam no
+        anterior. Depois de um versículo, números separados por "," são
+        versículos do mesmo capítulo ("Jo 3:16, 18"); caso contrário, capítulos
+        ("Sl 23, 91"). Em livros de um só capítulo, "Jd 3" é o versículo 3.
+
+        :param reference: Referência, por exemplo "Jo 3:16-18; Sl 23".
+        :return: Trechos na ordem em que aparecem.
+        :raises ValueError: Se a referência for inválida.
+        """
+        ranges: List[VerseRange] = []
+        book: Optional[str] = None
+        for group in reference.split(";"):
+            chapter: Optional[int] = None
+            for index, part in enumerate(group.split(",")):
+                if not part.strip():
+                    continue
+                match = REFERENCE_PATTERN.match(part)
+                if match is None or (match.group("book") and index > 0):
+                    raise ValueError(f"Referência inválida: {part.strip()}")
+                if match.group("book"):
+                    book = self.book(match.group("book"))
+                if book is None:
+                    raise ValueError(f"Referência sem livro: {part.strip()}")
+                numbers = RANGE_PATTERN.match(match.group("numbers"))
+                if numbers is None:
+                    raise ValueError(f"Referência inválida: {part.strip()}")
+
+                verse_range = self.make_range(book, numbers, chapter)
+                ranges.append(verse_range)
+                chapter = verse_range.last_chapter if verse_range.last_verse is not None else None
+        return ranges
+
+    @staticmethod
+    def make_range(book: str, numbers: "re.Match[str]", chapter: Optional[int]) -> VerseRange:
+        """
+        Monta um trecho a partir dos números de uma referência.
+
+        :param book: Abreviação do livro.
+        :param numbers: Resultado de RANGE_PATTERN.
+        :param chapter: Capítulo em que números soltos são versículos, se houver.
+        :return: Trecho validado contra o número de capítulos do livro.
+        :raises ValueError: Se o trecho estiver fora do livro ou invertido.
+        """
+        first, verse, end, end_verse = (
+            int(value) if value is not None else None
+            for value in numbers.group("chapter", "verse", "end", "end_verse")
+        )
+        num_chapters = BOOK_CHAPTERS[book]
+        if verse is None and chapter is None and num_chapters == 1:
+            chapter = 1
+
+        if verse is None and chapter is not None:
+            # Versículos soltos: "16", "16-18"
+            verse_range = VerseRange(book, chapter, first, chapter, end if end is not None else first)
+        elif verse is None:
+            # Capítulos: "23", "1-3"
+            verse_range = VerseRange(book, first, None, end if end is not None else first, None)
+        elif end is None:
+            verse_range = VerseRange(book, first, verse, first, verse)
+        elif end_verse is None:
+            verse_range = VerseRange(book, first, verse, first, end)
+        else:
+            verse_range = VerseRange(book, first, verse, end, end_verse)
+
+        if not 1 <= verse_range.chapter <= verse_range.last_chapter <= num_chapters:
+            raise ValueError(f"Capítulo fora de {book} (1-{num_chapters}): {verse_range.label()}")
+        if verse_range.first_verse == 0 or (
+            verse_range.chapter == verse_range.last_chapter
+            and verse_range.first_verse is not None
+            and verse_range.last_verse is not None
+            and verse_range.first_verse > verse_range.last_verse
+        ):
+            raise ValueError(f"Trecho inválido: {verse_range.label()}")
+        return verse_range
+
+
+class VerseIndex:
+    """
+    Acesso aos versículos do corpus por referência.
+
+    As posições de cada capítulo são calculadas uma vez e reaproveitadas enquanto
+    o hash do capítulo no manifesto não mudar; o texto vem do cache de capítulos.
+    """
+
+    def __init__(self, bible_manager: BibleManager, resolver: Optional[ReferenceResolver] = None) -> None:
+        """
+        :param bible_manager: Gerenciador da Bíblia.
+        :param resolver: Interpretador de referências.
+        """
+        self.bible_manager = bible_manager
+        self.resolver = resolver or ReferenceResolver()
+        self.chapters: Dict[Tuple[str, int], Tuple[Optional[str], ChapterVerses]] = {}
+        self.lock = threading.Lock()
+
+    def chapter(self, book: str, chapter: int) -> Optional[Tuple[str, ChapterVerses]]:
+        """
+        Obtém o texto de um capítulo e as posições dos versículos.
+
+        :param book: Abreviação do livro.
+        :param chapter: Número do capítulo.
+        :return: Tupla (texto, posições) ou None se o capítulo não existir.
+        """
+        text = self.bible_manager.get_chapter_text(book, f"{chapter:02d}")
+        if text is None:
+            return None
+        chapter_hash = self.bible_manager.manifest.chapter_hash(book, chapter)
+        with self.lock:
+            cached = self.chapters.get((book, chapter))
+        if cached is not None and cached[0] == chapter_hash:
+            return text, cached[1]
+        verses = ChapterVerses.parse(text)
+        with self.lock:
+            self.chapters[(book, chapter)] = (chapter_hash, verses)
+        return text, verses
+
+    def passages(self, reference: str) -> List[Tuple[VerseRange, str]]:
+        """
+        Obtém o texto de cada trecho de uma referência.
+
+        :param reference: Referência, por exemplo "Jo 3:16-18; Sl 23".
+        :return: Lista de tuplas (trecho, texto); capítulos inteiros incluem o título.
+        :raises ValueError: Se a referência for inválida ou o capítulo não existir no corpus.
+        """
+        result = []
+        for verse_range in self.resolver.resolve(reference):
+            texts = []
+            for chapter in range(verse_range.chapter, verse_range.last_chapter + 1):
+                loaded = self.chapter(verse_range.book, chapter)
+                if loaded is None:
+                    raise ValueError(f"Capítulo não encontrado: {verse_range.book} {chapter}")
+                text, verses = loaded
+                first = verse_range.first_verse if chapter == verse_range.chapter else None
+                last = verse_range.last_verse if chapter == verse_range.last_chapter else None
+                if first is None and last is None:
+                    texts.append(text.strip())
+                    continue
+                if (first or 1) > verses.last_verse:
+                    raise ValueError(f"{verse_range.book} {chapter} tem {verses.last_verse} versículos")
+                texts.append(verses.passage(text, first or 1, last or verses.last_verse))
+            result.append((verse_range, "\n\n".join(texts)))
+        return result
+
+    def label(self, verse_range: VerseRange) -> str:
+        """
+        :param verse_range: Trecho.
+        :return: Referência com o nome completo do livro.
+        """
+        book_data = self.bible_manager.bible_books.get(verse_range.book)
+        return verse_range.label(book_data["book"] if book_data else None)
+
+
+if __name__ == "__main__":
+    import time
+
+    resolver = ReferenceResolver()
+    references = ["Jo 3:16-18; Sl 23", "1 Coríntios 13:4-7, 13", "Gn 1:1-2:3", "Jd 3", "Jó 1; João 1"]
+    start = time.perf_counter()
+    rounds = 10000
+    for _ in range(rounds):
+        for reference in references:
+            resolver.resolve(reference)
+    elapsed = (time.perf_counter() - start) / (rounds * len(references))
+    print(f"{elapsed * 1e6:.1f} µs por referência")
+
+    verse_index = VerseIndex(BibleManager())
+    for verse_range, text in verse_index.passages("Jo 3:16-18; Sl 23:1-2"):
+        print(f"--- {verse_index.label(verse_range)} ---")
+        print(text)
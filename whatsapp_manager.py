@@ -2,15 +2,24 @@ import os
 import json
 import time
 import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 import pyperclip
 
+from metrics import metrics
+from session_health import SESSION_HEALTH_PATH, SessionHealth, cookie_fingerprint
+from transport import Transport
+
+WHATSAPP_URL = "https://web.whatsapp.com"
 CHROME_PROFILE = os.path.abspath("C:\\Users\\hmarx\\AppData\\Local"
                                  "\\Google\\Chrome\\User Data\\Profile 2\\")
 CHROME_DRIVER = os.path.abspath(
@@ -21,15 +30,68 @@ CHROME_DRIVER = os.path.abspath(
     )
 )
 
+# Present only once WhatsApp Web is logged in (the chat search box and composer)
+LOGIN_PROBE = "div[role='textbox']"
+LOGIN_TIMEOUT = 20          # foreground check when the session is not trusted
+QR_LOGIN_TIMEOUT = 180      # time given to scan the QR code
+SESSION_PROBE_TIMEOUT = 60  # re-validation of a trusted session before the first chat
+LOGIN_POLL_INTERVAL = 1.0
+
+# Outgoing message bubbles and the delivery ticks WhatsApp Web draws on them
+OUTGOING_MESSAGE = "div.message-out"
+SENT_TICK = "span[data-icon='msg-check'], span[data-icon='msg-dblcheck']"
+
+# How `send_message` puts text into the composer
+INSERT_PASTE = "paste"          # one synthetic paste of the whole text
+INSERT_SEND_KEYS = "send_keys"  # types it key by key (slow baseline)
+
+# Pastes the text as a single clipboard event, like Ctrl+V, so the editor keeps
+# the line breaks; falls back to insertText when the page ignores the event.
+# The editor applies the paste asynchronously, so the text is read back afterwards.
+PASTE_SCRIPT = """
+const box = arguments[0], text = arguments[1];
+box.focus();
+const data = new DataTransfer();
+data.setData("text/plain", text);
+const event = new ClipboardEvent("paste", {clipboardData: data, bubbles: true, cancelable: true});
+if (box.dispatchEvent(event)) {
+    document.execCommand("insertText", false, text);
+}
+"""
+PASTE_SETTLE_TIMEOUT = 2.0   # time the editor gets to apply a paste before falling back to typing
+PASTE_POLL_INTERVAL = 0.05
+
+CLEAR_SCRIPT = """
+const box = arguments[0];
+box.focus();
+document.execCommand("selectAll", false, null);
+document.execCommand("delete", false, null);
+return box.innerText;
+"""
+
+# Screenshots and DOM snapshots kept in memory and written to debug/ only on failure
+DEBUG_BUFFER_SIZE = 20
 
-class WhatsAppManager:
+
+class WhatsAppManager(Transport):
     """
     A class to manager WhatsApp Web automation using Selenium WebDriver
     
     Attributes:
         chrome_profile_path (str): Path to the Chrome user profile.
         chrome_driver_path (str): Path to the ChromeDriver executable.
+        base_url (str): URL of WhatsApp Web (or of a local stand-in).
+        insert_strategy (str): INSERT_PASTE or INSERT_SEND_KEYS.
         driver (webdriver.Chrome): Instance of the Chrome WebDriver
+        current_chat (Optional[str]): Name of the chat currently open in the driver.
+        timings (Dict[str, Dict[str, float]]): Count, total and max seconds of
+            each step, so a long-running session keeps a fixed amount per step.
+        session_health (SessionHealth): When the saved session was last verified.
+        session_valid (Optional[bool]): Outcome of the last `validate_session`
+            or `verify_session`, None until the first `find_chat`. While False,
+            `find_chat` re-checks the login before searching.
+        debug_buffer (Deque[Tuple[str, str, bytes, str]]): Last (timestamp,
+            label, screenshot PNG, page source) captures.
     """
     config_data = os.path.abspath(
         os.path.join(
@@ -47,28 +109,58 @@ class WhatsAppManager:
     )
     
     cookies_path = os.path.join(config_data, "session_cookies.json")
+    session_health_path = SESSION_HEALTH_PATH
     
-    def __init__(self, chrome_profile_path: str, chrome_driver_path: str) -> None:
+    def __init__(
+        self,
+        chrome_profile_path: str,
+        chrome_driver_path: str,
+        base_url: str = WHATSAPP_URL,
+        insert_strategy: str = INSERT_PASTE
+    ) -> None:
         """
         Initializes the WhatsAppManager with the specified Chrome profile and driver paths.
         
         Args:
             chrome_profile_path (str): Path to the Chrome user profile.
             chrome_driver_path (str): Path to the ChromeDriver executable.
+            base_url (str): URL of WhatsApp Web (or of a local stand-in).
+            insert_strategy (str): INSERT_PASTE or INSERT_SEND_KEYS.
         """
+        if insert_strategy not in (INSERT_PASTE, INSERT_SEND_KEYS):
+            raise ValueError(f"Unknown insert strategy: {insert_strategy}")
         self.chrome_profile_path = chrome_profile_path
         self.chrome_driver_path = chrome_driver_path
+        self.base_url = base_url
+        self.insert_strategy = insert_strategy
+        self.current_chat: Optional[str] = None
+        self.timings: Dict[str, Dict[str, float]] = {}
+        self.debug_buffer: Deque[Tuple[str, str, bytes, str]] = deque(maxlen=DEBUG_BUFFER_SIZE)
+        self.debug_lock = threading.Lock()
+        self.capture_stop = threading.Event()
+        self.capture_thread: Optional[threading.Thread] = None
+        self.session_health = SessionHealth(self.session_health_path)
+        self.session_valid: Optional[bool] = None
+        
+        cookies = self.read_cookies()
+        if self.session_health.is_trusted(cookie_fingerprint(cookies) if cookies is not None else None):
+            # Verified recently with these cookies: skip the visible browser and
+            # the blocking login check; the login is confirmed before the first chat
+            self.driver = self.initialize_driver(True)
+            self.load_session()
+            return
+        
         self.driver = self.initialize_driver()
         if not self.is_logged_in():
             print("Please scan the QR code to log in to WhatsApp Web.")
-            time.sleep(60)
-            self.save_session()
-            self.driver.quit()
-            self.driver = self.initialize_driver(True)
-        else:
-            self.driver.quit()
-            self.driver = self.initialize_driver(True)
-            self.load_session()
+            if not self.wait_for_login(QR_LOGIN_TIMEOUT):
+                self.driver.quit()
+                raise RuntimeError(f"WhatsApp Web login not completed within {QR_LOGIN_TIMEOUT}s")
+        self.save_session()
+        self.session_valid = True
+        self.driver.quit()
+        self.driver = self.initialize_driver(True)
+        self.load_session()
         
     def initialize_driver(self, headless: bool = False) -> webdriver.Chrome:
         """
@@ -80,28 +172,29 @@ class WhatsAppManager:
         Returns:
             webdriver.Chrome: The initialized Chrome WebDriver.
         """
-        chrome_options = Options()
-        chrome_options.add_argument(f"user-data-dir={self.chrome_profile_path}")
+        with self.timed("initialize_driver"):
+            chrome_options = Options()
+            chrome_options.add_argument(f"user-data-dir={self.chrome_profile_path}")
         
         
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_argument("start-maximized")
-        chrome_options.add_argument("--disable-infobars")
-        chrome_options.add_argument("--disable-extensions")
+            chrome_options.add_argument("--no-sandbox")
+            chrome_options.add_argument("--disable-dev-shm-usage")
+            chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+            chrome_options.add_argument("start-maximized")
+            chrome_options.add_argument("--disable-infobars")
+            chrome_options.add_argument("--disable-extensions")
         
-        chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36")
+            chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36")
         
 
-        if headless:
-            chrome_options.add_argument("--headless")
-            chrome_options.add_argument("--disable-gpu")
+            if headless:
+                chrome_options.add_argument("--headless")
+                chrome_options.add_argument("--disable-gpu")
             
-        chrome_service = Service(self.chrome_driver_path)
-        driver = webdriver.Chrome(service=chrome_service, options=chrome_options)
-        driver.get("https://web.whatsapp.com")
-        return driver
+            chrome_service = Service(self.chrome_driver_path)
+            driver = webdriver.Chrome(service=chrome_service, options=chrome_options)
+            driver.get(self.base_url)
+            return driver
     
     def is_logged_in(self) -> bool:
         """Checks if the user is logged in to WhatsApp Web
@@ -109,92 +202,377 @@ class WhatsAppManager:
         Returns:
             bool: True if the user is logged in, False otherwise
         """
+        with self.timed("is_logged_in"):
+            try:
+                logged_in = EC.presence_of_element_located(
+                    (By.CSS_SELECTOR, LOGIN_PROBE)
+                )
+                WebDriverWait(self.driver, LOGIN_TIMEOUT).until(logged_in)
+                return True
+            except:
+                return False
+    
+    def probe_logged_in(self) -> bool:
+        """
+        Checks once, without waiting, whether the logged-in page is showing.
+        
+        Returns:
+            bool: True if the chat UI is present.
+        """
         try:
-            logged_in = EC.presence_of_element_located(
-                (By.CSS_SELECTOR, "div[role='textbox']")
-            )
-            WebDriverWait(self.driver, 20).until(logged_in)
-            return True
-        except:
+            return bool(self.driver.find_elements(By.CSS_SELECTOR, LOGIN_PROBE))
+        except WebDriverException:
+            return False
+    
+    def wait_for_login(
+        self,
+        timeout: float,
+        interval: float = LOGIN_POLL_INTERVAL,
+        stop: Optional[threading.Event] = None
+    ) -> bool:
+        """
+        Polls until WhatsApp Web shows the logged-in page, e.g. after a QR scan.
+        
+        Args:
+            timeout (float): Maximum seconds to wait.
+            interval (float): Seconds between probes.
+            stop (Optional[threading.Event]): Ends the wait early when set.
+        
+        Returns:
+            bool: True as soon as the session is logged in, False on timeout or stop.
+        """
+        stop = stop or threading.Event()
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.probe_logged_in():
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or stop.wait(min(interval, remaining)):
+                return False
+    
+    def validate_session(self) -> bool:
+        """
+        Confirms the login of a session started without the blocking check.
+        
+        Runs once, on the sending thread, before the first chat is opened: the
+        WebDriver session is not thread-safe, and the first search would wait
+        for the logged-in page anyway. On success the cookies are saved again,
+        which renews the health record; otherwise the record is dropped so the
+        next start checks the login in the foreground and asks for the QR code
+        if needed.
+        
+        Returns:
+            bool: True if the session is logged in.
+        """
+        with self.timed("validate_session"):
+            valid = self.wait_for_login(SESSION_PROBE_TIMEOUT)
+        self.session_valid = valid
+        if valid:
+            self.save_session()
+        else:
+            print("Saved WhatsApp session is no longer logged in; the next start will ask for the QR code.")
+            self.session_health.invalidate()
+            self.capture_debug("session-invalid")
+        return valid
+    
+    def verify_session(self) -> bool:
+        """
+        Checks the login with a single probe and updates the health record.
+        
+        Returns:
+            bool: True if the session is logged in.
+        """
+        valid = self.probe_logged_in()
+        self.session_valid = valid
+        if valid:
+            self.save_session()
+        else:
+            self.session_health.invalidate()
+        return valid
+    
+    def is_alive(self) -> bool:
+        """
+        Checks whether the browser is still responding, without waiting on the page.
+        
+        Returns:
+            bool: True if the driver answered, False if the session died.
+        """
+        try:
+            return bool(self.driver.window_handles) and self.driver.current_url.startswith(self.base_url)
+        except WebDriverException:
             return False
     
     def save_session(self) -> None:
         """
-        Saves the session cookies to a file.
+        Saves the session cookies to a file and records them as verified.
+        Only called once the page is known to be logged in.
         """
         cookies = self.driver.get_cookies()
+        os.makedirs(self.config_data, exist_ok=True)
         with open(self.cookies_path, "w", encoding="UTF-8") as file:
             json.dump(cookies, file)
+        self.session_health.record(cookie_fingerprint(cookies))
+    
+    def read_cookies(self) -> Optional[List[Dict]]:
+        """
+        Reads the saved session cookies.
+        
+        Returns:
+            Optional[List[Dict]]: The cookies, or None if none are saved or the file is unreadable.
+        """
+        try:
+            with open(self.cookies_path, "r", encoding="UTF-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
             
     def load_session(self) -> None:
-        """"""
-        with open(self.cookies_path, "r", encoding="UTF-8") as file:
-            cookies = json.load(file)
-        for cookie in cookies:
-            self.driver.add_cookie(cookie)
-        self.driver.refresh()
+        """
+        Loads the saved session cookies, if any, and reloads the page.
+        """
+        with self.timed("load_session"):
+            cookies = self.read_cookies()
+            if cookies is None:
+                return
+            for cookie in cookies:
+                self.driver.add_cookie(cookie)
+            self.driver.refresh()
             
+    @contextmanager
+    def timed(self, step: str) -> Iterator[None]:
+        """
+        Records how long the wrapped step takes in `self.timings` and in the
+        process-wide metrics.
+        
+        Args:
+            step (str): Name of the step.
+        """
+        start = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            elapsed = time.perf_counter() - start
+            stats = self.timings.setdefault(step, {"count": 0, "total": 0.0, "max": 0.0})
+            stats["count"] += 1
+            stats["total"] += elapsed
+            stats["max"] = max(stats["max"], elapsed)
+            metrics.observe(step, elapsed, ok)
+    
+    def timing_report(self) -> Dict[str, Dict[str, float]]:
+        """
+        Summarizes the recorded step durations.
+        
+        Returns:
+            Dict[str, Dict[str, float]]: Count, total, mean and max seconds per step.
+        """
+        return {
+            step: {**stats, "mean": stats["total"] / stats["count"]}
+            for step, stats in list(self.timings.items())
+        }
+    
+    def is_chat_open(self, contact_name: str) -> bool:
+        """
+        Checks, without waiting, whether the conversation header shows the contact.
+        
+        Args:
+            contact_name (str): The name of the contact.
+        
+        Returns:
+            bool: True if the chat with the contact is open.
+        """
+        return bool(self.driver.find_elements(
+            By.XPATH, f"//*[@id='main']//header//span[@title='{contact_name}']"
+        ))
+    
     def find_chat(self, contact_name: str) -> None:
         """
         Finds and opens a chat with the specified contact name.
         
+        Skips the search when the chat is already the open one. The first call
+        confirms the login of a trusted session, and calls fail fast while the
+        session is logged out.
+        
         Args:
             contact_name (str): The name of the contact to find 
             
+        Raises:
+            RuntimeError: If WhatsApp Web is logged out.
         """
-        search_box = WebDriverWait(self.driver, 30).until(
-            EC.presence_of_element_located((
-                By.CSS_SELECTOR, 
-                "div[contenteditable='true'][data-tab='3']"
-            ))
-        )
+        if self.session_valid is None:
+            valid = self.validate_session()
+        else:
+            valid = self.session_valid or self.verify_session()
+        if not valid:
+            raise RuntimeError("WhatsApp Web is logged out; restart to scan the QR code.")
         
-        search_box.clear()
-        search_box.send_keys(contact_name)
-        time.sleep(4)
+        if self.current_chat == contact_name and self.is_chat_open(contact_name):
+            metrics.incr("chat_reused")
+            return
         
-        chat = WebDriverWait(self.driver, 30).until(
-            EC.presence_of_element_located(
-                (By.XPATH, f"//span[@title='{contact_name}']")
+        with self.timed("find_chat"), self.debug_on_failure("find_chat"):
+            search_box = WebDriverWait(self.driver, 30).until(
+                EC.presence_of_element_located((
+                    By.CSS_SELECTOR, 
+                    "div[contenteditable='true'][data-tab='3']"
+                ))
             )
-        )
-        chat.click()
+            
+            search_box.clear()
+            search_box.send_keys(contact_name)
+            
+            chat = WebDriverWait(self.driver, 30).until(
+                EC.element_to_be_clickable(
+                    (By.XPATH, f"//span[@title='{contact_name}']")
+                )
+            )
+            chat.click()
+            
+            WebDriverWait(self.driver, 30).until(
+                lambda driver: self.is_chat_open(contact_name)
+            )
+            self.current_chat = contact_name
     
-    def send_message(self, contact_name: str, message: str) -> None:
+    def wait_for_sent(self, previous_count: int, timeout: int = 30) -> None:
         """
-        Sends a message to the specified contact.
+        Waits until a new outgoing message appears with a sent tick.
         
         Args:
-            contact_name (str): The name of the contact to send the message to.
-            message (str): The message to be sent.
+            previous_count (int): Number of outgoing messages before sending.
+            timeout (int): Maximum time to wait in seconds.
+        """
+        def message_sent(driver: webdriver.Chrome) -> bool:
+            messages = driver.find_elements(By.CSS_SELECTOR, OUTGOING_MESSAGE)
+            if len(messages) <= previous_count:
+                return False
+            return bool(messages[-1].find_elements(By.CSS_SELECTOR, SENT_TICK))
+        
+        WebDriverWait(self.driver, timeout).until(message_sent)
+    
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """
+        Normalizes text read back from the composer for comparison.
+        
+        Args:
+            text (str): Text as typed or as read from `innerText`.
+        
+        Returns:
+            str: Text with unified line breaks and spaces, without trailing blanks.
+        """
+        text = text.replace("\r\n", "\n").replace("\u00a0", " ")
+        return "\n".join(line.rstrip() for line in text.split("\n")).strip()
+    
+    def clear_composer(self, message_box) -> None:
+        """
+        Empties the message box.
+        
+        Args:
+            message_box (WebElement): The composer element.
         """
-        self.find_chat(contact_name)
-        message_box = WebDriverWait(self.driver, 30).until(
-            EC.presence_of_element_located(
-                (By.CSS_SELECTOR, 'div[contenteditable="true"][data-tab="10"]')
-            )
-        )
         message_box.clear()
+        self.driver.execute_script(CLEAR_SCRIPT, message_box)
+    
+    def type_message(self, message_box, message: str) -> str:
+        """
+        Types the message key by key, using Shift+Enter for line breaks so
+        the message is not sent early.
         
-        print("Test Message Box")
+        Args:
+            message_box (WebElement): The composer element.
+            message (str): The message to insert.
         
-        file_name = os.path.join(self.debug_folder, f"screenshot_message_box.png")
-        message_box.screenshot(file_name)
+        Returns:
+            str: The composer text after typing.
+        """
+        for index, line in enumerate(message.split("\n")):
+            if index:
+                message_box.send_keys(Keys.SHIFT, Keys.ENTER)
+            if line:
+                message_box.send_keys(line)
+        return self.driver.execute_script("return arguments[0].innerText;", message_box)
+    
+    def paste_message(self, message_box, message: str) -> str:
+        """
+        Inserts the whole message in a single paste operation and waits, up to
+        PASTE_SETTLE_TIMEOUT, for the editor to show it.
         
-        # pyperclip.copy(message)
-        # print(message)
+        Args:
+            message_box (WebElement): The composer element.
+            message (str): The message to insert.
         
-        # message_box.send_keys(message)
+        Returns:
+            str: The composer text once it matches the message, or when the wait ended.
+        """
+        self.driver.execute_script(PASTE_SCRIPT, message_box, message)
+        expected = self.normalize_text(message)
+        composed = ""
+        
+        def pasted(driver: webdriver.Chrome) -> bool:
+            nonlocal composed
+            composed = driver.execute_script("return arguments[0].innerText;", message_box) or ""
+            return self.normalize_text(composed) == expected
+        
+        try:
+            WebDriverWait(self.driver, PASTE_SETTLE_TIMEOUT, poll_frequency=PASTE_POLL_INTERVAL).until(pasted)
+        except TimeoutException:
+            pass
+        return composed
+    
+    def insert_message(self, message_box, message: str) -> None:
+        """
+        Puts the message into the composer and checks that it reads back
+        unchanged, falling back to typing if the paste was altered.
         
-        # self.driver.execute_script("arguments[0].textContent = arguments[1];", message_box, message)
+        Args:
+            message_box (WebElement): The composer element.
+            message (str): The message to insert.
         
-        send_button = WebDriverWait(self.driver, 30).until(
-            EC.presence_of_element_located(
-                (By.CSS_SELECTOR, "button[aria-label='Enviar']")
+        Raises:
+            RuntimeError: If the composer text does not match the message.
+        """
+        expected = self.normalize_text(message)
+        with self.timed("insert_message"):
+            if self.insert_strategy == INSERT_PASTE:
+                if self.normalize_text(self.paste_message(message_box, message)) == expected:
+                    return
+                metrics.incr("insert_fallbacks")
+                self.clear_composer(message_box)
+            composed = self.type_message(message_box, message)
+        if self.normalize_text(composed) != expected:
+            self.clear_composer(message_box)
+            raise RuntimeError(
+                f"Composer text does not match the message ({len(composed)} of {len(message)} characters)"
             )
-        )
-        send_button.click()
-        time.sleep(2)
+    
+    def send_message(self, contact_name: str, message: str) -> None:
+        """
+        Sends a message to the specified contact.
+        
+        Args:
+            contact_name (str): The name of the contact to send the message to.
+            message (str): The message to be sent.
+        """
+        self.find_chat(contact_name)
+        with self.timed("send_message"), self.debug_on_failure("send_message"):
+            message_box = WebDriverWait(self.driver, 30).until(
+                EC.presence_of_element_located(
+                    (By.CSS_SELECTOR, 'div[contenteditable="true"][data-tab="10"]')
+                )
+            )
+            self.clear_composer(message_box)
+            self.insert_message(message_box, message)
+            
+            sent_count = len(self.driver.find_elements(By.CSS_SELECTOR, OUTGOING_MESSAGE))
+            send_button = WebDriverWait(self.driver, 30).until(
+                EC.element_to_be_clickable(
+                    (By.CSS_SELECTOR, "button[aria-label='Enviar']")
+                )
+            )
+            send_button.click()
+            self.wait_for_sent(sent_count)
+        metrics.incr("messages_sent")
     
     def take_screenshot(self, file_name: str) -> None:
         """
@@ -209,32 +587,103 @@ class WhatsAppManager:
         except Exception as e:
             print(f"Failed to take screenshot: {e}")
     
+    def capture_debug(self, label: str) -> None:
+        """
+        Adds a screenshot and a DOM snapshot to the in-memory ring buffer.
+        
+        Args:
+            label (str): What was happening when the capture was taken.
+        """
+        try:
+            png = self.driver.get_screenshot_as_png()
+            html = self.driver.page_source
+        except Exception as e:
+            print(f"Failed to capture debug snapshot: {e}")
+            return
+        timestamp = time.strftime("%Y%m%d-%H%M%S")
+        with self.debug_lock:
+            self.debug_buffer.append((timestamp, label, png, html))
+    
+    def dump_debug(self, reason: str) -> Optional[str]:
+        """
+        Writes the buffered captures to a new folder in `debug/` and empties the buffer.
+        
+        Args:
+            reason (str): Why the captures are being written, used in the folder name.
+        
+        Returns:
+            Optional[str]: The folder written, or None if the buffer was empty.
+        """
+        with self.debug_lock:
+            captures = list(self.debug_buffer)
+            self.debug_buffer.clear()
+        if not captures:
+            return None
+        
+        folder = os.path.join(self.debug_folder, f"{time.strftime('%Y%m%d-%H%M%S')}-{reason}")
+        os.makedirs(folder, exist_ok=True)
+        for index, (timestamp, label, png, html) in enumerate(captures):
+            name = f"{index:02d}-{timestamp}-{label}"
+            with open(os.path.join(folder, f"{name}.png"), "wb") as file:
+                file.write(png)
+            with open(os.path.join(folder, f"{name}.html"), "w", encoding="UTF-8") as file:
+                file.write(html)
+        print(f"Debug captures saved in {folder}")
+        return folder
+    
+    @contextmanager
+    def debug_on_failure(self, step: str) -> Iterator[None]:
+        """
+        Captures the page and dumps the ring buffer if the wrapped step raises
+        (timeouts included), then re-raises.
+        
+        Args:
+            step (str): Name of the step.
+        """
+        try:
+            yield
+        except Exception as e:
+            # A failure inside a nested step was already dumped
+            if not getattr(e, "debug_dumped", False):
+                self.capture_debug(f"{step}-failed")
+                self.dump_debug(step)
+                e.debug_dumped = True
+            raise
+    
     def start_debug_screenshots(self, interval: int = 5) -> None:
         """
-        Starts taking screenshots every `interval` seconds and saves them in the debug folder.
+        Starts capturing a screenshot and the DOM every `interval` seconds into
+        the ring buffer, which is written to the debug folder only when a send fails.
         
         Args:
-            interval (int): The time interval between each screenshot in seconds.
+            interval (int): The time interval between each capture in seconds.
         """
-        if not os.path.exists(self.debug_folder):
-            os.makedirs(self.debug_folder)
-
+        if self.capture_thread is not None:
+            return
+        self.capture_stop.clear()
+        
         def take_screenshots():
-            while True:
-                
-                timestamp = time.strftime("%Y%m%d-%H%M%S")
-                file_name = os.path.join(self.debug_folder, f"screenshot_{timestamp}.png")
-                self.take_screenshot(file_name)
-                time.sleep(interval)
-
-        thread = threading.Thread(target=take_screenshots)
-        thread.daemon = True
-        thread.start()
+            while not self.capture_stop.wait(interval):
+                self.capture_debug("periodic")
+        
+        self.capture_thread = threading.Thread(target=take_screenshots, name="debug-capture")
+        self.capture_thread.daemon = True
+        self.capture_thread.start()
+    
+    def stop_debug_screenshots(self) -> None:
+        """
+        Stops the periodic capture thread and waits for it to finish.
+        """
+        self.capture_stop.set()
+        if self.capture_thread is not None:
+            self.capture_thread.join()
+            self.capture_thread = None
     
     def close(self) -> None:
         """
-        Closes the Chrome WebDriver.
+        Stops the debug capture and closes the Chrome WebDriver.
         """
+        self.stop_debug_screenshots()
         self.driver.quit()
         
         
@@ -0,0 +1,305 @@
+import os
+import secrets
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Dict, Optional, Tuple
+
+from metrics import metrics
+from transport import Transport
+from whatsapp_manager import WhatsAppManager
+from whatsapp_manager import (CHROME_DRIVER, CHROME_PROFILE)
+
+SESSION_ADDRESS: Tuple[str, int] = ("localhost", 6001)
+SESSION_KEY_PATH = os.path.join(WhatsAppManager.config_data, "session.key")
+SESSION_METRICS_FILE_NAME = "bible_notifier_session.prom"
+
+
+def load_session_key(create: bool = False) -> Optional[bytes]:
+    """
+    Loads the shared key used to authenticate clients of the session daemon.
+
+    Args:
+        create (bool): Whether to create a new random key if none exists.
+
+    Returns:
+        Optional[bytes]: The key, or None if it does not exist and `create` is False.
+    """
+    if os.path.exists(SESSION_KEY_PATH):
+        if create:
+            # Keys written by earlier versions followed the umask
+            os.chmod(SESSION_KEY_PATH, 0o600)
+        with open(SESSION_KEY_PATH, "rb") as file:
+            return file.read()
+    if not create:
+        return None
+    os.makedirs(os.path.dirname(SESSION_KEY_PATH), exist_ok=True)
+    key = secrets.token_bytes(32)
+    # Readable only by the owner, since the key drives the logged-in session
+    try:
+        fd = os.open(SESSION_KEY_PATH, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o600)
+    except FileExistsError:
+        # Created by another process in the meantime
+        return load_session_key()
+    with os.fdopen(fd, "wb") as file:
+        file.write(key)
+    return key
+
+
+class WhatsAppSessionServer:
+    """
+    A long-lived process that keeps one logged-in WhatsApp Web driver warm and
+    accepts send jobs from local clients.
+
+    Jobs are executed one at a time on the shared driver. A background thread
+    checks the driver health every `health_interval` seconds and relaunches it
+    only when the browser no longer responds.
+
+    Attributes:
+        manager (Optional[WhatsAppManager]): The warm WhatsApp Web session.
+    """
+
+    def __init__(
+        self,
+        chrome_profile_path: str,
+        chrome_driver_path: str,
+        address: Tuple[str, int] = SESSION_ADDRESS,
+        health_interval: int = 60
+    ) -> None:
+        """
+        Initializes the server without starting the browser.
+
+        Args:
+            chrome_profile_path (str): Path to the Chrome user profile.
+            chrome_driver_path (str): Path to the ChromeDriver executable.
+            address (Tuple[str, int]): Local address the server listens on.
+            health_interval (int): Seconds between driver health checks.
+        """
+        self.chrome_profile_path = chrome_profile_path
+        self.chrome_driver_path = chrome_driver_path
+        self.address = address
+        self.health_interval = health_interval
+        self.manager: Optional[WhatsAppManager] = None
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.listener: Optional[Listener] = None
+
+    def ensure_manager(self) -> WhatsAppManager:
+        """
+        Returns the warm session, relaunching the browser if it died.
+        Must be called with `self.lock` held.
+
+        Returns:
+            WhatsAppManager: A responsive WhatsApp Web session.
+        """
+        if self.manager is not None and self.manager.is_alive():
+            return self.manager
+        if self.manager is not None:
+            print("WhatsApp session is not responding, relaunching the browser.")
+            self.manager.close()
+        self.manager = WhatsAppManager(self.chrome_profile_path, self.chrome_driver_path)
+        return self.manager
+
+    def health_check_loop(self) -> None:
+        """
+        Periodically verifies the session and relaunches it only when it is dead.
+        """
+        while not self.stop_event.wait(self.health_interval):
+            with self.lock:
+                try:
+                    manager = self.ensure_manager()
+                except Exception as e:
+                    print(f"Failed to relaunch WhatsApp session: {e}")
+                    manager = None
+                try:
+                    # Keeps the session health record fresh for runs that start their own browser
+                    if manager is not None and not manager.verify_session():
+                        print("WhatsApp session is no longer logged in; scan the QR code again.")
+                except Exception as e:
+                    print(f"Failed to verify WhatsApp session: {e}")
+            metrics.flush()
+
+    def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Executes a single job on the shared driver.
+
+        Args:
+            request (Dict[str, Any]): The job, with an `action` key.
+
+        Returns:
+            Dict[str, Any]: The reply sent back to the client.
+        """
+        action = request.get("action")
+        if action == "ping":
+            # Not under the lock, so a ping answers even while a send is running
+            manager = self.manager
+            return {"ok": True, "session_valid": manager.session_valid if manager is not None else None}
+        if action == "timings":
+            with self.lock:
+                report = self.manager.timing_report() if self.manager is not None else {}
+            return {"ok": True, "timings": report}
+        if action not in ("send", "find_chat"):
+            return {"ok": False, "error": f"Unknown action: {action}"}
+
+        with self.lock:
+            try:
+                manager = self.ensure_manager()
+                if action == "find_chat":
+                    manager.find_chat(request["contact"])
+                else:
+                    manager.send_message(request["contact"], request["message"])
+                return {"ok": True}
+            except Exception as e:
+                return {"ok": False, "error": str(e)}
+
+    def handle_connection(self, conn: Connection) -> None:
+        """
+        Serves requests from a single client until it disconnects.
+
+        Args:
+            conn (Connection): The client connection.
+        """
+        with conn:
+            while not self.stop_event.is_set():
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    break
+                conn.send(self.handle_request(request))
+
+    def serve_forever(self) -> None:
+        """
+        Starts the browser, the health checks and accepts clients until `close()`.
+        """
+        with self.lock:
+            self.ensure_manager()
+        threading.Thread(target=self.health_check_loop, daemon=True).start()
+
+        self.listener = Listener(self.address, authkey=load_session_key(create=True))
+        print(f"WhatsApp session listening on {self.address[0]}:{self.address[1]}")
+        while not self.stop_event.is_set():
+            try:
+                conn = self.listener.accept()
+            except OSError:
+                if self.stop_event.is_set():
+                    break
+                continue
+            threading.Thread(target=self.handle_connection, args=(conn,), daemon=True).start()
+
+    def close(self) -> None:
+        """
+        Stops accepting jobs and closes the browser.
+        """
+        self.stop_event.set()
+        if self.listener is not None:
+            self.listener.close()
+        with self.lock:
+            if self.manager is not None:
+                self.manager.close()
+                self.manager = None
+
+
+class WhatsAppSessionClient(Transport):
+    """
+    A client for `WhatsAppSessionServer` with the same sending interface as
+    `WhatsAppManager`, so callers can use either one.
+    """
+
+    def __init__(self, conn: Connection) -> None:
+        """
+        Initializes the client with an open connection.
+
+        Args:
+            conn (Connection): An authenticated connection to the server.
+        """
+        self.conn = conn
+
+    @classmethod
+    def connect(cls, address: Tuple[str, int] = SESSION_ADDRESS) -> Optional["WhatsAppSessionClient"]:
+        """
+        Connects to a running session daemon.
+
+        Args:
+            address (Tuple[str, int]): Address of the daemon.
+
+        Returns:
+            Optional[WhatsAppSessionClient]: The client, or None if no daemon is running.
+        """
+        key = load_session_key()
+        if key is None:
+            return None
+        try:
+            return cls(Client(address, authkey=key))
+        except (OSError, AuthenticationError):
+            return None
+
+    def request(self, **request: Any) -> Dict[str, Any]:
+        """
+        Sends a job to the daemon and waits for the reply.
+
+        Returns:
+            Dict[str, Any]: The reply from the daemon.
+        """
+        self.conn.send(request)
+        reply = self.conn.recv()
+        if not reply.get("ok"):
+            raise RuntimeError(reply.get("error", "WhatsApp session error"))
+        return reply
+
+    def ping(self) -> bool:
+        """
+        Checks whether the daemon is answering with a usable session.
+
+        Returns:
+            bool: True if the daemon replied and its session is not known to be logged out.
+        """
+        try:
+            return self.request(action="ping").get("session_valid") is not False
+        except (EOFError, OSError, RuntimeError):
+            return False
+
+    def find_chat(self, contact_name: str) -> None:
+        """
+        Opens a chat in the daemon's warm session.
+
+        Args:
+            contact_name (str): The name of the contact to find.
+        """
+        self.request(action="find_chat", contact=contact_name)
+
+    def send_message(self, contact_name: str, message: str) -> None:
+        """
+        Sends a message through the daemon's warm session.
+
+        Args:
+            contact_name (str): The name of the contact to send the message to.
+            message (str): The message to be sent.
+        """
+        self.request(action="send", contact=contact_name, message=message)
+
+    def timing_report(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns the step timings recorded by the daemon's session.
+
+        Returns:
+            Dict[str, Dict[str, float]]: Count, total, mean and max seconds per step.
+        """
+        return self.request(action="timings")["timings"]
+
+    def close(self) -> None:
+        """
+        Closes the connection; the daemon keeps its browser running.
+        """
+        self.conn.close()
+
+
+if __name__ == "__main__":
+    # The controller writes its own Prometheus file in the same directory
+    metrics.prometheus_file_name = SESSION_METRICS_FILE_NAME
+    server = WhatsAppSessionServer(CHROME_PROFILE, CHROME_DRIVER)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()